@@ -15,6 +15,21 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+
+@app.on_after_finalize.connect
+def setup_periodic_tasks(sender, **kwargs):
+    """
+    Adds every job registered with @periodic_job to the beat schedule.
+    """
+    from django.utils.module_loading import autodiscover_modules
+    from apps.common.scheduler import PERIODIC_JOBS
+
+    # Task modules are normally imported lazily; the registry needs them now
+    autodiscover_modules('tasks')
+    for job in PERIODIC_JOBS.values():
+        sender.add_periodic_task(job.schedule, job.task.s(), name=job.name)
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
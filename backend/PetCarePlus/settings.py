@@ -99,9 +99,30 @@ INSTALLED_APPS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Longest side (px) of the resized copies generated for uploaded images
+MEDIA_DERIVATIVE_SIZES = {
+    'thumb': config('MEDIA_THUMB_SIZE', default=320, cast=int),
+    'medium': config('MEDIA_MEDIUM_SIZE', default=960, cast=int),
+}
+
+# Upload limits (bytes). Single-request uploads stop reading past UPLOAD_MAX_SIZE;
+# larger files (videos) go through resumable sessions in UPLOAD_CHUNK_MAX_SIZE chunks.
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', default=20 * 1024 * 1024, cast=int)
+UPLOAD_SIZE_LIMITS = {
+    'image': config('UPLOAD_IMAGE_MAX_SIZE', default=10 * 1024 * 1024, cast=int),
+    'document': config('UPLOAD_DOCUMENT_MAX_SIZE', default=10 * 1024 * 1024, cast=int),
+    'video': config('UPLOAD_VIDEO_MAX_SIZE', default=500 * 1024 * 1024, cast=int),
+}
+UPLOAD_CHUNK_MAX_SIZE = config('UPLOAD_CHUNK_MAX_SIZE', default=8 * 1024 * 1024, cast=int)
+UPLOAD_SESSION_TTL_HOURS = config('UPLOAD_SESSION_TTL_HOURS', default=24, cast=int)
+# Uploads no longer referenced by any consumer are kept this long after their last upload before collection.
+# Uploads never attached to a pet, service, review or profile are not collected.
+MEDIA_GC_GRACE_HOURS = config('MEDIA_GC_GRACE_HOURS', default=24, cast=int)
+
 MIDDLEWARE = [
+    'middlewares.request_metrics.RequestMetricsMiddleware',
     "corsheaders.middleware.CorsMiddleware",
-    'middlewares.append_slash.AppendSlashMiddleware',
+    'middlewares.path_normalization.SlashOptionalPathMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -156,6 +177,26 @@ else:
         }
     }
 
+# Cache
+# Locks, task dispatch deduplication and the auth caches must be seen by every
+# web and Celery process, so deployments set CACHE_URL to the shared Redis. Without it each
+# process gets its own local memory cache (fine for a single-process dev server and tests).
+
+if config('CACHE_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('CACHE_URL'),
+            'KEY_PREFIX': 'petcircle',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -243,3 +284,62 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+
+# AI Response Cache (Gemini prompt -> response reuse)
+AI_RESPONSE_CACHE_TTL = config('AI_RESPONSE_CACHE_TTL', default=7*24*60*60, cast=int)  # 7 days
+AI_RESPONSE_CACHE_MAX_ENTRIES = config('AI_RESPONSE_CACHE_MAX_ENTRIES', default=5000, cast=int)  # enforced hourly
+# Seconds between writes of the hit/miss counters each process accumulates
+AI_RESPONSE_CACHE_FLUSH_INTERVAL = config('AI_RESPONSE_CACHE_FLUSH_INTERVAL', default=10, cast=int)
+
+# Match Pre-Scoring (inquiries scored outside this band skip the LLM)
+MATCH_PRESCORE_LOW = config('MATCH_PRESCORE_LOW', default=35, cast=int)
+MATCH_PRESCORE_HIGH = config('MATCH_PRESCORE_HIGH', default=80, cast=int)
+MATCH_PRESCORE_RED_FLAG_CAP = config('MATCH_PRESCORE_RED_FLAG_CAP', default=25, cast=int)
+
+# Periodic Maintenance Jobs
+REHOMING_DRAFT_EXPIRY_DAYS = config('REHOMING_DRAFT_EXPIRY_DAYS', default=30, cast=int)
+MAINTENANCE_BATCH_SIZE = config('MAINTENANCE_BATCH_SIZE', default=500, cast=int)
+
+# Authenticated user cache (seconds; 0 disables it and every request queries the users table).
+# Without a shared cache (CACHE_URL) rows are kept for at most 5 seconds, as invalidations stay in one process.
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+
+# Refresh token blacklist filter (rebuilt from the DB every TTL seconds; each process re-reads it every LOCAL_TTL).
+# Only used with a shared cache (CACHE_URL); otherwise every refresh checks the blacklist table.
+AUTH_BLACKLIST_FILTER_TTL = config('AUTH_BLACKLIST_FILTER_TTL', default=300, cast=int)
+AUTH_BLACKLIST_FILTER_LOCAL_TTL = config('AUTH_BLACKLIST_FILTER_LOCAL_TTL', default=30, cast=int)
+
+# Reference tables (species, categories, traits...) held in process memory.
+# Each process re-checks the shared version every CHECK_INTERVAL seconds and reloads after MAX_AGE regardless.
+REFERENCE_DATA_CHECK_INTERVAL = config('REFERENCE_DATA_CHECK_INTERVAL', default=5, cast=int)
+REFERENCE_DATA_MAX_AGE = config('REFERENCE_DATA_MAX_AGE', default=300, cast=int)
+# Browser cache lifetime of reference data responses; they carry an ETag for revalidation afterwards
+REFERENCE_DATA_HTTP_MAX_AGE = config('REFERENCE_DATA_HTTP_MAX_AGE', default=60, cast=int)
+
+# Request metrics (one JSON line per request on 'petcircle.requests').
+# Requests at or over either threshold are also logged on 'petcircle.requests.slow' with their top SQL statements.
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=True, cast=bool)
+REQUEST_SLOW_MS = config('REQUEST_SLOW_MS', default=1000, cast=int)
+REQUEST_SLOW_QUERIES = config('REQUEST_SLOW_QUERIES', default=50, cast=int)
+REQUEST_SLOW_TOP_STATEMENTS = config('REQUEST_SLOW_TOP_STATEMENTS', default=5, cast=int)
+
+# Metrics exposed at /api/common/metrics/ in Prometheus text format.
+# Each web/Celery worker process writes its values to METRICS_DIR (clear it when the servers start);
+# without it only the answering process is reported. The endpoint requires METRICS_TOKEN as a
+# bearer token, and is open only with DEBUG when no token is set.
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=int)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Business events (log_business_event) are queued and written by a background thread in batches.
+# When the queue is full, callers wait up to ENQUEUE_TIMEOUT seconds before the event is dropped (and counted).
+# PERSIST also stores them in the BusinessEvent audit table, searchable at /api/admin-panel/business-events/
+# (that endpoint answers 404 while PERSIST is off).
+BUSINESS_EVENTS_ASYNC = config('BUSINESS_EVENTS_ASYNC', default=True, cast=bool)
+BUSINESS_EVENTS_PERSIST = config('BUSINESS_EVENTS_PERSIST', default=False, cast=bool)
+BUSINESS_EVENT_QUEUE_SIZE = config('BUSINESS_EVENT_QUEUE_SIZE', default=10000, cast=int)
+BUSINESS_EVENT_BATCH_SIZE = config('BUSINESS_EVENT_BATCH_SIZE', default=200, cast=int)
+BUSINESS_EVENT_FLUSH_INTERVAL = config('BUSINESS_EVENT_FLUSH_INTERVAL', default=1.0, cast=float)
+BUSINESS_EVENT_ENQUEUE_TIMEOUT = config('BUSINESS_EVENT_ENQUEUE_TIMEOUT', default=0.0, cast=float)
+# Stored events are kept for this many whole months; older months are dropped by rollover_business_events
+BUSINESS_EVENT_RETENTION_MONTHS = config('BUSINESS_EVENT_RETENTION_MONTHS', default=12, cast=int)
@@ -17,7 +17,7 @@ urlpatterns = [
     path('api/pets/', include('apps.pets.urls')),
     path('api/notifications/', include('apps.notifications.urls')),
     path('api/analytics/', include('apps.analytics.urls')),
-    # path('api/common/', include('apps.common.urls')),
+    path('api/common/', include('apps.common.urls')),
 ]
 
 if settings.DEBUG:
@@ -3,6 +3,7 @@ from .models import UserReport, ModerationAction
 from apps.users.serializers import UserSerializer, PublicUserSerializer
 from apps.users.models import RoleRequest
 from django.contrib.auth import get_user_model
+from apps.common.models import BusinessEvent
 
 User = get_user_model()
 
@@ -135,3 +136,23 @@ class ModerationActionSerializer(serializers.ModelSerializer):
             'notes', 'expires_at', 'is_active', 'created_at'
         ]
         read_only_fields = ['moderator', 'created_at']
+
+
+class BusinessEventSerializer(serializers.ModelSerializer):
+    """Serializer for the business event audit log"""
+    event_type = serializers.SerializerMethodField()
+    event_type_display = serializers.CharField(source='get_event_type_display', read_only=True)
+    object_type = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BusinessEvent
+        fields = [
+            'id', 'event_type', 'event_type_display', 'actor_id',
+            'object_type', 'object_id', 'details', 'occurred_at'
+        ]
+
+    def get_event_type(self, obj):
+        return BusinessEvent.EventType(obj.event_type).name
+
+    def get_object_type(self, obj):
+        return BusinessEvent.ObjectType(obj.object_type).name if obj.object_type else None
@@ -0,0 +1,54 @@
+from functools import partial
+
+from celery.schedules import crontab
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.common.scheduler import periodic_job, iter_batches
+from apps.users.cache import invalidate_user
+from .models import ModerationAction
+
+User = get_user_model()
+
+# Actions whose expiry lifts a restriction on the target account
+SUSPENSION_ACTIONS = ('temporary_suspension',)
+
+
+@periodic_job(crontab(minute='*/10'), name='expire-moderation-actions')
+def expire_moderation_actions():
+    """
+    Deactivates moderation actions past their expires_at and reinstates
+    suspended accounts that have no other active suspension or ban left.
+    """
+    now = timezone.now()
+    expired = ModerationAction.objects.filter(
+        is_active=True, expires_at__isnull=False, expires_at__lte=now
+    ).only('id', 'target_user_id', 'action_type')
+
+    processed = 0
+    for batch in iter_batches(expired):
+        ModerationAction.objects.filter(id__in=[a.id for a in batch]).update(is_active=False)
+        processed += len(batch)
+
+        lifted = {a.target_user_id for a in batch if a.action_type in SUSPENSION_ACTIONS}
+        if not lifted:
+            continue
+        still_restricted = ModerationAction.objects.filter(
+            target_user_id__in=lifted,
+            is_active=True,
+            action_type__in=SUSPENSION_ACTIONS + ('permanent_ban',),
+        ).filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+        ).values_list('target_user_id', flat=True)
+        reinstated = list(User.objects.filter(
+            id__in=lifted - set(still_restricted),
+            account_status=User.AccountStatus.SUSPENDED,
+        ).values_list('id', flat=True))
+        User.objects.filter(id__in=reinstated).update(account_status=User.AccountStatus.ACTIVE, updated_at=now)
+        # update() sends no post_save, so drop the cached auth rows explicitly
+        for user_id in reinstated:
+            transaction.on_commit(partial(invalidate_user, user_id))
+
+    return processed
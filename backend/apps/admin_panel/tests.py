@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.common.models import BusinessEvent
+
+User = get_user_model()
+
+
+@override_settings(BUSINESS_EVENTS_PERSIST=True)
+class BusinessEventAuditLogTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(email='audit@example.com', password='password123', role=User.UserRole.ADMIN)
+        self.client.force_authenticate(self.admin)
+        self.url = '/api/admin-panel/business-events/'
+
+        now = timezone.now()
+        BusinessEvent.objects.bulk_create([
+            BusinessEvent.from_log_event({
+                'timestamp': now - timedelta(minutes=i),
+                'event_type': 'SERVICE_BOOKING_CREATED' if i % 2 else 'USER_SUSPENDED',
+                'user_id': self.admin.id,
+                'details': {'booking_id': i, 'target_user_id': i},
+            })
+            for i in range(5)
+        ])
+
+    def test_keyset_pages_filtered_by_type(self):
+        response = self.client.get(self.url, {'event_type': 'service_booking_created', 'page_size': 1})
+        self.assertEqual(response.status_code, 200)
+        first = response.data['results'][0]
+        self.assertEqual((first['event_type'], first['object_type'], first['object_id']), (
+            'SERVICE_BOOKING_CREATED', 'SERVICE_BOOKING', 1
+        ))
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([event['object_id'] for event in response.data['results']], [3])
+        self.assertIsNone(response.data['next'])
+
+    def test_time_range_and_permissions(self):
+        since = (timezone.now() - timedelta(minutes=2, seconds=30)).isoformat()
+        response = self.client.get(self.url, {'since': since, 'event_type': 'USER_SUSPENDED'})
+        self.assertEqual([event['object_id'] for event in response.data['results']], [0, 2])
+
+        self.client.force_authenticate(User.objects.create_user(email='not-admin@example.com', password='password123'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_unavailable_when_events_are_not_persisted(self):
+        with override_settings(BUSINESS_EVENTS_PERSIST=False):
+            self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -1,10 +1,15 @@
 from rest_framework import viewsets, permissions, status, filters
+import django_filters
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.pagination import CursorPagination
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from django.conf import settings
 from django.utils import timezone
 from .models import UserReport
-from .serializers import UserReportSerializer
+from .serializers import UserReportSerializer, BusinessEventSerializer
+from apps.common.models import BusinessEvent
 from apps.users.permissions import IsAdmin
 
 class UserReportViewSet(viewsets.ModelViewSet):
@@ -90,18 +95,18 @@ class AnalyticsView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        from django.contrib.auth import get_user_model
-        from apps.rehoming.models import RehomingListing, RehomingRequest
-        
-        User = get_user_model()
-        today = timezone.now().date()
-        
+        # Counters are kept current by signals, so this is a single indexed lookup
+        from apps.analytics.counters import get_counters, dated_counter_name
+
+        new_users_key = dated_counter_name('new_users')
+        counters = get_counters(['total_users', new_users_key, 'active_listings', 'total_requests', 'pending_requests'])
+
         data = {
-            'total_users': User.objects.count(),
-            'new_users_today': User.objects.filter(date_joined__date=today).count(),
-            'active_listings': RehomingListing.objects.filter(status='active').count(),
-            'total_requests': RehomingRequest.objects.count(),
-            'pending_requests': RehomingRequest.objects.filter(status='pending').count(),
+            'total_users': counters['total_users'],
+            'new_users_today': counters[new_users_key],
+            'active_listings': counters['active_listings'],
+            'total_requests': counters['total_requests'],
+            'pending_requests': counters['pending_requests'],
         }
         return Response(data)
 
@@ -119,6 +124,64 @@ class ModerationLogViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['moderator__email', 'target_user__email', 'reason']
     filterset_fields = ['action_type']
 
+def _enum_values(enum, value):
+    # Comma-separated member names -> stored values; unknown names match nothing
+    names = [name.strip().upper() for name in value.split(',') if name.strip()]
+    return [enum[name] for name in names if name in enum.names]
+
+
+class BusinessEventFilter(django_filters.FilterSet):
+    event_type = django_filters.CharFilter(method='filter_event_type')  # Comma-separated names
+    object_type = django_filters.CharFilter(method='filter_object_type')
+    object_id = django_filters.NumberFilter(field_name='object_id')
+    actor = django_filters.NumberFilter(field_name='actor_id')
+    since = django_filters.IsoDateTimeFilter(field_name='occurred_at', lookup_expr='gte')
+    until = django_filters.IsoDateTimeFilter(field_name='occurred_at', lookup_expr='lt')
+
+    class Meta:
+        model = BusinessEvent
+        fields = []
+
+    def filter_event_type(self, queryset, name, value):
+        return queryset.filter(event_type__in=_enum_values(BusinessEvent.EventType, value))
+
+    def filter_object_type(self, queryset, name, value):
+        return queryset.filter(object_type__in=_enum_values(BusinessEvent.ObjectType, value))
+
+
+class BusinessEventPagination(CursorPagination):
+    """
+    Keyset pagination: each page continues after the last row's occurred_at,
+    so deep pages cost the same as the first one on the composite indexes.
+    """
+    ordering = ('-occurred_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class BusinessEventViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only, searchable audit log of business events (bookings, listings,
+    reviews, moderation...). Filter with ?event_type=A,B&since=&until=&actor=&object_type=&object_id=.
+
+    Events are only stored when BUSINESS_EVENTS_PERSIST is on (it is off by default,
+    leaving them in the `petcircle.business` log). With it off this endpoint answers
+    404 rather than an empty list that would read as "nothing happened".
+    """
+    queryset = BusinessEvent.objects.all()
+    serializer_class = BusinessEventSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    pagination_class = BusinessEventPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = BusinessEventFilter
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.BUSINESS_EVENTS_PERSIST:
+            raise NotFound("Business events are not being stored; set BUSINESS_EVENTS_PERSIST to record them.")
+
+
 class RoleRequestViewSet(viewsets.ModelViewSet):
     """
     Admin only viewset for managing role requests.
@@ -1,7 +1,13 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
-from .models import PlatformAnalytics
+from .models import PlatformAnalytics, PlatformCounter
 
 @admin.register(PlatformAnalytics)
 class PlatformAnalyticsAdmin(ModelAdmin):
     list_display = ('date', 'total_users', 'total_listings_active', 'adoptions_finalized')
+
+
+@admin.register(PlatformCounter)
+class PlatformCounterAdmin(ModelAdmin):
+    list_display = ('name', 'value', 'updated_at')
+    search_fields = ('name',)
@@ -0,0 +1,201 @@
+import logging
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+
+from django.apps import apps
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PlatformCounter
+from .rollup import day_bounds
+
+logger = logging.getLogger(__name__)
+
+# RehomingRequest statuses that still need owner or admin action
+PENDING_REQUEST_STATUSES = ('draft', 'confirmed')
+
+
+@dataclass
+class CounterSpec:
+    """
+    A counter over the rows of `model` for which `matches(values)` is true,
+    where `values` maps each name in `fields` to the row's value.
+    `queryset` returns the same rows for reconciliation.
+    Dated counters keep one value per day, taken from the `dated_by` field.
+    """
+    name: str
+    model: str
+    matches: object
+    queryset: object
+    fields: tuple = ()
+    dated_by: str = None
+
+
+def _model(label):
+    return apps.get_model(label)
+
+
+COUNTERS = [
+    CounterSpec(
+        name='total_users',
+        model='users.User',
+        matches=lambda values: True,
+        queryset=lambda: _model('users.User').objects.all(),
+    ),
+    CounterSpec(
+        name='new_users',
+        model='users.User',
+        matches=lambda values: True,
+        queryset=lambda: _model('users.User').objects.all(),
+        dated_by='date_joined',
+    ),
+    CounterSpec(
+        name='active_listings',
+        model='rehoming.RehomingListing',
+        matches=lambda values: values['status'] == 'active',
+        queryset=lambda: _model('rehoming.RehomingListing').objects.filter(status='active'),
+        fields=('status',),
+    ),
+    CounterSpec(
+        name='total_requests',
+        model='rehoming.RehomingRequest',
+        matches=lambda values: True,
+        queryset=lambda: _model('rehoming.RehomingRequest').objects.all(),
+    ),
+    CounterSpec(
+        name='pending_requests',
+        model='rehoming.RehomingRequest',
+        matches=lambda values: values['status'] in PENDING_REQUEST_STATUSES,
+        queryset=lambda: _model('rehoming.RehomingRequest').objects.filter(status__in=PENDING_REQUEST_STATUSES),
+        fields=('status',),
+    ),
+]
+
+
+def dated_counter_name(name, day=None):
+    return f'{name}:{(day or timezone.localdate()).isoformat()}'
+
+
+def counter_name(spec, day=None):
+    if spec.dated_by is None:
+        return spec.name
+    return dated_counter_name(spec.name, day)
+
+
+def specs_for(model):
+    label = model._meta.label
+    return [spec for spec in COUNTERS if spec.model == label]
+
+
+@lru_cache(maxsize=None)
+def tracked_fields(model):
+    """
+    Fields the counters of this model read; cached since the set never changes.
+    """
+    fields = set()
+    for spec in specs_for(model):
+        fields.update(spec.fields)
+        if spec.dated_by:
+            fields.add(spec.dated_by)
+    return frozenset(fields)
+
+
+def read_values(instance, fields):
+    """
+    Returns the instance's current values for `fields`, or None if any of them
+    is deferred (loading it would cost a query per row).
+    """
+    if fields & instance.get_deferred_fields():
+        return None
+    return {field: getattr(instance, field) for field in fields}
+
+
+def contribution(spec, values):
+    """
+    Returns (counter_name, 1 or 0) for one row, or None if it can't be attributed.
+    """
+    day = None
+    if spec.dated_by:
+        stamp = values.get(spec.dated_by)
+        if stamp is None:
+            return None
+        day = timezone.localdate(stamp)
+    return counter_name(spec, day), int(bool(spec.matches(values)))
+
+
+def apply_change(model, old_values, new_values):
+    """
+    Adjusts counters for a row going from `old_values` to `new_values`.
+    Pass None for the side that doesn't exist (create or delete).
+    """
+    for spec in specs_for(model):
+        deltas = {}
+        for values, sign in ((old_values, -1), (new_values, 1)):
+            if values is None:
+                continue
+            contributed = contribution(spec, values)
+            if contributed is None:
+                continue
+            name, count = contributed
+            deltas[name] = deltas.get(name, 0) + sign * count
+        for name, delta in deltas.items():
+            increment(name, delta)
+
+
+def increment(name, delta):
+    if not delta:
+        return
+    updated = PlatformCounter.objects.filter(name=name).update(value=F('value') + delta)
+    if not updated:
+        PlatformCounter.objects.get_or_create(name=name)
+        PlatformCounter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def get_counters(names):
+    """
+    Reads several counters with a single query. Missing counters read as 0.
+    """
+    values = dict(PlatformCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    return {name: values.get(name, 0) for name in names}
+
+
+def reconcile_counters():
+    """
+    Recomputes every counter (today's value for dated ones) from the real
+    tables and fixes any drift, e.g. from queryset.update() or bulk writes
+    that bypass signals. Returns the number of counters that had drifted.
+    """
+    drifted = 0
+    today = timezone.localdate()
+    for spec in COUNTERS:
+        name = counter_name(spec, today)
+        queryset = spec.queryset()
+        if spec.dated_by:
+            start, end = day_bounds(today)
+            queryset = queryset.filter(**{f'{spec.dated_by}__gte': start, f'{spec.dated_by}__lt': end})
+        actual = queryset.count()
+
+        counter, created = PlatformCounter.objects.get_or_create(name=name, defaults={'value': actual})
+        if not created and counter.value != actual:
+            logger.warning(f"Counter {name} drifted: stored {counter.value}, actual {actual}")
+            counter.value = actual
+            counter.save(update_fields=['value', 'updated_at'])
+            drifted += 1
+    return drifted
+
+
+def purge_dated_counters(keep_days=7):
+    """
+    Removes per-day counters older than `keep_days`; history lives in PlatformAnalytics.
+    """
+    cutoff = timezone.localdate().toordinal() - keep_days
+    stale = []
+    for name in PlatformCounter.objects.filter(name__contains=':').values_list('name', flat=True):
+        try:
+            day = date.fromisoformat(name.rsplit(':', 1)[1])
+        except ValueError:
+            continue
+        if day.toordinal() < cutoff:
+            stale.append(name)
+    return PlatformCounter.objects.filter(name__in=stale).delete()[0]
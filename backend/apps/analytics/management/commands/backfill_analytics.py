@@ -0,0 +1,30 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.analytics.rollup import rollup_range, first_activity_date
+
+
+class Command(BaseCommand):
+    help = 'Computes PlatformAnalytics rows for a range of past days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD). Defaults to the first user signup')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day (YYYY-MM-DD). Defaults to today')
+        parser.add_argument('--days', type=int, help='Backfill this many days ending at --end instead of using --start')
+
+    def handle(self, *args, **options):
+        end = options['end'] or timezone.localdate()
+        if options['days']:
+            start = end - timedelta(days=options['days'] - 1)
+        else:
+            start = options['start'] or first_activity_date()
+
+        if start is None:
+            self.stdout.write(self.style.WARNING('No users yet, nothing to backfill.'))
+            return
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        days = rollup_range(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Wrote analytics for {days} days ({start} to {end}).'))
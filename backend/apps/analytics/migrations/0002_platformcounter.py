@@ -0,0 +1,52 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:58
+
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_counters(apps, schema_editor):
+    """Start the dashboard counters from the current table counts."""
+    User = apps.get_model('users', 'User')
+    RehomingListing = apps.get_model('rehoming', 'RehomingListing')
+    RehomingRequest = apps.get_model('rehoming', 'RehomingRequest')
+    PlatformCounter = apps.get_model('analytics', 'PlatformCounter')
+
+    # Today's dated counter (apps.analytics.counters.dated_counter_name); earlier days are not read
+    today = timezone.localdate()
+    start = timezone.make_aware(datetime.combine(today, time.min))
+    new_users_today = User.objects.filter(date_joined__gte=start, date_joined__lt=start + timedelta(days=1)).count()
+
+    PlatformCounter.objects.bulk_create([
+        PlatformCounter(name='total_users', value=User.objects.count()),
+        PlatformCounter(name=f'new_users:{today.isoformat()}', value=new_users_today),
+        PlatformCounter(name='active_listings', value=RehomingListing.objects.filter(status='active').count()),
+        PlatformCounter(name='total_requests', value=RehomingRequest.objects.count()),
+        PlatformCounter(
+            name='pending_requests',
+            value=RehomingRequest.objects.filter(status__in=('draft', 'confirmed')).count()
+        ),
+    ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('users', '0005_user_users_user_date_jo_064c8f_idx_and_more'),
+        ('rehoming', '0010_adoptioninquiry_rehoming_ad_created_bcc1e9_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -33,3 +33,16 @@ class PlatformAnalytics(models.Model):
 
     def __str__(self):
         return f"Analytics for {self.date}"
+
+
+class PlatformCounter(models.Model):
+    """
+    Running totals for the admin dashboard, kept current by model signals
+    and periodically reconciled against the real table counts.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
@@ -0,0 +1,117 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max, Min, Q, Sum
+from django.utils import timezone
+
+from .models import PlatformAnalytics
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Upper bound on days the incremental job will catch up in one run; use backfill for more
+MAX_CATCH_UP_DAYS = 31
+
+
+def day_bounds(day):
+    """
+    Returns the [start, end) datetimes of a calendar day in the project timezone.
+    Filtering on these ranges uses the column indexes, unlike __date lookups.
+    """
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def compute_day(day):
+    """
+    Returns the PlatformAnalytics field values for one calendar day.
+
+    Every query is bounded to an indexed range. Today's active listing total is
+    the current count of status='active'. Past days are reconstructed from the
+    listing timeline (published/paused/closed/rehomed timestamps) so they can be
+    backfilled, but only approximately: listings under review, and pauses that
+    have since ended, are not recorded there and count as active.
+
+    active_users counts users whose last_login falls on the day. Only the latest
+    login is kept, so a user who has logged in again since is missing from every
+    earlier day: the figure is exact for a day rolled up as it ends and an
+    undercount for past days recomputed later or backfilled.
+    """
+    from apps.rehoming.models import RehomingListing, AdoptionInquiry
+    from apps.services.models import ServiceBooking
+
+    start, end = day_bounds(day)
+    bookings = ServiceBooking.objects.filter(created_at__gte=start, created_at__lt=end)
+
+    return {
+        'total_users': User.objects.filter(date_joined__lt=end).count(),
+        'new_users': User.objects.filter(date_joined__gte=start, date_joined__lt=end).count(),
+        'active_users': User.objects.filter(last_login__gte=start, last_login__lt=end).count(),
+        'total_listings_active': _active_listings(day, end),
+        'new_listings': RehomingListing.objects.filter(created_at__gte=start, created_at__lt=end).count(),
+        'total_applications': AdoptionInquiry.objects.filter(created_at__gte=start, created_at__lt=end).count(),
+        'adoptions_finalized': RehomingListing.objects.filter(rehomed_at__gte=start, rehomed_at__lt=end).count(),
+        'service_bookings': bookings.count(),
+        'revenue_total': bookings.filter(payment_status='paid').aggregate(total=Sum('agreed_price'))['total'] or 0,
+    }
+
+
+def _active_listings(day, end):
+    from apps.rehoming.models import RehomingListing
+
+    if day >= timezone.localdate():
+        return RehomingListing.objects.filter(status='active').count()
+    return RehomingListing.objects.filter(
+        published_at__lt=end
+    ).exclude(
+        status='pending_review'
+    ).filter(
+        Q(paused_at__isnull=True) | Q(paused_at__gte=end),
+        Q(closed_at__isnull=True) | Q(closed_at__gte=end),
+        Q(rehomed_at__isnull=True) | Q(rehomed_at__gte=end),
+    ).count()
+
+
+def rollup_day(day):
+    """
+    Computes and stores the row for one day. Re-running a day overwrites it.
+    """
+    snapshot, _ = PlatformAnalytics.objects.update_or_create(date=day, defaults=compute_day(day))
+    return snapshot
+
+
+def rollup_range(start, end):
+    """
+    Rolls up every day from `start` to `end`, both inclusive. Returns the number of days written.
+    """
+    days = 0
+    day = start
+    while day <= end:
+        rollup_day(day)
+        days += 1
+        day += timedelta(days=1)
+    logger.info(f"PlatformAnalytics rolled up {days} days ({start} to {end})")
+    return days
+
+
+def rollup_pending(today=None):
+    """
+    Incremental rollup: recomputes the latest stored day (it may have been
+    partial when written) and every day after it up to today.
+    With an empty table only yesterday and today are written.
+    """
+    today = today or timezone.localdate()
+    latest = PlatformAnalytics.objects.aggregate(latest=Max('date'))['latest']
+    start = latest or today - timedelta(days=1)
+    start = max(start, today - timedelta(days=MAX_CATCH_UP_DAYS))
+    return rollup_range(start, today)
+
+
+def first_activity_date():
+    """
+    Earliest day with any user signup, the natural start of a full backfill.
+    """
+    first_joined = User.objects.aggregate(first=Min('date_joined'))['first']
+    return timezone.localdate(first_joined) if first_joined else None
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+from .models import PlatformAnalytics
+
+
+class PlatformAnalyticsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PlatformAnalytics
+        fields = [
+            'date', 'total_users', 'new_users', 'active_users',
+            'total_listings_active', 'new_listings', 'total_applications', 'adoptions_finalized',
+            'service_bookings', 'revenue_total',
+        ]
+
+
+class AnalyticsRangeSerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    MAX_DAYS = 366
+
+    def validate(self, attrs):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        end = attrs.get('end') or timezone.localdate()
+        start = attrs.get('start') or end - timedelta(days=29)
+        if start > end:
+            raise serializers.ValidationError("start must not be after end.")
+        if (end - start).days + 1 > self.MAX_DAYS:
+            raise serializers.ValidationError(f"Date range cannot exceed {self.MAX_DAYS} days.")
+        return {'start': start, 'end': end}
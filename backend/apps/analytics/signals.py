@@ -0,0 +1,41 @@
+from django.apps import apps
+from django.db.models.signals import post_init, post_save, post_delete
+
+from .counters import COUNTERS, tracked_fields, read_values, apply_change
+
+# Values of the counted fields as last loaded or saved, kept on the instance
+# so status transitions can be detected without re-reading the row.
+ORIGINAL_VALUES_ATTR = '_counter_original_values'
+
+
+def remember_values(sender, instance, **kwargs):
+    setattr(instance, ORIGINAL_VALUES_ATTR, read_values(instance, tracked_fields(sender)))
+
+
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new_values = read_values(instance, tracked_fields(sender))
+    if created:
+        apply_change(sender, None, new_values)
+    else:
+        old_values = getattr(instance, ORIGINAL_VALUES_ATTR, None)
+        # Without both sides the transition is unknown; reconciliation will catch it
+        if old_values is not None and new_values is not None:
+            apply_change(sender, old_values, new_values)
+    setattr(instance, ORIGINAL_VALUES_ATTR, new_values)
+
+
+def update_counters_on_delete(sender, instance, **kwargs):
+    old_values = getattr(instance, ORIGINAL_VALUES_ATTR, None)
+    if old_values is not None:
+        apply_change(sender, old_values, None)
+
+
+def connect_counter_signals():
+    for label in {spec.model for spec in COUNTERS}:
+        model = apps.get_model(label)
+        uid = f'platform-counters:{label}'
+        post_init.connect(remember_values, sender=model, dispatch_uid=uid)
+        post_save.connect(update_counters_on_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(update_counters_on_delete, sender=model, dispatch_uid=uid)
@@ -0,0 +1,23 @@
+from celery.schedules import crontab
+
+from apps.common.scheduler import periodic_job
+from .counters import reconcile_counters, purge_dated_counters
+from .rollup import rollup_pending
+
+
+@periodic_job(crontab(minute=5), name='rollup-platform-analytics')
+def rollup_platform_analytics():
+    """
+    Brings PlatformAnalytics up to date, refreshing today's partial row.
+    """
+    return rollup_pending()
+
+
+@periodic_job(crontab(minute='*/15'), name='reconcile-platform-counters')
+def reconcile_platform_counters():
+    """
+    Corrects dashboard counter drift and drops per-day counters past their use.
+    """
+    drifted = reconcile_counters()
+    purge_dated_counters()
+    return drifted
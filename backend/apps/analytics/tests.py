@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from apps.analytics.models import PlatformAnalytics
+
+User = get_user_model()
+
+
+class PlatformAnalyticsRollupTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+        User.objects.create_user(email='old@example.com', password='password123')
+        User.objects.filter(email='old@example.com').update(date_joined=timezone.now() - timedelta(days=1))
+        User.objects.create_user(email='new@example.com', password='password123')
+
+    def test_rollup_day_uses_day_ranges(self):
+        from apps.analytics.rollup import rollup_day
+
+        row = rollup_day(self.yesterday)
+        self.assertEqual((row.total_users, row.new_users), (1, 1))
+
+        row = rollup_day(self.today)
+        self.assertEqual((row.total_users, row.new_users), (2, 1))
+
+    def test_incremental_rollup_resumes_from_latest_day(self):
+        from apps.analytics.rollup import rollup_pending
+
+        PlatformAnalytics.objects.create(date=self.today - timedelta(days=3))
+        self.assertEqual(rollup_pending(today=self.today), 4)
+        self.assertEqual(PlatformAnalytics.objects.count(), 4)
+        self.assertEqual(PlatformAnalytics.objects.get(date=self.today).total_users, 2)
+
+    def test_closed_and_paused_listings_are_not_active(self):
+        from apps.analytics.rollup import rollup_day
+        from apps.pets.models import PetProfile
+        from apps.rehoming.models import RehomingListing, RehomingRequest
+
+        owner = User.objects.get(email='old@example.com')
+        listings = []
+        for name in ('Rex', 'Max', 'Bo'):
+            pet = PetProfile.objects.create(owner=owner, name=name, species='dog', gender='male')
+            request = RehomingRequest.objects.create(owner=owner, pet=pet, reason='Moving', urgency='soon')
+            listings.append(RehomingListing.objects.create(
+                request=request, pet=pet, owner=owner, reason='Moving', urgency='soon',
+                location_city='Austin', location_state='TX'
+            ))
+        RehomingListing.objects.update(published_at=timezone.now() - timedelta(days=2))
+        for listing in listings:
+            listing.refresh_from_db()
+
+        listings[0].status = 'closed'
+        listings[0].save()
+        listings[1].status = 'paused'
+        listings[1].save(update_fields=['status'])
+        listings[1].refresh_from_db()
+        self.assertIsNotNone(listings[0].closed_at)
+        self.assertIsNotNone(listings[1].paused_at)
+
+        self.assertEqual(rollup_day(self.today).total_listings_active, 1)
+        # Before the status changes all three were active
+        self.assertEqual(rollup_day(self.yesterday).total_listings_active, 3)
+
+    def test_series_endpoint_is_admin_only_and_ordered(self):
+        from apps.analytics.rollup import rollup_range
+
+        rollup_range(self.yesterday, self.today)
+        client = APIClient()
+        client.force_authenticate(User.objects.get(email='new@example.com'))
+        self.assertEqual(client.get('/api/analytics/daily/').status_code, status.HTTP_403_FORBIDDEN)
+
+        client.force_authenticate(User.objects.create_superuser(email='admin@example.com', password='password123'))
+        response = client.get('/api/analytics/daily/', {'start': self.yesterday, 'end': self.today})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['date'] for r in response.data['results']], [str(self.yesterday), str(self.today)])
+
+        response = client.get('/api/analytics/daily/', {'start': self.today, 'end': self.yesterday})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PlatformCounterTests(TestCase):
+    def setUp(self):
+        from apps.pets.models import PetProfile
+        from apps.rehoming.models import RehomingRequest
+        self.owner = User.objects.create_user(email='owner@example.com', password='password123')
+        self.pet = PetProfile.objects.create(owner=self.owner, name='Rex', species='dog', gender='male')
+        self.request = RehomingRequest.objects.create(
+            owner=self.owner, pet=self.pet, reason='Moving', urgency='soon'
+        )
+
+    def _counters(self):
+        from apps.analytics.counters import get_counters, dated_counter_name
+        return get_counters(['total_users', dated_counter_name('new_users'), 'total_requests', 'pending_requests'])
+
+    def test_signals_track_creates_transitions_and_deletes(self):
+        from apps.analytics.counters import dated_counter_name
+        counters = self._counters()
+        self.assertEqual(counters['total_users'], 1)
+        self.assertEqual(counters[dated_counter_name('new_users')], 1)
+        self.assertEqual((counters['total_requests'], counters['pending_requests']), (1, 1))
+
+        self.request.status = 'cancelled'
+        self.request.save()
+        self.assertEqual(self._counters()['pending_requests'], 0)
+
+        self.request.delete()
+        self.assertEqual(self._counters()['total_requests'], 0)
+
+    def test_reconcile_fixes_writes_that_bypass_signals(self):
+        from apps.analytics.counters import reconcile_counters
+        from apps.rehoming.models import RehomingRequest
+
+        RehomingRequest.objects.filter(id=self.request.id).update(status='listed')
+        self.assertEqual(self._counters()['pending_requests'], 1)
+
+        self.assertEqual(reconcile_counters(), 1)
+        self.assertEqual(self._counters()['pending_requests'], 0)
+
+    def test_dashboard_reads_counters_in_one_query(self):
+        admin = User.objects.create_superuser(email='admin@example.com', password='password123')
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        with self.assertNumQueries(1):
+            response = client.get('/api/admin-panel/analytics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_users'], 2)
+        self.assertEqual(response.data['new_users_today'], 2)
+        self.assertEqual(response.data['pending_requests'], 1)
@@ -1,5 +1,6 @@
 from django.urls import path
+from .views import PlatformAnalyticsSeriesView
 
 urlpatterns = [
-    # Placeholder
+    path('daily/', PlatformAnalyticsSeriesView.as_view(), name='analytics-daily'),
 ]
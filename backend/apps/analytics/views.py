@@ -0,0 +1,27 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from apps.users.permissions import IsAdmin
+from .models import PlatformAnalytics
+from .serializers import PlatformAnalyticsSerializer, AnalyticsRangeSerializer
+
+
+class PlatformAnalyticsSeriesView(APIView):
+    """
+    Daily platform metrics for a date range, read from the rollup table.
+    Query params: start, end (YYYY-MM-DD). Defaults to the last 30 days.
+    Days that have not been rolled up yet are simply absent.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        params = AnalyticsRangeSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end = params.validated_data['start'], params.validated_data['end']
+
+        rows = PlatformAnalytics.objects.filter(date__range=(start, end)).order_by('date')
+        return Response({
+            'start': start,
+            'end': end,
+            'results': PlatformAnalyticsSerializer(rows, many=True).data,
+        })
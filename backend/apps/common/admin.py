@@ -0,0 +1,49 @@
+from django.contrib import admin
+from unfold.admin import ModelAdmin
+from .models import BusinessEvent, DeadLetterTask, MediaFile, PeriodicJobStats, UploadSession
+
+@admin.register(DeadLetterTask)
+class DeadLetterTaskAdmin(ModelAdmin):
+    list_display = ('task_name', 'task_id', 'retries', 'resolved', 'created_at')
+    list_filter = ('task_name', 'resolved')
+    search_fields = ('task_id', 'exception')
+
+@admin.register(PeriodicJobStats)
+class PeriodicJobStatsAdmin(ModelAdmin):
+    list_display = ('name', 'last_run_at', 'last_rows', 'last_duration_ms', 'last_failed', 'runs', 'failures')
+    readonly_fields = (
+        'name', 'runs', 'failures', 'total_rows', 'total_duration_ms',
+        'last_run_at', 'last_duration_ms', 'last_rows', 'last_failed',
+    )
+
+@admin.register(MediaFile)
+class MediaFileAdmin(ModelAdmin):
+    list_display = ('path', 'owner', 'content_type', 'size', 'status', 'created_at')
+    list_filter = ('status', 'content_type')
+    search_fields = ('path', 'original_name', 'owner__email')
+    readonly_fields = ('derivatives', 'processed_at')
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(ModelAdmin):
+    list_display = ('id', 'owner', 'filename', 'received_size', 'total_size', 'status', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('filename', 'owner__email')
+    readonly_fields = ('parts', 'media_file')
+
+@admin.register(BusinessEvent)
+class BusinessEventAdmin(ModelAdmin):
+    list_display = ('event_type', 'actor_id', 'object_type', 'object_id', 'occurred_at')
+    list_filter = ('event_type', 'object_type')
+    date_hierarchy = 'occurred_at'
+    readonly_fields = ('event_type', 'actor_id', 'object_type', 'object_id', 'details', 'occurred_at', 'partition_month')
+    show_full_result_count = False
+
+    # Append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
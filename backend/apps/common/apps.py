@@ -3,3 +3,16 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.common'
+
+    def ready(self):
+        from .reference_data import connect_reference_signals
+        connect_reference_signals()
+
+        from .media import connect_media_signals
+        connect_media_signals()
+
+        from .instrumentation import install_serializer_timing
+        install_serializer_timing()
+
+        from . import signals  # noqa: F401  Celery task metrics
+        from . import checks  # noqa: F401
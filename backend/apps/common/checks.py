@@ -0,0 +1,18 @@
+from django.core.checks import Tags, Warning, register
+
+from .locks import cache_is_shared
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Task locks, dispatch deduplication and the auth caches need a
+    cache every web and Celery process shares.
+    """
+    if cache_is_shared():
+        return []
+    return [Warning(
+        'The default cache is local to each process.',
+        hint='Set CACHE_URL to the shared Redis (e.g. redis://redis:6379/2).',
+        id='common.W001',
+    )]
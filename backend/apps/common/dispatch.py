@@ -0,0 +1,52 @@
+import logging
+from functools import partial
+
+from celery import Task
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _send_if_new(task, args, kwargs, idempotency_key, dedupe_ttl):
+    if idempotency_key and not cache.add(f'task-dispatch:{idempotency_key}', 1, timeout=dedupe_ttl):
+        logger.info(f"Skipping duplicate dispatch of {task.name} ({idempotency_key})")
+        return
+    task.apply_async(args=args, kwargs=kwargs)
+
+
+def enqueue_on_commit(task, *args, idempotency_key=None, dedupe_ttl=600, **kwargs):
+    """
+    Queues a Celery task once the current transaction commits.
+
+    If an idempotency key is given, further dispatches with the same key are
+    dropped for `dedupe_ttl` seconds, so retried requests don't enqueue twice.
+    The key is kept in the default cache, so this only holds across web
+    workers when CACHE_URL points at a shared cache.
+    Outside a transaction the task is sent immediately.
+    """
+    transaction.on_commit(partial(_send_if_new, task, args, kwargs, idempotency_key, dedupe_ttl))
+
+
+class ReliableTask(Task):
+    """
+    Celery base task that stores a DeadLetterTask row when a task fails for good,
+    i.e. after its automatic retries are exhausted.
+    """
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        from apps.common.models import DeadLetterTask
+
+        try:
+            DeadLetterTask.objects.create(
+                task_name=self.name,
+                task_id=task_id or '',
+                args=list(args or []),
+                kwargs=dict(kwargs or {}),
+                exception=repr(exc),
+                traceback=str(einfo) if einfo else '',
+                retries=self.request.retries or 0,
+            )
+        except Exception as e:
+            logger.error(f"Could not record dead letter for {self.name} [{task_id}]: {e}")
+        super().on_failure(exc, task_id, args, kwargs, einfo)
@@ -0,0 +1,97 @@
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from rest_framework import serializers
+
+# Distinct SQL statements tracked per request; later ones are only counted in the totals
+MAX_TRACKED_STATEMENTS = 200
+
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """
+    What one request spent: database queries (grouped by SQL text, which is
+    parameterized, so the same statement in a loop shows up as one entry with
+    a high count) and time inside serializer `.data`.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.statements = defaultdict(lambda: [0, 0.0])
+        self._serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.query_count += 1
+            self.db_seconds += elapsed
+            if sql in self.statements or len(self.statements) < MAX_TRACKED_STATEMENTS:
+                entry = self.statements[sql]
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def top_statements(self, limit):
+        """
+        The `limit` most repeated statements as dicts, heaviest first.
+        """
+        ranked = sorted(self.statements.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+        return [
+            {'sql': sql[:500], 'count': count, 'db_ms': round(seconds * 1000, 2)}
+            for sql, (count, seconds) in ranked[:limit]
+        ]
+
+
+def current_stats():
+    """
+    Stats of the request being handled, or None outside the request metrics middleware.
+    """
+    return _current.get()
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def _timed_data(data_property):
+    def data(self):
+        stats = _current.get()
+        if stats is None:
+            return data_property.fget(self)
+        # Serializers evaluated inside another serializer are part of the outer timing
+        stats._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return data_property.fget(self)
+        finally:
+            stats._serializer_depth -= 1
+            if stats._serializer_depth == 0:
+                stats.serializer_seconds += time.perf_counter() - started
+    return property(data)
+
+
+def install_serializer_timing():
+    """
+    Times `.data` of every DRF serializer while a request is being measured.
+    Serializer and ListSerializer both delegate to BaseSerializer.data, so it is the only hook.
+    """
+    if not getattr(serializers.BaseSerializer.data.fget, '_request_timed', False):
+        timed = _timed_data(serializers.BaseSerializer.data)
+        timed.fget._request_timed = True
+        serializers.BaseSerializer.data = timed
@@ -0,0 +1,42 @@
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def cache_is_shared():
+    """
+    Whether the default cache is seen by every process (Redis, Memcached, the
+    database cache...). The local memory and dummy caches are private to one
+    process, so locks and markers stored in them mean nothing to other workers.
+    """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+@contextmanager
+def cache_lock(name, timeout=300):
+    """
+    Best-effort distributed lock on top of the shared Django cache.
+
+    Yields True if the lock was acquired, False if another worker holds it.
+    The timeout bounds how long a crashed holder can block others. It only
+    excludes other processes when CACHE_URL points at a shared cache (see
+    `cache_is_shared`); with the local memory fallback it is per process.
+
+    Usage:
+        with cache_lock(f'analyze-inquiry:{inquiry_id}') as acquired:
+            if not acquired:
+                return
+            ...
+    """
+    key = f'lock:{name}'
+    token = uuid.uuid4().hex
+    acquired = cache.add(key, token, timeout=timeout)
+    try:
+        yield acquired
+    finally:
+        # Only release a lock we still own (it may have expired and been taken over)
+        if acquired and cache.get(key) == token:
+            cache.delete(key)
@@ -1,13 +1,159 @@
+import atexit
 import logging
 import json
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, close_old_connections
 from django.utils import timezone
 
+from . import metrics
+
 logger = logging.getLogger('petcircle.business')
 
+
+class BusinessEventPipeline:
+    """
+    Moves business events off the request path.
+
+    `submit` only puts the event on a bounded in-memory queue; a daemon thread
+    (one per process, started on first use and again after a fork) takes
+    events in batches of up to BUSINESS_EVENT_BATCH_SIZE, or whatever arrived
+    within BUSINESS_EVENT_FLUSH_INTERVAL seconds, serializes them, writes
+    them to the `petcircle.business` logger and, with BUSINESS_EVENTS_PERSIST,
+    stores them with one bulk_create per batch.
+
+    When the queue is full (the writer cannot keep up), `submit` waits up to
+    BUSINESS_EVENT_ENQUEUE_TIMEOUT seconds and then drops the event, counting
+    it in `dropped` and the business_events_dropped_total metric; requests are
+    never blocked for longer than that.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.queue = None
+        self.dropped = 0
+        self.written = 0
+
+    def _ensure_started(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.queue = queue.Queue(maxsize=settings.BUSINESS_EVENT_QUEUE_SIZE)
+            self.pid = os.getpid()
+            threading.Thread(target=self._run, name='business-events', daemon=True).start()
+
+    def submit(self, event):
+        if not settings.BUSINESS_EVENTS_ASYNC:
+            self.write_batch([event])
+            return True
+
+        self._ensure_started()
+        timeout = settings.BUSINESS_EVENT_ENQUEUE_TIMEOUT
+        try:
+            if timeout:
+                self.queue.put(event, timeout=timeout)
+            else:
+                self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            metrics.BUSINESS_EVENTS_DROPPED.inc()
+            return False
+        return True
+
+    def flush(self, timeout=5):
+        """
+        Waits until every event submitted so far has been written. Returns False on timeout.
+        """
+        if self.pid != os.getpid():
+            return True
+        done = threading.Event()
+        try:
+            self.queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _run(self):
+        pid = os.getpid()
+        while self.pid == pid:
+            batch, waiters = [], []
+            item = self.queue.get()
+            deadline = time.monotonic() + settings.BUSINESS_EVENT_FLUSH_INTERVAL
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= settings.BUSINESS_EVENT_BATCH_SIZE or remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            try:
+                self.write_batch(batch)
+            except Exception:
+                logger.exception(f"Could not write {len(batch)} business events")
+            finally:
+                # This thread holds its own database connection
+                close_old_connections()
+                for waiter in waiters:
+                    waiter.set()
+
+    def write_batch(self, batch):
+        if not batch:
+            return
+        for level, event in batch:
+            # Log as JSON for easier parsing by log aggregators
+            logger.log(level, json.dumps(event, cls=DjangoJSONEncoder))
+
+        if settings.BUSINESS_EVENTS_PERSIST:
+            from .models import BusinessEvent
+            try:
+                BusinessEvent.objects.bulk_create(
+                    [BusinessEvent.from_log_event(event) for _, event in batch],
+                    batch_size=settings.BUSINESS_EVENT_BATCH_SIZE
+                )
+            except DatabaseError:
+                metrics.BUSINESS_EVENTS_DROPPED.inc(len(batch))
+                self.dropped += len(batch)
+                raise
+
+        self.written += len(batch)
+        metrics.BUSINESS_EVENTS_WRITTEN.inc(len(batch))
+
+
+pipeline = BusinessEventPipeline()
+atexit.register(pipeline.flush, timeout=2)
+
+
+def _snapshot(value):
+    # Copies the containers so later changes by the caller do not reach the queued event
+    if isinstance(value, dict):
+        return {key: _snapshot(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_snapshot(item) for item in value]
+    return value
+
+
 def log_business_event(event_type, user, details=None, level=logging.INFO):
     """
     Standardized logging for business-critical events.
-    
+
+    Only queues the event; serialization and writing happen in the background
+    (see BusinessEventPipeline). `details` is copied first, so the caller may
+    keep changing its own dict.
+
     Args:
         event_type (str): Type of event (e.g., 'REHOMING_LISTING_CREATED')
         user (User): The user who initiated the action
@@ -19,9 +165,41 @@ def log_business_event(event_type, user, details=None, level=logging.INFO):
         'event_type': event_type,
         'user_id': user.id if user and hasattr(user, 'id') else None,
         'user_email': user.email if user and hasattr(user, 'email') else 'system',
-        'details': details or {}
+        'details': _snapshot(details or {})
     }
-    
-    # Log as JSON for easier parsing by log aggregators
-    message = json.dumps(event_data)
-    logger.log(level, message)
+    pipeline.submit((level, event_data))
+
+
+def rollover_business_events(keep_months=None, archive_dir=None, dry_run=False):
+    """
+    Drops stored events of months older than the last `keep_months` whole
+    months (BUSINESS_EVENT_RETENTION_MONTHS by default), one partition at a time.
+    With `archive_dir`, each month is first written there as
+    business-events-<yyyymm>.jsonl. Returns {month: rows}.
+    """
+    from .models import BusinessEvent, month_key
+
+    if keep_months is None:
+        keep_months = settings.BUSINESS_EVENT_RETENTION_MONTHS
+    now = timezone.now()
+    months_ago = now.year * 12 + now.month - 1 - keep_months
+    cutoff = month_key(now.replace(year=months_ago // 12, month=months_ago % 12 + 1, day=1))
+
+    months = sorted(
+        BusinessEvent.objects.filter(partition_month__lt=cutoff)
+        .order_by().values_list('partition_month', flat=True).distinct()
+    )
+    dropped = {}
+    for month in months:
+        events = BusinessEvent.objects.filter(partition_month=month)
+        if dry_run:
+            dropped[month] = events.count()
+            continue
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+            with open(os.path.join(archive_dir, f'business-events-{month}.jsonl'), 'a') as f:
+                for row in events.order_by('id').values().iterator(chunk_size=2000):
+                    f.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+        dropped[month] = BusinessEvent.objects.drop_partition(month)
+        logger.info(f"Dropped business event partition {month} ({dropped[month]} rows)")
+    return dropped
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.common.media import collect_garbage, recount_references
+
+
+class Command(BaseCommand):
+    help = 'Deletes uploaded files that were attached to a pet, service, review or profile and are no longer referenced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Files checked per batch')
+        parser.add_argument(
+            '--grace-hours', type=int, default=None,
+            help='Keep files uploaded within this many hours (default MEDIA_GC_GRACE_HOURS)'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted without deleting')
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='Recompute every reference count from the consumer tables first'
+        )
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            corrected = recount_references(options['batch_size'])
+            self.stdout.write(f'Corrected {corrected} reference counts.')
+
+        grace_hours = options['grace_hours']
+        if grace_hours is None:
+            grace_hours = settings.MEDIA_GC_GRACE_HOURS
+        deleted, freed = collect_garbage(
+            timedelta(hours=grace_hours), batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} files ({freed / (1024 * 1024):.1f} MB).'))
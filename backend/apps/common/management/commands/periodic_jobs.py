@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import autodiscover_modules
+from apps.common.scheduler import PERIODIC_JOBS, get_job_stats
+
+
+class Command(BaseCommand):
+    help = 'Lists scheduled maintenance jobs with their run statistics, or runs one now'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--run', metavar='JOB', help='Run the named job in this process')
+
+    def handle(self, *args, **options):
+        autodiscover_modules('tasks')
+
+        if options['run']:
+            job = PERIODIC_JOBS.get(options['run'])
+            if job is None:
+                raise CommandError(f"Unknown job '{options['run']}'. Available: {', '.join(sorted(PERIODIC_JOBS))}")
+            rows = job.task()
+            if rows is None:
+                self.stdout.write(self.style.WARNING(f'{job.name} is already running elsewhere.'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{job.name} processed {rows} rows.'))
+            return
+
+        stats = get_job_stats()
+        for name in sorted(PERIODIC_JOBS):
+            job_stats = stats.get(name)
+            if job_stats is None:
+                self.stdout.write(f'{name}: never run ({PERIODIC_JOBS[name].schedule})')
+                continue
+            self.stdout.write(
+                f"{name}: last run {job_stats['last_run_at']} | {job_stats['last_rows']} rows in "
+                f"{job_stats['last_duration_ms']} ms | runs {job_stats['runs']}, failures {job_stats['failures']}"
+            )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from apps.common.logging_utils import rollover_business_events
+
+
+class Command(BaseCommand):
+    help = 'Archives and drops stored business events older than the retention period, one month at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months', type=int, default=None,
+            help='Whole months to keep (default BUSINESS_EVENT_RETENTION_MONTHS)'
+        )
+        parser.add_argument('--archive-dir', help='Write each month to <dir>/business-events-<yyyymm>.jsonl first')
+        parser.add_argument('--dry-run', action='store_true', help='Only report the months that would be dropped')
+
+    def handle(self, *args, **options):
+        dropped = rollover_business_events(
+            keep_months=options['keep_months'], archive_dir=options['archive_dir'], dry_run=options['dry_run']
+        )
+        if not dropped:
+            self.stdout.write('No months past the retention period.')
+            return
+        verb = 'Would drop' if options['dry_run'] else 'Dropped'
+        for month, rows in dropped.items():
+            self.stdout.write(f'{verb} {month}: {rows} events')
+        self.stdout.write(self.style.SUCCESS(f'{verb} {sum(dropped.values())} events in {len(dropped)} months.'))
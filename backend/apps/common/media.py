@@ -0,0 +1,386 @@
+import io
+import logging
+import os
+import uuid
+from collections import Counter, defaultdict
+from urllib.parse import unquote, urlsplit
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_init, post_save, post_delete
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import MediaFile
+
+logger = logging.getLogger(__name__)
+
+# (extension, Pillow format, save options) written for every derivative size
+DERIVATIVE_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+# Every model field that can hold the URL of an upload: (label, url field).
+# Keep in sync with the model fields; a column missing here is invisible to garbage collection.
+MEDIA_CONSUMERS = (
+    ('pets.PetMedia', 'url'),
+    ('services.ServiceMedia', 'file_url'),
+    ('services.FosterService', 'video_url'),
+    ('services.TrainerService', 'video_url'),
+    ('services.ServiceReview', 'photo_url'),
+    ('users.User', 'photoURL'),
+)
+
+# Consumers that show resized copies (thumbnail_url/derivatives columns)
+DERIVATIVE_CONSUMERS = (
+    ('pets.PetMedia', 'url'),
+    ('services.ServiceMedia', 'file_url'),
+)
+
+# post_init value of a consumer's URL field that was not loaded (deferred)
+_NOT_LOADED = object()
+
+
+def media_url(path, base_url=None):
+    """
+    Public URL of a stored file. Relative storage URLs are made absolute
+    with `base_url` (scheme and host) when one is given.
+    """
+    url = default_storage.url(path)
+    if base_url and url.startswith('/'):
+        url = base_url.rstrip('/') + url
+    return url
+
+
+def _base_of(url):
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}' if parts.scheme and parts.netloc else None
+
+
+def store_upload(content, original_name, content_type, extension, owner=None, base_url=None, sha256=None):
+    """
+    Saves `content` (an uploaded File) under uploads/ and records it.
+    The storage reads the file in chunks, so large uploads never sit in memory whole.
+    `content_type`/`extension` come from sniffing, not the client.
+
+    Content is stored once: when a file with the same SHA-256 exists (pass
+    `sha256` if it was computed while receiving), that row is returned and
+    nothing is written. Image derivatives are generated in the background
+    after the transaction commits.
+    """
+    from .uploads import file_digest
+
+    sha256 = sha256 or file_digest(content)
+    existing = _touch_existing(sha256)
+    if existing is not None:
+        return existing
+
+    path = default_storage.save(f'uploads/{sha256[:2]}/{sha256}.{extension}', content)
+    return _record_upload(path, sha256, content, original_name, content_type, owner, base_url)
+
+
+def store_streamed_upload(content, original_name, content_type, extension, owner=None, base_url=None):
+    """
+    store_upload for content that is read only once, such as an assembled
+    resumable upload. The SHA-256 is computed while the file is written under
+    uploads/incoming/; if that content turns out to be stored already, the new
+    copy is deleted and the existing row returned.
+    """
+    from .uploads import HashingReader, sized_file
+
+    reader = HashingReader(content)
+    path = default_storage.save(
+        f'uploads/incoming/{uuid.uuid4().hex}.{extension}', sized_file(reader, content.size, content.name)
+    )
+    sha256 = reader.hexdigest()
+    existing = _touch_existing(sha256)
+    if existing is not None:
+        default_storage.delete(path)
+        return existing
+    return _record_upload(path, sha256, content, original_name, content_type, owner, base_url)
+
+
+def _touch_existing(sha256):
+    existing = MediaFile.objects.filter(sha256=sha256).first()
+    if existing is not None:
+        existing.uploaded_at = timezone.now()
+        existing.save(update_fields=['uploaded_at'])
+    return existing
+
+
+def _record_upload(path, sha256, content, original_name, content_type, owner, base_url):
+    from .dispatch import enqueue_on_commit
+    from .tasks import generate_media_derivatives
+
+    with transaction.atomic():
+        media_file, created = MediaFile.objects.get_or_create(sha256=sha256, defaults={
+            'owner': owner,
+            'path': path,
+            'url': media_url(path, base_url),
+            'original_name': (original_name or '')[:255],
+            'content_type': content_type,
+            'size': content.size or 0,
+            'status': 'pending' if content_type.startswith('image/') else 'skipped',
+        })
+    if not created:
+        # Same content stored concurrently by another request
+        default_storage.delete(path)
+    elif media_file.status == 'pending':
+        enqueue_on_commit(
+            generate_media_derivatives, media_file.id,
+            idempotency_key=f'media-derivatives:{media_file.id}'
+        )
+    return media_file
+
+
+def render_derivatives(media_file):
+    """
+    Writes one WebP and one JPEG per MEDIA_DERIVATIVE_SIZES entry and returns
+    the derivatives dict. Images are only ever scaled down.
+    """
+    base_url = _base_of(media_file.url)
+    stem = os.path.splitext(os.path.basename(media_file.path))[0]
+    derivatives = {}
+
+    with default_storage.open(media_file.path, 'rb') as source:
+        with Image.open(source) as original:
+            original.load()
+            image = ImageOps.exif_transpose(original)
+
+    for name, max_side in settings.MEDIA_DERIVATIVE_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        entry = {'width': resized.width, 'height': resized.height}
+        for ext, image_format, options in DERIVATIVE_FORMATS:
+            converted = resized.convert('RGB') if image_format == 'JPEG' or resized.mode not in ('RGB', 'RGBA') else resized
+            buffer = io.BytesIO()
+            converted.save(buffer, image_format, **options)
+            path = default_storage.save(f'derivatives/{stem}-{name}.{ext}', ContentFile(buffer.getvalue()))
+            entry[ext] = media_url(path, base_url)
+        derivatives[name] = entry
+    return derivatives
+
+
+def process_media_file(media_file_id):
+    """
+    Generates derivatives for one upload and copies them onto every media row
+    that already references it. Returns the MediaFile, or None if it is gone.
+    """
+    media_file = MediaFile.objects.filter(pk=media_file_id).first()
+    if media_file is None or media_file.status == 'ready':
+        return media_file
+
+    try:
+        media_file.derivatives = render_derivatives(media_file)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+        media_file.status, media_file.error = 'skipped', str(e)
+    except OSError as e:
+        # Storage or decoder trouble: let the task retry
+        media_file.error = str(e)
+        media_file.save(update_fields=['error'])
+        raise
+    else:
+        media_file.status, media_file.error = 'ready', ''
+    media_file.processed_at = timezone.now()
+    media_file.save(update_fields=['derivatives', 'status', 'error', 'processed_at'])
+
+    if media_file.status == 'ready':
+        apply_derivatives(media_file)
+    return media_file
+
+
+def apply_derivatives(media_file):
+    """
+    Points the thumbnail of every PetMedia/ServiceMedia row using this file at its derivatives.
+    """
+    for label, url_field in DERIVATIVE_CONSUMERS:
+        apps.get_model(label).objects.filter(**{url_field: media_file.url}).update(
+            thumbnail_url=media_file.thumbnail_url, derivatives=media_file.derivatives
+        )
+
+
+def count_references(urls, delta):
+    """
+    Adds `delta` to the reference count of the file behind each URL, once per
+    occurrence, with one UPDATE per distinct multiplicity. URLs outside
+    MEDIA_URL (external links) cannot be uploads and cost no query.
+    Files gaining a reference are marked attached, which makes them eligible
+    for garbage collection once released (see `collect_garbage`).
+    """
+    by_count = defaultdict(list)
+    for url, occurrences in Counter(url for url in urls if url and _storage_path(url)).items():
+        by_count[occurrences].append(url)
+    changes = {'attached_at': Coalesce(F('attached_at'), Value(timezone.now()))} if delta > 0 else {}
+    for occurrences, group in by_count.items():
+        MediaFile.objects.filter(url__in=group).update(
+            ref_count=Greatest(F('ref_count') + delta * occurrences, 0), **changes
+        )
+
+
+def _remember_url(sender, instance, **kwargs):
+    # Reads __dict__ so deferred fields (e.g. cached users) are not loaded
+    instance._media_url_loaded = instance.__dict__.get(sender._media_url_field, _NOT_LOADED)
+
+
+def _reference_saved(sender, instance, created, **kwargs):
+    old = getattr(instance, '_media_url_loaded', _NOT_LOADED)
+    new = instance.__dict__.get(sender._media_url_field, _NOT_LOADED)
+    if new is _NOT_LOADED or (not created and new == old):
+        return
+    count_references([new], 1)
+    if not created and old is not _NOT_LOADED:
+        count_references([old], -1)
+    instance._media_url_loaded = new
+
+
+def _reference_removed(sender, instance, **kwargs):
+    url = instance.__dict__.get(sender._media_url_field)
+    if url:
+        count_references([url], -1)
+
+
+def connect_media_signals():
+    """
+    Keeps MediaFile.ref_count in step with consumer rows created, edited and
+    deleted one by one (deletes through querysets and cascades included).
+    bulk_create and queryset.update() skip signals: callers count bulk-created
+    rows themselves, and anything else is reconciled by `gc_media_blobs --recount`.
+    A count that drifts only delays collection; `collect_garbage` re-checks
+    every consumer table before deleting.
+    """
+    for label, url_field in MEDIA_CONSUMERS:
+        model = apps.get_model(label)
+        model._media_url_field = url_field
+        post_init.connect(_remember_url, sender=model, dispatch_uid=f'media-refs-init:{label}')
+        post_save.connect(_reference_saved, sender=model, dispatch_uid=f'media-refs-save:{label}')
+        post_delete.connect(_reference_removed, sender=model, dispatch_uid=f'media-refs-remove:{label}')
+
+
+def count_stored_references(urls):
+    """
+    Counter of url -> rows currently using it, read from every consumer table.
+    """
+    counts = Counter()
+    for label, url_field in MEDIA_CONSUMERS:
+        counts.update(
+            apps.get_model(label).objects.filter(**{f'{url_field}__in': urls}).values_list(url_field, flat=True)
+        )
+    return counts
+
+
+def _storage_path(url):
+    # Inverse of media_url for the default storage layout (MEDIA_URL + path)
+    path = unquote(urlsplit(url).path)
+    prefix = urlsplit(settings.MEDIA_URL).path
+    return path[len(prefix):] if path.startswith(prefix) else None
+
+
+def stored_paths(media_file):
+    """
+    Storage paths of the file and all of its derivatives.
+    """
+    paths = [media_file.path]
+    for entry in media_file.derivatives.values():
+        for ext, _, _ in DERIVATIVE_FORMATS:
+            path = _storage_path(entry.get(ext) or '')
+            if path:
+                paths.append(path)
+    return paths
+
+
+def recount_references(batch_size=None):
+    """
+    Recomputes every ref_count from the consumer tables, marking referenced
+    files attached. Returns the number of rows corrected.
+    """
+    from .scheduler import iter_batches
+
+    now = timezone.now()
+    corrected = 0
+    for batch in iter_batches(MediaFile.objects.only('id', 'url', 'ref_count', 'attached_at'), batch_size):
+        counts = count_stored_references([media_file.url for media_file in batch])
+        changed = [
+            media_file for media_file in batch
+            if media_file.ref_count != counts[media_file.url]
+            or (counts[media_file.url] and media_file.attached_at is None)
+        ]
+        for media_file in changed:
+            media_file.ref_count = counts[media_file.url]
+            if media_file.ref_count and media_file.attached_at is None:
+                media_file.attached_at = now
+        MediaFile.objects.bulk_update(changed, ['ref_count', 'attached_at'])
+        corrected += len(changed)
+    return corrected
+
+
+def collect_garbage(grace_period, batch_size=None, dry_run=False):
+    """
+    Deletes released files: ones attached to a consumer at some point that
+    no longer have references, and whose last upload is older than
+    `grace_period` (a timedelta), in batches. Counts are re-checked against
+    every MEDIA_CONSUMERS table before anything is deleted, so a drifted
+    ref_count can delay collection but never remove a file in use.
+
+    Uploads never attached through a consumer are kept: they may be linked
+    from places that are not tracked (report evidence lists, free text).
+    Returns (files deleted, bytes freed).
+    """
+    from .scheduler import iter_batches
+
+    cutoff = timezone.now() - grace_period
+    candidates = MediaFile.objects.filter(ref_count=0, attached_at__isnull=False, uploaded_at__lt=cutoff).only(
+        'id', 'path', 'url', 'size', 'derivatives', 'ref_count'
+    )
+    deleted = freed = 0
+    for batch in iter_batches(candidates, batch_size):
+        counts = count_stored_references([media_file.url for media_file in batch])
+        in_use = [media_file for media_file in batch if counts[media_file.url]]
+        for media_file in in_use:
+            media_file.ref_count = counts[media_file.url]
+        garbage = [media_file for media_file in batch if not counts[media_file.url]]
+        if dry_run:
+            deleted += len(garbage)
+            freed += sum(media_file.size for media_file in garbage)
+            continue
+
+        MediaFile.objects.bulk_update(in_use, ['ref_count'])
+        # Rows first, re-checked under lock: content uploaded again meanwhile is kept,
+        # and a file whose row is gone can no longer be handed out by store_upload
+        with transaction.atomic():
+            doomed = set(MediaFile.objects.select_for_update().filter(
+                id__in=[media_file.id for media_file in garbage], ref_count=0,
+                attached_at__isnull=False, uploaded_at__lt=cutoff
+            ).values_list('id', flat=True))
+            MediaFile.objects.filter(id__in=doomed).delete()
+        garbage = [media_file for media_file in garbage if media_file.id in doomed]
+        deleted += len(garbage)
+        freed += sum(media_file.size for media_file in garbage)
+        for media_file in garbage:
+            for path in stored_paths(media_file):
+                default_storage.delete(path)
+    return deleted, freed
+
+
+def attach_derivatives(objects, url_field):
+    """
+    Fills thumbnail_url/derivatives on unsaved media rows whose file has already
+    been processed, with one query. Used before bulk_create, which skips signals.
+    """
+    urls = {getattr(obj, url_field) for obj in objects}
+    if not urls:
+        return
+    ready = {
+        media_file.url: media_file
+        for media_file in MediaFile.objects.filter(url__in=urls, status='ready').only('url', 'derivatives')
+    }
+    for obj in objects:
+        media_file = ready.get(getattr(obj, url_field))
+        if media_file is not None:
+            obj.thumbnail_url = media_file.thumbnail_url
+            obj.derivatives = media_file.derivatives
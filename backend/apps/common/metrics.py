@@ -0,0 +1,260 @@
+import json
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# Latency buckets (seconds) shared by the duration histograms
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        registry.add(self, self._key(labels), amount)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        registry.add(self, self._key(labels), value)
+
+
+class Registry:
+    """
+    This process's metric values, shared with other worker processes through
+    one JSON file per pid in METRICS_DIR.
+
+    Values are written out at most every METRICS_FLUSH_INTERVAL seconds (by a
+    daemon thread, so idle workers still publish) and merged on exposition.
+    Files are never removed while the directory lives, so counters of exited
+    workers keep counting toward the totals. Without METRICS_DIR only the
+    serving process's own values are exposed.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.values = {}
+        self.lock = threading.Lock()
+        self.pid = None
+        self.dirty = False
+
+    def reset(self):
+        with self.lock:
+            self.values = {}
+            self.dirty = False
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def _reset_after_fork(self):
+        # A forked worker starts from zero; the parent's values stay in the parent's file
+        self.pid = os.getpid()
+        self.values = {}
+        self.dirty = False
+        if settings.METRICS_DIR:
+            threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def add(self, metric, key, value):
+        with self.lock:
+            if self.pid != os.getpid():
+                self._reset_after_fork()
+            series = self.values.setdefault(metric.name, {})
+            if metric.kind == 'counter':
+                series[key] = series.get(key, 0) + value
+            else:
+                entry = series.get(key)
+                if entry is None:
+                    entry = series[key] = [[0] * len(metric.buckets), 0.0, 0]
+                for i, bound in enumerate(metric.buckets):
+                    if value <= bound:
+                        entry[0][i] += 1
+                entry[1] += value
+                entry[2] += 1
+            self.dirty = True
+
+    def snapshot(self):
+        with self.lock:
+            if self.pid != os.getpid():
+                return {}
+            return {
+                name: [
+                    [list(key), [list(value[0]), value[1], value[2]] if isinstance(value, list) else value]
+                    for key, value in series.items()
+                ]
+                for name, series in self.values.items()
+            }
+
+    def _path(self, pid):
+        return os.path.join(settings.METRICS_DIR, f'metrics-{pid}.json')
+
+    def flush(self):
+        if not settings.METRICS_DIR or self.pid != os.getpid() or not self.dirty:
+            return
+        self.dirty = False
+        data = self.snapshot()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = self._path(self.pid)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(f'{path}.tmp', path)
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self.pid == pid:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def collect(self):
+        """
+        Merged values of every process: {name: {label values: value}}.
+        """
+        snapshots = []
+        if settings.METRICS_DIR:
+            self.flush()
+            try:
+                names = os.listdir(settings.METRICS_DIR)
+            except FileNotFoundError:
+                names = []
+            own = os.path.basename(self._path(os.getpid()))
+            for name in names:
+                if not (name.startswith('metrics-') and name.endswith('.json')) or name == own:
+                    continue
+                try:
+                    with open(os.path.join(settings.METRICS_DIR, name)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        snapshots.append(self.snapshot())
+
+        merged = {}
+        for snapshot in snapshots:
+            for name, series in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                target = merged.setdefault(name, {})
+                for key, value in series:
+                    key = tuple(key)
+                    if metric.kind == 'counter':
+                        target[key] = target.get(key, 0) + value
+                    else:
+                        entry = target.setdefault(key, [[0] * len(metric.buckets), 0.0, 0])
+                        entry[0] = [a + b for a, b in zip(entry[0], value[0])]
+                        entry[1] += value[1]
+                        entry[2] += value[2]
+        return merged
+
+
+registry = Registry()
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _number(value):
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render_text():
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4).
+    """
+    merged = registry.collect()
+    lines = []
+    for name, metric in sorted(registry.metrics.items()):
+        lines.append(f'# HELP {name} {metric.help_text}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for key, value in sorted(merged.get(name, {}).items()):
+            if metric.kind == 'counter':
+                lines.append(f'{name}{_labels(metric.labelnames, key)} {_number(value)}')
+                continue
+            buckets, total, count = value
+            for bound, observed in zip(metric.buckets, buckets):
+                lines.append(f'{name}_bucket{_labels(metric.labelnames, key, [("le", _number(float(bound)))])} {observed}')
+            lines.append(f'{name}_bucket{_labels(metric.labelnames, key, [("le", "+Inf")])} {count}')
+            lines.append(f'{name}_sum{_labels(metric.labelnames, key)} {_number(total)}')
+            lines.append(f'{name}_count{_labels(metric.labelnames, key)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+# --- Metric definitions ---
+
+REQUEST_DURATION = registry.register(Histogram(
+    'http_request_duration_seconds', 'API request latency by view and action.', ('view', 'action', 'method')
+))
+REQUESTS = registry.register(Counter(
+    'http_requests_total', 'API requests by view and status code.', ('view', 'method', 'status')
+))
+REQUEST_QUERIES = registry.register(Histogram(
+    'http_request_db_queries', 'Database queries per API request.', ('view',), buckets=QUERY_COUNT_BUCKETS
+))
+THROTTLED = registry.register(Counter(
+    'http_throttled_requests_total', 'Requests rejected by DRF throttling.', ('view',)
+))
+TASK_DURATION = registry.register(Histogram(
+    'celery_task_duration_seconds', 'Celery task run time.', ('task', 'state')
+))
+TASK_FAILURES = registry.register(Counter(
+    'celery_task_failures_total', 'Celery task runs that raised.', ('task',)
+))
+TASK_RETRIES = registry.register(Counter(
+    'celery_task_retries_total', 'Celery task retries scheduled.', ('task',)
+))
+LLM_DURATION = registry.register(Histogram(
+    'llm_request_duration_seconds', 'Latency of LLM calls, retries included.', ('outcome',)
+))
+LLM_RETRIES = registry.register(Counter(
+    'llm_retries_total', 'LLM calls retried after rate limiting.'
+))
+CACHE_LOOKUPS = registry.register(Counter(
+    'cache_lookups_total', 'Application cache lookups by cache and result (hit/miss).', ('cache', 'result')
+))
+
+BUSINESS_EVENTS_WRITTEN = registry.register(Counter(
+    'business_events_written_total', 'Business events written by the background event writer.'
+))
+BUSINESS_EVENTS_DROPPED = registry.register(Counter(
+    'business_events_dropped_total', 'Business events dropped because the queue was full or the write failed.'
+))
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_LOOKUPS.inc(cache=cache_name, result='hit' if hit else 'miss')
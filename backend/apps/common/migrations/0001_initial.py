@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeadLetterTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(max_length=255)),
+                ('task_id', models.CharField(blank=True, max_length=255)),
+                ('args', models.JSONField(blank=True, default=list)),
+                ('kwargs', models.JSONField(blank=True, default=dict)),
+                ('exception', models.TextField()),
+                ('traceback', models.TextField(blank=True)),
+                ('retries', models.PositiveIntegerField(default=0)),
+                ('resolved', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Dead Letter Task',
+                'verbose_name_plural': 'Dead Letter Tasks',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['task_name', 'resolved'], name='common_dead_task_na_0d36e3_idx')],
+            },
+        ),
+    ]
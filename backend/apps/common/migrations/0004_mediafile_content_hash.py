@@ -0,0 +1,67 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:26
+
+import django.utils.timezone
+from django.conf import settings
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import F
+
+# As in apps.common.media.MEDIA_CONSUMERS
+MEDIA_CONSUMERS = (
+    ('pets', 'PetMedia', 'url'),
+    ('services', 'ServiceMedia', 'file_url'),
+    ('services', 'FosterService', 'video_url'),
+    ('services', 'TrainerService', 'video_url'),
+    ('services', 'ServiceReview', 'photo_url'),
+    ('users', 'User', 'photoURL'),
+)
+
+
+def backfill_references(apps, schema_editor):
+    MediaFile = apps.get_model('common', 'MediaFile')
+    MediaFile.objects.update(uploaded_at=F('created_at'))
+
+    counts = Counter()
+    for app_label, model_name, url_field in MEDIA_CONSUMERS:
+        counts.update(
+            apps.get_model(app_label, model_name).objects.exclude(**{f'{url_field}__isnull': True})
+            .values_list(url_field, flat=True)
+        )
+    files = list(MediaFile.objects.filter(url__in=list(counts)))
+    for media_file in files:
+        media_file.ref_count = counts[media_file.url]
+    MediaFile.objects.bulk_update(files, ['ref_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_uploadsession'),
+        ('pets', '0003_petmedia_derivatives_petmedia_thumbnail_url'),
+        ('services', '0012_servicemedia_derivatives'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediafile',
+            name='ref_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mediafile',
+            name='sha256',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='mediafile',
+            name='uploaded_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='mediafile',
+            index=models.Index(fields=['ref_count', 'uploaded_at'], name='common_medi_ref_cou_eeb1ad_idx'),
+        ),
+        migrations.RunPython(backfill_references, migrations.RunPython.noop),
+    ]
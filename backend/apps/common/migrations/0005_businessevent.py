@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:35
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_mediafile_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=100)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('user_email', models.CharField(blank=True, max_length=254)),
+                ('level', models.PositiveSmallIntegerField(default=20)),
+                ('details', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('occurred_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Business Event',
+                'verbose_name_plural': 'Business Events',
+                'ordering': ['-occurred_at'],
+                'indexes': [models.Index(fields=['event_type', 'occurred_at'], name='common_busi_event_t_1abcf0_idx'), models.Index(fields=['user_id', 'occurred_at'], name='common_busi_user_id_2f17bd_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,131 @@
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+# As in apps.common.models.BusinessEvent at the time of this migration
+EVENT_TYPES = {
+    'USER_SUSPENDED': 1, 'USER_REINSTATED': 2, 'USER_IDENTITY_VERIFIED': 3, 'ROLE_REQUEST_APPROVED': 4,
+    'SERVICE_PROVIDER_PROFILE_CREATED': 10, 'PROVIDER_APPLICATION_SUBMITTED': 11, 'PROVIDER_STATUS_UPDATED': 12,
+    'SERVICE_REVIEW_CREATED': 13, 'SERVICE_BOOKING_CREATED': 14, 'SERVICE_BOOKING_ACCEPTED': 15,
+    'REHOMING_REQUEST_CREATED_AUTO_CONFIRMED': 20, 'REHOMING_LISTING_CREATED': 21, 'PET_LISTED': 22,
+}
+EVENT_OBJECTS = {
+    1: (1, 'target_user_id'), 2: (1, 'target_user_id'), 3: (1, 'target_user_id'), 4: (2, 'request_id'),
+    10: (3, 'provider_id'), 11: (3, 'provider_id'), 12: (3, 'provider_id'), 13: (4, 'review_id'),
+    14: (5, 'booking_id'), 15: (5, 'booking_id'), 20: (6, 'request_id'), 21: (7, 'listing_id'), 22: (7, 'listing_id'),
+}
+
+
+def convert_events(apps, schema_editor):
+    BusinessEvent = apps.get_model('common', 'BusinessEvent')
+    events = list(BusinessEvent.objects.all())
+    for event in events:
+        event.event_code = EVENT_TYPES.get(event.event_type, 0)
+        if not event.event_code:
+            event.details = {**event.details, 'event_name': event.event_type}
+        object_type, key = EVENT_OBJECTS.get(event.event_code, (None, None))
+        try:
+            event.object_id = int(event.details[key]) if key else None
+            event.object_type = object_type if key else None
+        except (KeyError, TypeError, ValueError):
+            pass
+        occurred_at = event.occurred_at if not isinstance(event.occurred_at, str) else parse_datetime(event.occurred_at)
+        event.partition_month = occurred_at.year * 100 + occurred_at.month
+    BusinessEvent.objects.bulk_update(
+        events, ['event_code', 'details', 'object_type', 'object_id', 'partition_month'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0005_businessevent'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='businessevent',
+            name='common_busi_event_t_1abcf0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='businessevent',
+            name='common_busi_user_id_2f17bd_idx',
+        ),
+        migrations.RenameField(
+            model_name='businessevent',
+            old_name='user_id',
+            new_name='actor_id',
+        ),
+        migrations.AddField(
+            model_name='businessevent',
+            name='event_code',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='businessevent',
+            name='object_type',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, choices=[(1, 'User'), (2, 'Role request'), (3, 'Service provider'), (4, 'Service review'), (5, 'Service booking'), (6, 'Rehoming request'), (7, 'Rehoming listing')]),
+        ),
+        migrations.AddField(
+            model_name='businessevent',
+            name='object_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='businessevent',
+            name='partition_month',
+            field=models.PositiveIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(convert_events, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='businessevent',
+            name='event_type',
+        ),
+        migrations.RemoveField(
+            model_name='businessevent',
+            name='user_email',
+        ),
+        migrations.RemoveField(
+            model_name='businessevent',
+            name='level',
+        ),
+        migrations.RenameField(
+            model_name='businessevent',
+            old_name='event_code',
+            new_name='event_type',
+        ),
+        migrations.AlterModelOptions(
+            name='businessevent',
+            options={'ordering': ['-occurred_at', '-id'], 'verbose_name': 'Business Event', 'verbose_name_plural': 'Business Events'},
+        ),
+        migrations.AlterField(
+            model_name='businessevent',
+            name='event_type',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Other'), (1, 'User suspended'), (2, 'User reinstated'), (3, 'User identity verified'), (4, 'Role request approved'), (10, 'Service provider profile created'), (11, 'Provider application submitted'), (12, 'Provider status updated'), (13, 'Service review created'), (14, 'Service booking created'), (15, 'Service booking accepted'), (20, 'Rehoming request created'), (21, 'Rehoming listing created'), (22, 'Pet listed')]),
+        ),
+        migrations.AlterField(
+            model_name='businessevent',
+            name='occurred_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AddIndex(
+            model_name='businessevent',
+            index=models.Index(fields=['occurred_at', 'id'], name='common_busi_occurre_46c88c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessevent',
+            index=models.Index(fields=['event_type', 'occurred_at', 'id'], name='common_busi_event_t_1cf4dd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessevent',
+            index=models.Index(fields=['actor_id', 'occurred_at'], name='common_busi_actor_i_cd71f1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessevent',
+            index=models.Index(fields=['object_type', 'object_id', 'occurred_at'], name='common_busi_object__62f959_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessevent',
+            index=models.Index(fields=['partition_month'], name='common_busi_partiti_549c39_idx'),
+        ),
+    ]
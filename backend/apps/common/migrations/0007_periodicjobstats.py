@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0006_business_event_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodicJobStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('total_rows', models.PositiveBigIntegerField(default=0)),
+                ('total_duration_ms', models.PositiveBigIntegerField(default=0)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_duration_ms', models.PositiveIntegerField(default=0)),
+                ('last_rows', models.PositiveIntegerField(default=0)),
+                ('last_failed', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name': 'Periodic Job Stats',
+                'verbose_name_plural': 'Periodic Job Stats',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# As in apps.common.media.MEDIA_CONSUMERS
+MEDIA_CONSUMERS = (
+    ('pets', 'PetMedia', 'url'),
+    ('services', 'ServiceMedia', 'file_url'),
+    ('services', 'FosterService', 'video_url'),
+    ('services', 'TrainerService', 'video_url'),
+    ('services', 'ServiceReview', 'photo_url'),
+    ('users', 'User', 'photoURL'),
+)
+
+
+def recount_references(apps, schema_editor):
+    # Earlier counts only covered pet and service media; files referenced anywhere count as attached
+    MediaFile = apps.get_model('common', 'MediaFile')
+    counts = Counter()
+    for app_label, model_name, url_field in MEDIA_CONSUMERS:
+        counts.update(
+            apps.get_model(app_label, model_name).objects.exclude(**{f'{url_field}__isnull': True})
+            .values_list(url_field, flat=True)
+        )
+    now = timezone.now()
+    files = list(MediaFile.objects.all())
+    for media_file in files:
+        media_file.ref_count = counts[media_file.url]
+        if media_file.ref_count:
+            media_file.attached_at = now
+    MediaFile.objects.bulk_update(files, ['ref_count', 'attached_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0007_periodicjobstats'),
+        ('pets', '0003_petmedia_derivatives_petmedia_thumbnail_url'),
+        ('services', '0012_servicemedia_derivatives'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediafile',
+            name='attached_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(recount_references, migrations.RunPython.noop),
+    ]
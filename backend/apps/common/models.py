@@ -0,0 +1,311 @@
+import uuid
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class DeadLetterTask(models.Model):
+    """
+    Record of a Celery task that failed after exhausting its retries.
+    Kept for inspection and manual replay.
+    """
+    task_name = models.CharField(max_length=255)
+    task_id = models.CharField(max_length=255, blank=True)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+
+    exception = models.TextField()
+    traceback = models.TextField(blank=True)
+    retries = models.PositiveIntegerField(default=0)
+
+    resolved = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Dead Letter Task"
+        verbose_name_plural = "Dead Letter Tasks"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['task_name', 'resolved']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} [{self.task_id}] failed"
+
+
+class PeriodicJobStats(models.Model):
+    """
+    Run statistics of one @periodic_job, written by whichever worker ran it,
+    so `manage.py periodic_jobs` sees runs from every process.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    runs = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    total_rows = models.PositiveBigIntegerField(default=0)
+    total_duration_ms = models.PositiveBigIntegerField(default=0)
+
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_duration_ms = models.PositiveIntegerField(default=0)
+    last_rows = models.PositiveIntegerField(default=0)
+    last_failed = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = "Periodic Job Stats"
+        verbose_name_plural = "Periodic Job Stats"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class MediaFile(models.Model):
+    """
+    A file stored through the upload endpoint, with the resized derivatives
+    generated for it in the background.
+
+    Files are content-addressed: uploading bytes that are already stored returns
+    the existing row. `ref_count` tracks the rows using the file (see
+    apps.common.media.MEDIA_CONSUMERS); files released by every consumer they
+    were attached to are removed by `gc_media_blobs`.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('skipped', 'Skipped'),
+        ('failed', 'Failed'),
+    )
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='media_files'
+    )
+    path = models.CharField(max_length=255, unique=True)
+    url = models.URLField(max_length=500, db_index=True)
+    original_name = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    # First time a consumer row referenced the file; only attached files are ever collected
+    attached_at = models.DateTimeField(null=True, blank=True)
+
+    # {'thumb': {'webp': url, 'jpeg': url, 'width': .., 'height': ..}, 'medium': {...}}
+    derivatives = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Last time anyone uploaded this content; garbage collection waits a grace period after it
+    uploaded_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Media File"
+        verbose_name_plural = "Media Files"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['ref_count', 'uploaded_at']),
+        ]
+
+    def __str__(self):
+        return self.path
+
+    @property
+    def thumbnail_url(self):
+        return (self.derivatives.get('thumb') or {}).get('webp')
+
+
+class UploadSession(models.Model):
+    """
+    A resumable upload sent as consecutive chunks (large videos and the like).
+    Each chunk is stored as its own part; the parts are joined into a MediaFile
+    once `received_size` reaches `total_size`.
+    """
+    STATUS_CHOICES = (
+        ('active', 'Active'),
+        ('complete', 'Complete'),
+        ('aborted', 'Aborted'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255, blank=True)
+    total_size = models.PositiveBigIntegerField()
+    received_size = models.PositiveBigIntegerField(default=0)
+    content_type = models.CharField(max_length=100, blank=True)
+    parts = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    media_file = models.ForeignKey(MediaFile, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Upload Session"
+        verbose_name_plural = "Upload Sessions"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename or self.id} ({self.received_size}/{self.total_size})"
+
+
+def month_key(moment):
+    """
+    The yyyymm partition key of a timestamp, in UTC.
+    """
+    moment = moment.astimezone(dt_timezone.utc) if timezone.is_aware(moment) else moment
+    return moment.year * 100 + moment.month
+
+
+class BusinessEventQuerySet(models.QuerySet):
+    """
+    Business events are append-only: rows are never updated, and are only
+    removed a whole month at a time by `drop_partition`.
+    """
+
+    def update(self, **kwargs):
+        raise TypeError("Business events are append-only and cannot be updated.")
+
+    def delete(self):
+        raise TypeError("Business events are append-only; use drop_partition() to remove old months.")
+
+    def drop_partition(self, month, batch_size=None):
+        """
+        Deletes every event of one yyyymm partition, in batches. Returns the number of rows deleted.
+        """
+        batch_size = batch_size or settings.MAINTENANCE_BATCH_SIZE
+        deleted = 0
+        while True:
+            ids = list(self.filter(partition_month=month).order_by().values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            count, _ = models.QuerySet.delete(self.model.objects.filter(id__in=ids))
+            deleted += count
+
+
+class BusinessEvent(models.Model):
+    """
+    Append-only audit log of the business events logged with `log_business_event`,
+    written in batches by the event pipeline when BUSINESS_EVENTS_PERSIST is on.
+
+    Rows carry the acting user and the object the event is about as plain ids
+    (the audit trail outlives deleted rows). `partition_month` is the rollover
+    key: old months are archived and dropped whole by `rollover_business_events`.
+    """
+
+    class EventType(models.IntegerChoices):
+        OTHER = 0, 'Other'
+        USER_SUSPENDED = 1, 'User suspended'
+        USER_REINSTATED = 2, 'User reinstated'
+        USER_IDENTITY_VERIFIED = 3, 'User identity verified'
+        ROLE_REQUEST_APPROVED = 4, 'Role request approved'
+        SERVICE_PROVIDER_PROFILE_CREATED = 10, 'Service provider profile created'
+        PROVIDER_APPLICATION_SUBMITTED = 11, 'Provider application submitted'
+        PROVIDER_STATUS_UPDATED = 12, 'Provider status updated'
+        SERVICE_REVIEW_CREATED = 13, 'Service review created'
+        SERVICE_BOOKING_CREATED = 14, 'Service booking created'
+        SERVICE_BOOKING_ACCEPTED = 15, 'Service booking accepted'
+        REHOMING_REQUEST_CREATED_AUTO_CONFIRMED = 20, 'Rehoming request created'
+        REHOMING_LISTING_CREATED = 21, 'Rehoming listing created'
+        PET_LISTED = 22, 'Pet listed'
+
+    class ObjectType(models.IntegerChoices):
+        USER = 1, 'User'
+        ROLE_REQUEST = 2, 'Role request'
+        SERVICE_PROVIDER = 3, 'Service provider'
+        SERVICE_REVIEW = 4, 'Service review'
+        SERVICE_BOOKING = 5, 'Service booking'
+        REHOMING_REQUEST = 6, 'Rehoming request'
+        REHOMING_LISTING = 7, 'Rehoming listing'
+
+    # event type -> (object type, key of its id in the event details)
+    EVENT_OBJECTS = {
+        EventType.USER_SUSPENDED: (ObjectType.USER, 'target_user_id'),
+        EventType.USER_REINSTATED: (ObjectType.USER, 'target_user_id'),
+        EventType.USER_IDENTITY_VERIFIED: (ObjectType.USER, 'target_user_id'),
+        EventType.ROLE_REQUEST_APPROVED: (ObjectType.ROLE_REQUEST, 'request_id'),
+        EventType.SERVICE_PROVIDER_PROFILE_CREATED: (ObjectType.SERVICE_PROVIDER, 'provider_id'),
+        EventType.PROVIDER_APPLICATION_SUBMITTED: (ObjectType.SERVICE_PROVIDER, 'provider_id'),
+        EventType.PROVIDER_STATUS_UPDATED: (ObjectType.SERVICE_PROVIDER, 'provider_id'),
+        EventType.SERVICE_REVIEW_CREATED: (ObjectType.SERVICE_REVIEW, 'review_id'),
+        EventType.SERVICE_BOOKING_CREATED: (ObjectType.SERVICE_BOOKING, 'booking_id'),
+        EventType.SERVICE_BOOKING_ACCEPTED: (ObjectType.SERVICE_BOOKING, 'booking_id'),
+        EventType.REHOMING_REQUEST_CREATED_AUTO_CONFIRMED: (ObjectType.REHOMING_REQUEST, 'request_id'),
+        EventType.REHOMING_LISTING_CREATED: (ObjectType.REHOMING_LISTING, 'listing_id'),
+        EventType.PET_LISTED: (ObjectType.REHOMING_LISTING, 'listing_id'),
+    }
+
+    event_type = models.PositiveSmallIntegerField(choices=EventType.choices)
+    actor_id = models.BigIntegerField(null=True, blank=True)
+    object_type = models.PositiveSmallIntegerField(choices=ObjectType.choices, null=True, blank=True)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    details = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    occurred_at = models.DateTimeField()
+    partition_month = models.PositiveIntegerField(editable=False)
+
+    objects = BusinessEventQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Business Event"
+        verbose_name_plural = "Business Events"
+        ordering = ['-occurred_at', '-id']
+        indexes = [
+            models.Index(fields=['occurred_at', 'id']),
+            models.Index(fields=['event_type', 'occurred_at', 'id']),
+            models.Index(fields=['actor_id', 'occurred_at']),
+            models.Index(fields=['object_type', 'object_id', 'occurred_at']),
+            models.Index(fields=['partition_month']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} at {self.occurred_at:%Y-%m-%d %H:%M:%S}"
+
+    @classmethod
+    def from_log_event(cls, event):
+        """
+        Builds an unsaved row from an event dict as produced by `log_business_event`.
+        Unknown event names are kept as OTHER with the name in details['event_name'].
+        """
+        details = dict(event.get('details') or {})
+        try:
+            event_type = cls.EventType[event['event_type']]
+        except KeyError:
+            event_type = cls.EventType.OTHER
+            details['event_name'] = event['event_type']
+
+        object_type = object_id = None
+        if event_type in cls.EVENT_OBJECTS:
+            object_type, key = cls.EVENT_OBJECTS[event_type]
+            try:
+                object_id = int(details[key])
+            except (KeyError, TypeError, ValueError):
+                object_type = None
+
+        occurred_at = event['timestamp']
+        if isinstance(occurred_at, str):
+            occurred_at = parse_datetime(occurred_at)
+        return cls(
+            event_type=event_type,
+            actor_id=event.get('user_id'),
+            object_type=object_type,
+            object_id=object_id,
+            details=details,
+            occurred_at=occurred_at,
+            partition_month=month_key(occurred_at),
+        )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise TypeError("Business events are append-only and cannot be updated.")
+        if self.partition_month is None:
+            self.partition_month = month_key(self.occurred_at)
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("Business events are append-only; use drop_partition() to remove old months.")
@@ -0,0 +1,214 @@
+import hashlib
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.http import Http404
+from django.utils.http import parse_etags
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+from .metrics import record_cache_lookup
+
+# label -> ordering. Small, rarely edited lookup tables only.
+REFERENCE_MODELS = {
+    'pets.PersonalityTrait': ('name',),
+    'services.ServiceCategory': ('id',),
+    'services.Species': ('id',),
+    'services.Specialization': ('id',),
+    'services.ServiceOption': ('id',),
+}
+
+
+def _version_key(label):
+    return f'reference-data-version:{label}'
+
+
+class ReferenceTable:
+    """
+    One table's rows as loaded into this process, indexed by id.
+    Instances are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, label, version, rows):
+        self.label = label
+        self.version = version
+        self.rows = rows
+        self.by_id = {row.pk: row for row in rows}
+        self.checked_at = self.loaded_at = time.monotonic()
+        self._etag = None
+
+    @property
+    def etag(self):
+        """
+        Weak ETag of the loaded rows, so clients revalidate instead of trusting a stale copy.
+        """
+        if self._etag is None:
+            digest = hashlib.md5(repr([
+                tuple(getattr(row, field.attname) for field in row._meta.concrete_fields) for row in self.rows
+            ]).encode('utf-8')).hexdigest()
+            self._etag = f'W/"{digest}"'
+        return self._etag
+
+    def get(self, pk):
+        try:
+            return self.by_id.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def match_slug(self, value):
+        value = (value or '').strip().lower()
+        return next((row for row in self.rows if (getattr(row, 'slug', '') or '').lower() == value), None)
+
+    def match(self, value):
+        """
+        Resolves a filter value the way the database filters did:
+        rows whose slug equals it or whose name contains it, case-insensitively.
+        """
+        value = (value or '').strip().lower()
+        if not value:
+            return []
+        return [
+            row for row in self.rows
+            if (getattr(row, 'slug', '') or '').lower() == value or value in (row.name or '').lower()
+        ]
+
+
+_tables = {}
+
+
+def _shared_version(label):
+    version = cache.get(_version_key(label))
+    if version is None:
+        cache.add(_version_key(label), 1, timeout=None)
+        version = cache.get(_version_key(label), 1)
+    return version
+
+
+def get_table(label):
+    """
+    Returns the in-process copy of a reference table, loading it on first use.
+
+    The shared version is re-read at most every REFERENCE_DATA_CHECK_INTERVAL
+    seconds; edits bump it (see `invalidate`), so other processes reload
+    shortly after. Tables are also reloaded after REFERENCE_DATA_MAX_AGE
+    seconds regardless, which bounds staleness when the cache is not shared.
+    """
+    now = time.monotonic()
+    table = _tables.get(label)
+    if table is not None:
+        if now - table.loaded_at > settings.REFERENCE_DATA_MAX_AGE:
+            table = None
+        elif now - table.checked_at > settings.REFERENCE_DATA_CHECK_INTERVAL:
+            if _shared_version(label) != table.version:
+                table = None
+            else:
+                table.checked_at = now
+
+    record_cache_lookup('reference_data', hit=table is not None)
+    if table is None:
+        version = _shared_version(label)
+        model = apps.get_model(label)
+        rows = list(model.objects.order_by(*REFERENCE_MODELS[label]))
+        table = ReferenceTable(label, version, rows)
+        _tables[label] = table
+    return table
+
+
+def invalidate(label):
+    """
+    Drops this process's copy and bumps the shared version so other processes
+    reload too, once the current transaction commits (immediately outside one),
+    so no process reloads rows that may still be rolled back.
+
+    Signals cover single-row saves and deletes; code writing a reference table
+    in bulk (bulk_create, queryset.update) must call this itself.
+    """
+    transaction.on_commit(lambda: _invalidate_now(label))
+
+
+def _invalidate_now(label):
+    _tables.pop(label, None)
+    key = _version_key(label)
+    if cache.add(key, 2, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def clear_local():
+    _tables.clear()
+
+
+def _on_change(sender, **kwargs):
+    invalidate(sender._meta.label)
+
+
+def connect_reference_signals():
+    for label in REFERENCE_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_on_change, sender=model, dispatch_uid=f'reference-data:{label}')
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f'reference-data:{label}')
+
+
+class ReferenceDataViewMixin:
+    """
+    Read-only list/retrieve served from the in-process reference table.
+    Set `reference_model` to a REFERENCE_MODELS label.
+    """
+    reference_model = None
+
+    def get_reference_table(self):
+        return get_table(self.reference_model)
+
+    def get_queryset(self):
+        return self.get_reference_table().rows
+
+    def get_object(self):
+        obj = self.get_reference_table().get(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field))
+        if obj is None:
+            raise Http404
+        return obj
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ('GET', 'HEAD') and response.status_code == 200:
+            etag = self.get_reference_table().etag
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                response = super().finalize_response(
+                    request, Response(status=status.HTTP_304_NOT_MODIFIED), *args, **kwargs
+                )
+            # Short-lived and revalidated, so a copy taken before an edit is not served for long
+            response['ETag'] = etag
+            response['Cache-Control'] = f'private, max-age={settings.REFERENCE_DATA_HTTP_MAX_AGE}, must-revalidate'
+        return response
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that validates ids against the in-process
+    reference table instead of querying the database for each one.
+    """
+
+    def __init__(self, reference_model, **kwargs):
+        self.reference_model = reference_model
+        if not kwargs.get('read_only'):
+            kwargs.setdefault('queryset', apps.get_model(reference_model).objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obj = get_table(self.reference_model).get(data)
+        if obj is None:
+            try:
+                int(data)
+            except (TypeError, ValueError):
+                self.fail('incorrect_type', data_type=type(data).__name__)
+            self.fail('does_not_exist', pk_value=data)
+        return obj
@@ -0,0 +1,156 @@
+import logging
+import time
+from dataclasses import dataclass
+from functools import wraps
+
+from celery import shared_task
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.common.locks import cache_lock
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeriodicJob:
+    name: str
+    task: object
+    schedule: object
+
+
+# name -> PeriodicJob. Filled in as task modules are imported.
+PERIODIC_JOBS = {}
+
+
+def periodic_job(schedule, name=None, lock_timeout=None):
+    """
+    Registers a function as a scheduled maintenance job.
+
+    `schedule` is anything Celery beat accepts (seconds, timedelta, crontab).
+    The function should return the number of rows it processed.
+
+    Each run holds a cache lock named after the job, so overlapping runs
+    (several beat instances, or a run outliving its interval) are skipped.
+    Duration and row counts are logged and stored in PeriodicJobStats, see `get_job_stats`.
+
+    Usage:
+        @periodic_job(crontab(minute=0), name='expire-stale-drafts')
+        def expire_stale_drafts():
+            ...
+            return updated
+    """
+    def decorator(func):
+        job_name = name or func.__name__.replace('_', '-')
+        timeout = lock_timeout or 60 * 60
+
+        @shared_task(name=f'periodic.{job_name}')
+        @wraps(func)
+        def task():
+            return run_job(job_name, func, lock_timeout=timeout)
+
+        PERIODIC_JOBS[job_name] = PeriodicJob(name=job_name, task=task, schedule=schedule)
+        return task
+
+    return decorator
+
+
+def run_job(name, func, lock_timeout=60 * 60):
+    """
+    Runs a job under its lock and records metrics.
+    Returns the processed row count, or None if another run holds the lock.
+    """
+    with cache_lock(f'periodic-job:{name}', timeout=lock_timeout) as acquired:
+        if not acquired:
+            logger.info(f"Periodic job {name} is already running, skipping.")
+            return None
+
+        started = time.perf_counter()
+        try:
+            rows = func() or 0
+        except Exception:
+            _record_run(name, time.perf_counter() - started, 0, failed=True)
+            logger.exception(f"Periodic job {name} failed")
+            raise
+
+        duration = time.perf_counter() - started
+        _record_run(name, duration, rows)
+        logger.info(f"Periodic job {name} processed {rows} rows in {duration * 1000:.0f} ms")
+        return rows
+
+
+def _record_run(name, duration, rows, failed=False):
+    from apps.common.models import PeriodicJobStats
+
+    duration_ms = round(duration * 1000)
+    changes = {
+        'runs': F('runs') + 1,
+        'failures': F('failures') + int(failed),
+        'total_rows': F('total_rows') + rows,
+        'total_duration_ms': F('total_duration_ms') + duration_ms,
+        'last_run_at': timezone.now(),
+        'last_duration_ms': duration_ms,
+        'last_rows': rows,
+        'last_failed': failed,
+    }
+    if PeriodicJobStats.objects.filter(name=name).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            PeriodicJobStats.objects.create(name=name)
+    except IntegrityError:
+        # Created by a concurrent run of the same job
+        pass
+    PeriodicJobStats.objects.filter(name=name).update(**changes)
+
+
+def get_job_stats():
+    """
+    Returns {job_name: stats} for every registered job that has run at least once.
+    """
+    from apps.common.models import PeriodicJobStats
+
+    rows = PeriodicJobStats.objects.filter(name__in=list(PERIODIC_JOBS)).values()
+    return {
+        row['name']: {**row, 'last_run_at': row['last_run_at'].isoformat() if row['last_run_at'] else None}
+        for row in rows
+    }
+
+
+def iter_batches(queryset, batch_size=None):
+    """
+    Yields lists of at most `batch_size` objects (MAINTENANCE_BATCH_SIZE by default).
+
+    Pages by primary key instead of holding one cursor open, so callers may
+    update or delete the rows of a batch before the next one is fetched.
+    """
+    batch_size = batch_size or settings.MAINTENANCE_BATCH_SIZE
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_pk = batch[-1].pk
+
+
+def update_in_batches(queryset, fields, apply, batch_size=None):
+    """
+    Calls `apply(obj)` on every object and writes `fields` back with one
+    bulk_update per batch. Returns the number of rows updated.
+    """
+    batch_size = batch_size or settings.MAINTENANCE_BATCH_SIZE
+    updated = 0
+    model = queryset.model
+    for batch in iter_batches(queryset, batch_size):
+        for obj in batch:
+            apply(obj)
+        model.objects.bulk_update(batch, fields, batch_size=batch_size)
+        updated += len(batch)
+    return updated
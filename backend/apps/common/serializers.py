@@ -1,4 +1,32 @@
+from django.conf import settings
 from rest_framework import serializers
+from .models import UploadSession
 
 class FileUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    size = serializers.IntegerField(min_value=1)
+
+    def validate_size(self, value):
+        limit = max(settings.UPLOAD_SIZE_LIMITS.values())
+        if value > limit:
+            raise serializers.ValidationError(f"Files are limited to {limit // (1024 * 1024)} MB.")
+        return value
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source='received_size', read_only=True)
+    size = serializers.IntegerField(source='total_size', read_only=True)
+    chunk_size = serializers.SerializerMethodField()
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'offset', 'chunk_size', 'content_type', 'status', 'media_file', 'url']
+
+    def get_chunk_size(self, obj):
+        return settings.UPLOAD_CHUNK_MAX_SIZE
+
+    def get_url(self, obj):
+        return obj.media_file.url if obj.media_file_id else None
@@ -0,0 +1,30 @@
+import time
+
+from celery.signals import task_failure, task_postrun, task_prerun, task_retry
+
+from . import metrics
+
+# task id -> perf_counter at start, for tasks running in this process
+_task_started = {}
+
+
+@task_prerun.connect(dispatch_uid='metrics-task-prerun')
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect(dispatch_uid='metrics-task-postrun')
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        metrics.TASK_DURATION.observe(time.perf_counter() - started, task=task.name, state=state or 'UNKNOWN')
+
+
+@task_failure.connect(dispatch_uid='metrics-task-failure')
+def _task_failure(sender=None, **kwargs):
+    metrics.TASK_FAILURES.inc(task=getattr(sender, 'name', 'unknown'))
+
+
+@task_retry.connect(dispatch_uid='metrics-task-retry')
+def _task_retry(sender=None, **kwargs):
+    metrics.TASK_RETRIES.inc(task=getattr(sender, 'name', 'unknown'))
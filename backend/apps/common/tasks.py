@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from celery import shared_task
+from celery.schedules import crontab
+from django.conf import settings
+from django.utils import timezone
+
+from apps.common.dispatch import ReliableTask
+from apps.common.locks import cache_lock
+from apps.common.logging_utils import rollover_business_events
+from apps.common.media import collect_garbage, process_media_file
+from apps.common.models import UploadSession
+from apps.common.scheduler import periodic_job, iter_batches
+from apps.common.uploads import discard_parts
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on resizing one image before the lock lapses
+DERIVATIVE_LOCK_TIMEOUT = 5 * 60
+
+
+@shared_task(
+    bind=True,
+    base=ReliableTask,
+    autoretry_for=(OSError,),
+    max_retries=3,
+    retry_backoff=10,
+    retry_backoff_max=300,
+    retry_jitter=True,
+)
+def generate_media_derivatives(self, media_file_id):
+    """
+    Builds resized WebP/JPEG copies of an uploaded image. Safe to receive more
+    than once: concurrent deliveries are serialized by a lock and finished files are skipped.
+    """
+    with cache_lock(f'media-derivatives:{media_file_id}', timeout=DERIVATIVE_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            logger.info(f"Derivatives for media file {media_file_id} are already being generated, skipping.")
+            return
+        media_file = process_media_file(media_file_id)
+        if media_file is not None:
+            logger.info(f"Media file {media_file_id}: derivatives {media_file.status}")
+
+
+@periodic_job(crontab(minute=45), name='purge-stale-upload-sessions')
+def purge_stale_upload_sessions():
+    """
+    Aborts resumable uploads untouched for UPLOAD_SESSION_TTL_HOURS and deletes their stored parts.
+    """
+    cutoff = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    stale = UploadSession.objects.filter(status='active', updated_at__lt=cutoff)
+    purged = 0
+    for batch in iter_batches(stale):
+        for session in batch:
+            discard_parts(session)
+            session.status = 'aborted'
+        UploadSession.objects.bulk_update(batch, ['parts', 'status'])
+        purged += len(batch)
+    return purged
+
+
+@periodic_job(crontab(minute=0, hour=4), name='gc-media-blobs')
+def gc_media_blobs():
+    """
+    Deletes uploads no pet or service media row has used for MEDIA_GC_GRACE_HOURS.
+    """
+    deleted, _ = collect_garbage(timedelta(hours=settings.MEDIA_GC_GRACE_HOURS))
+    return deleted
+
+
+@periodic_job(crontab(minute=30, hour=4, day_of_month=1), name='rollover-business-events')
+def rollover_business_event_partitions():
+    """
+    Drops stored business events older than BUSINESS_EVENT_RETENTION_MONTHS, a month at a time.
+    """
+    return sum(rollover_business_events().values())
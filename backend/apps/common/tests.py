@@ -1,11 +1,20 @@
-from django.test import TestCase
+import io
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
-from rest_framework import status
+from rest_framework import status, serializers
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from .models import MediaFile
 
 User = get_user_model()
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class FileUploadTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -17,7 +26,7 @@ class FileUploadTests(TestCase):
         file_content = b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\x05\x04\x04\x00\x00\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02\x44\x01\x00\x3b'
         uploaded_file = SimpleUploadedFile("test_image.gif", file_content, content_type="image/gif")
         
-        response = self.client.post('/common/upload/', {'file': uploaded_file}, format='multipart')
+        response = self.client.post('/api/common/upload/', {'file': uploaded_file}, format='multipart')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertIn('url', response.data)
@@ -27,5 +36,448 @@ class FileUploadTests(TestCase):
     def test_upload_unauthenticated(self):
         self.client.logout()
         uploaded_file = SimpleUploadedFile("test.txt", b"content", content_type="text/plain")
-        response = self.client.post('/common/upload/', {'file': uploaded_file}, format='multipart')
+        response = self.client.post('/api/common/upload/', {'file': uploaded_file}, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_declared_type_is_not_trusted(self):
+        # Text renamed and labelled as an image is sniffed and refused
+        uploaded_file = SimpleUploadedFile("photo.png", b"<script>alert(1)</script>", content_type="image/png")
+        response = self.client.post('/api/common/upload/', {'file': uploaded_file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        self.assertFalse(MediaFile.objects.exists())
+
+    def test_only_video_brands_of_the_mp4_container_are_accepted(self):
+        from .uploads import sniff_content_type
+
+        self.assertEqual(sniff_content_type(b'\0\0\0\x18ftypmp42\0\0\0\0mp42isom'), 'video/mp4')
+        self.assertEqual(sniff_content_type(b'\0\0\0\x14ftypqt  \0\0\0\0qt  '), 'video/quicktime')
+        heic = b'\0\0\0\x18ftypheic\0\0\0\0mif1heic' + b'\0' * 64
+        self.assertIsNone(sniff_content_type(heic))
+
+        uploaded_file = SimpleUploadedFile("clip.mp4", heic, content_type="video/mp4")
+        response = self.client.post('/api/common/upload/', {'file': uploaded_file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    @override_settings(UPLOAD_MAX_SIZE=1024)
+    def test_oversized_upload_is_rejected(self):
+        uploaded_file = SimpleUploadedFile("big.gif", b'GIF89a' + b'\0' * 4096, content_type="image/gif")
+        response = self.client.post('/api/common/upload/', {'file': uploaded_file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(MediaFile.objects.exists())
+
+    @override_settings(UPLOAD_CHUNK_MAX_SIZE=64)
+    def test_resumable_upload(self):
+        content = b'%PDF-1.4\n' + b'x' * 100
+        response = self.client.post('/api/common/uploads/', {'filename': 'report.pdf', 'size': len(content)})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = f"/api/common/uploads/{response.data['id']}/"
+
+        def send(chunk, offset):
+            return self.client.generic(
+                'PATCH', url, chunk, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+            )
+
+        self.assertEqual(send(content[:64], 0).data['offset'], 64)
+        # A retried chunk is refused with the offset to resume from
+        conflict = send(content[:64], 0)
+        self.assertEqual(conflict.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(conflict.data['offset'], 64)
+
+        response = send(content[64:], 64)
+        self.assertEqual(response.data['status'], 'complete')
+        media_file = MediaFile.objects.get(pk=response.data['media_file'])
+        self.assertEqual((media_file.content_type, media_file.size), ('application/pdf', len(content)))
+        with default_storage.open(media_file.path, 'rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(default_storage.listdir(f"upload-sessions/{response.data['id']}")[1], [])
+
+    @override_settings(UPLOAD_CHUNK_MAX_SIZE=64)
+    def test_chunk_recorded_elsewhere_while_writing_is_discarded(self):
+        from .uploads import write_part
+        from .models import UploadSession
+
+        content = b'%PDF-1.4\n' + b'x' * 100
+        session_id = self.client.post('/api/common/uploads/', {'filename': 'a.pdf', 'size': len(content)}).data['id']
+
+        def write_then_lose_race(session, offset, stream, length):
+            written = write_part(session, offset, stream, length)
+            UploadSession.objects.filter(pk=session.pk).update(received_size=length)
+            return written
+
+        with mock.patch('apps.common.views.write_part', side_effect=write_then_lose_race):
+            response = self.client.generic(
+                'PATCH', f'/api/common/uploads/{session_id}/', content[:64],
+                content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0'
+            )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 64)
+        self.assertEqual(UploadSession.objects.get(pk=session_id).parts, [])
+        self.assertEqual(default_storage.listdir(f'upload-sessions/{session_id}')[1], [])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MediaDerivativeTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='media@example.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+
+    def upload_image(self, size=(1200, 800)):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, (200, 120, 40)).save(buffer, 'PNG')
+        uploaded_file = SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/common/upload/', {'file': uploaded_file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(callbacks), 1)  # derivative job queued after commit
+        return MediaFile.objects.get(pk=response.data['id'])
+
+    def test_derivatives_are_generated_and_applied(self):
+        from apps.common.media import process_media_file
+        from apps.pets.models import PetProfile, PetMedia
+
+        media_file = self.upload_image()
+        self.assertEqual(media_file.status, 'pending')
+        pet = PetProfile.objects.create(owner=self.user, name='Rex', species='dog', breed='Mixed', gender='male')
+        existing = PetMedia.objects.create(pet=pet, url=media_file.url)
+        self.assertIsNone(existing.thumbnail_url)
+
+        media_file = process_media_file(media_file.id)
+        self.assertEqual(media_file.status, 'ready')
+        thumb = media_file.derivatives['thumb']
+        self.assertEqual((thumb['width'], thumb['height']), (320, 213))
+        self.assertTrue(thumb['webp'].endswith('.webp') and thumb['jpeg'].endswith('.jpeg'))
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.thumbnail_url, thumb['webp'])
+        # Rows created later pick the derivatives up on save
+        self.assertEqual(PetMedia.objects.create(pet=pet, url=media_file.url).thumbnail_url, thumb['webp'])
+
+    def test_non_images_are_not_processed(self):
+        uploaded_file = SimpleUploadedFile('notes.pdf', b'%PDF-1.4 content', content_type='application/pdf')
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/common/upload/', {'file': uploaded_file}, format='multipart')
+        self.assertEqual(response.data['status'], 'skipped')
+        self.assertEqual(callbacks, [])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MediaDeduplicationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='dedup@example.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, content=b'%PDF-1.4 vaccination record'):
+        uploaded_file = SimpleUploadedFile('record.pdf', content, content_type='application/pdf')
+        response = self.client.post('/api/common/upload/', {'file': uploaded_file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return MediaFile.objects.get(pk=response.data['id'])
+
+    def test_identical_content_is_stored_once(self):
+        first = self.upload()
+        second = self.upload()
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(MediaFile.objects.count(), 1)
+        self.assertEqual(default_storage.listdir(f'uploads/{first.sha256[:2]}')[1], [first.path.rsplit('/', 1)[-1]])
+        self.assertNotEqual(self.upload(b'%PDF-1.4 another record').pk, first.pk)
+
+    def test_references_are_counted_and_released_files_collected(self):
+        from datetime import timedelta
+        from apps.common.media import collect_garbage
+        from apps.pets.models import PetProfile, PetMedia
+
+        used, released = self.upload(), self.upload(b'%PDF-1.4 replaced')
+        never_attached, photo = self.upload(b'%PDF-1.4 abandoned'), self.upload(b'%PDF-1.4 profile photo')
+        pet = PetProfile.objects.create(owner=self.user, name='Rex', species='dog', breed='Mixed', gender='male')
+        media = PetMedia.objects.create(pet=pet, url=used.url)
+        PetMedia.objects.create(pet=pet, url=used.url)
+        PetMedia.objects.create(pet=pet, url=released.url).delete()
+        used.refresh_from_db()
+        self.assertEqual(used.ref_count, 2)
+        media.delete()
+        used.refresh_from_db()
+        self.assertEqual(used.ref_count, 1)
+
+        # Edits of URL columns outside the media tables are counted too
+        self.user.photoURL = photo.url
+        self.user.save()
+        photo.refresh_from_db()
+        self.assertEqual((photo.ref_count, photo.attached_at is not None), (1, True))
+
+        # A drifted count is re-checked against every consumer table, never trusted for deletion
+        MediaFile.objects.filter(pk__in=[used.pk, photo.pk]).update(ref_count=0)
+        self.assertEqual(collect_garbage(timedelta(hours=1)), (0, 0))
+        self.assertEqual(collect_garbage(timedelta(0)), (1, released.size))
+
+        self.assertEqual(
+            set(MediaFile.objects.values_list('pk', 'ref_count')),
+            {(used.pk, 1), (photo.pk, 1), (never_attached.pk, 0)}
+        )
+        self.assertFalse(default_storage.exists(released.path))
+        # Never attached through a tracked consumer: may be linked from somewhere untracked
+        self.assertTrue(default_storage.exists(never_attached.path))
+        self.assertTrue(default_storage.exists(used.path))
+
+
+class SlashOptionalPathTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='slash@example.com', password='password123'))
+
+    def test_routes_answer_without_trailing_slash(self):
+        # Served in place, body intact, instead of a 301 that drops the POST
+        response = self.client.post('/api/common/uploads', {'filename': 'clip.mp4', 'size': 1024}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['size'], 1024)
+        self.assertEqual(self.client.get(f"/api/common/uploads/{response.data['id']}").status_code, status.HTTP_200_OK)
+
+    def test_unknown_paths_are_not_rewritten(self):
+        self.assertEqual(self.client.get('/api/common/missing').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='metrics@example.com', password='password123')
+        self.client.force_authenticate(self.user)
+
+    @override_settings(REQUEST_SLOW_QUERIES=1)
+    def test_request_is_measured_and_slow_log_lists_statements(self):
+        import json
+        from .models import UploadSession
+        session = UploadSession.objects.create(owner=self.user, filename='a.mp4', total_size=10)
+
+        with self.assertLogs('petcircle.requests', 'INFO') as logs:
+            response = self.client.get(f'/api/common/uploads/{session.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        request_log, slow_log = (json.loads(record.getMessage()) for record in logs.records)
+        self.assertEqual(request_log['view'], 'upload-session')
+        self.assertEqual(request_log['status'], 200)
+        self.assertGreaterEqual(request_log['db_queries'], 1)
+        self.assertGreater(request_log['serializer_ms'], 0)
+        self.assertEqual(request_log['response_bytes'], len(response.content))
+        self.assertIn('common_uploadsession', slow_log['top_statements'][0]['sql'])
+
+
+@override_settings(METRICS_TOKEN='scrape-token')
+class MetricsTests(TestCase):
+    def setUp(self):
+        from .metrics import registry
+        registry.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='scrape@example.com', password='password123'))
+
+    def scrape(self):
+        response = self.client.get('/api/common/metrics/', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_requests_are_exposed_in_text_format(self):
+        self.client.get('/api/common/uploads/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(self.client.get('/api/common/metrics/').status_code, 401)
+
+        text = self.scrape()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('http_requests_total{view="upload-session",method="GET",status="404"} 1', text)
+        self.assertIn('http_request_db_queries_bucket{view="upload-session",le="+Inf"} 1', text)
+
+    def test_values_of_other_processes_are_merged(self):
+        import json
+        import os
+        from .metrics import LLM_RETRIES
+
+        directory = tempfile.mkdtemp()
+        with open(os.path.join(directory, 'metrics-999999.json'), 'w') as f:
+            json.dump({'llm_retries_total': [[[], 3]], 'unknown_metric': [[[], 1]]}, f)
+        with override_settings(METRICS_DIR=directory):
+            LLM_RETRIES.inc()
+            text = self.scrape()
+            self.assertIn('llm_retries_total 4', text)
+            self.assertTrue(os.path.exists(os.path.join(directory, f'metrics-{os.getpid()}.json')))
+        self.assertNotIn('unknown_metric', text)
+
+
+class BusinessEventPipelineTests(TestCase):
+    def test_events_are_written_in_the_background(self):
+        import json
+        from .logging_utils import log_business_event, pipeline
+
+        with self.assertLogs('petcircle.business', 'INFO') as logs:
+            for i in range(3):
+                log_business_event('PET_LISTED', None, {'listing_id': i})
+            self.assertTrue(pipeline.flush())
+        events = [json.loads(record.getMessage()) for record in logs.records]
+        self.assertEqual([event['details']['listing_id'] for event in events], [0, 1, 2])
+        self.assertEqual(events[0]['user_email'], 'system')
+
+    def test_details_are_copied_when_queued(self):
+        import json
+        from .logging_utils import log_business_event, pipeline
+
+        details = {'listing_id': 1, 'tags': ['new']}
+        with self.assertLogs('petcircle.business', 'INFO') as logs:
+            log_business_event('PET_LISTED', None, details)
+            details['listing_id'] = 2
+            details['tags'].append('edited')
+            self.assertTrue(pipeline.flush())
+        event = json.loads(logs.records[0].getMessage())
+        self.assertEqual(event['details'], {'listing_id': 1, 'tags': ['new']})
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        import os
+        import queue
+        from .logging_utils import BusinessEventPipeline
+
+        pipeline = BusinessEventPipeline()
+        # Started without a writer thread, so nothing drains the queue
+        pipeline.pid, pipeline.queue = os.getpid(), queue.Queue(maxsize=1)
+        self.assertTrue(pipeline.submit((20, {'event_type': 'A'})))
+        self.assertFalse(pipeline.submit((20, {'event_type': 'B'})))
+        self.assertEqual(pipeline.dropped, 1)
+
+    @override_settings(BUSINESS_EVENTS_ASYNC=False, BUSINESS_EVENTS_PERSIST=True)
+    def test_events_are_persisted(self):
+        from decimal import Decimal
+        from .logging_utils import log_business_event
+        from .models import BusinessEvent
+
+        user = User.objects.create_user(email='events@example.com', password='password123')
+        with self.assertLogs('petcircle.business', 'INFO'):
+            log_business_event('SERVICE_BOOKING_CREATED', user, {'booking_id': 7, 'price': Decimal('12.50')})
+        event = BusinessEvent.objects.get()
+        self.assertEqual((event.event_type, event.actor_id), (BusinessEvent.EventType.SERVICE_BOOKING_CREATED, user.id))
+        self.assertEqual((event.object_type, event.object_id), (BusinessEvent.ObjectType.SERVICE_BOOKING, 7))
+        self.assertEqual(event.details, {'booking_id': 7, 'price': '12.50'})
+        self.assertEqual(event.partition_month, event.occurred_at.year * 100 + event.occurred_at.month)
+        with self.assertRaises(TypeError):
+            BusinessEvent.objects.filter(pk=event.pk).update(details={})
+
+    def test_old_months_are_archived_and_dropped(self):
+        import os
+        from datetime import timedelta
+        from django.utils import timezone
+        from .logging_utils import rollover_business_events
+        from .models import BusinessEvent
+
+        now = timezone.now()
+        BusinessEvent.objects.bulk_create([
+            BusinessEvent.from_log_event({'timestamp': moment, 'event_type': 'PET_LISTED', 'details': {'listing_id': 1}})
+            for moment in (now - timedelta(days=800), now - timedelta(days=800), now)
+        ])
+        old_month = BusinessEvent.objects.order_by('occurred_at').first().partition_month
+
+        archive_dir = tempfile.mkdtemp()
+        self.assertEqual(rollover_business_events(keep_months=12, archive_dir=archive_dir), {old_month: 2})
+        self.assertEqual(BusinessEvent.objects.count(), 1)
+        with open(os.path.join(archive_dir, f'business-events-{old_month}.jsonl')) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_local_memory_cache_is_not_shared(self):
+        from apps.common.checks import check_shared_cache
+        from apps.common.locks import cache_is_shared
+
+        self.assertFalse(cache_is_shared())
+        self.assertEqual([w.id for w in check_shared_cache(None)], ['common.W001'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                           'LOCATION': 'redis://localhost:6379/2'}})
+    def test_redis_cache_is_shared(self):
+        from apps.common.checks import check_shared_cache
+        from apps.common.locks import cache_is_shared
+
+        self.assertTrue(cache_is_shared())
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class PeriodicJobTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_run_records_rows_and_duration(self):
+        from apps.common.models import PeriodicJobStats
+        from apps.common.scheduler import run_job
+
+        self.assertEqual(run_job('sample', lambda: 7), 7)
+        run_job('sample', lambda: 3)
+
+        stats = PeriodicJobStats.objects.get(name='sample')
+        self.assertEqual(stats.runs, 2)
+        self.assertEqual(stats.total_rows, 10)
+        self.assertEqual(stats.last_rows, 3)
+        self.assertIsNotNone(stats.last_run_at)
+
+    def test_overlapping_run_is_skipped(self):
+        from apps.common.locks import cache_lock
+        from apps.common.scheduler import run_job
+
+        calls = []
+        with cache_lock('periodic-job:sample'):
+            self.assertIsNone(run_job('sample', lambda: calls.append(1)))
+        self.assertEqual(calls, [])
+
+    def test_update_in_batches_covers_every_row(self):
+        from apps.common.scheduler import update_in_batches
+
+        for i in range(5):
+            User.objects.create_user(email=f'batch{i}@example.com', password='password123')
+
+        def rename(user):
+            user.first_name = 'Batched'
+
+        updated = update_in_batches(User.objects.all(), ['first_name'], rename, batch_size=2)
+        self.assertEqual(updated, User.objects.count())
+        self.assertFalse(User.objects.exclude(first_name='Batched').exists())
+
+
+class ReferenceDataTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from apps.common.reference_data import clear_local
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+
+    def test_list_is_served_from_memory_after_first_load(self):
+        from apps.services.models import Species
+
+        Species.objects.create(name='Dog', slug='dog')
+        self.client.get('/api/services/species/')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/services/species/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['slug'] for row in response.data['results']], ['dog'])
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.get('/api/services/species/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_edit_invalidates_table(self):
+        from apps.common.reference_data import get_table
+        from apps.services.models import Species
+
+        species = Species.objects.create(name='Dog', slug='dog')
+        self.assertEqual(get_table('services.Species').get(species.id).name, 'Dog')
+
+        species.name = 'Canine'
+        with self.captureOnCommitCallbacks(execute=True):
+            species.save()
+            # Not reloaded before the write commits
+            self.assertEqual(get_table('services.Species').get(species.id).name, 'Dog')
+        self.assertEqual(get_table('services.Species').get(species.id).name, 'Canine')
+        self.assertEqual([row.id for row in get_table('services.Species').match('canine')], [species.id])
+
+    def test_cached_related_field_validates_ids(self):
+        from apps.common.reference_data import CachedPrimaryKeyRelatedField
+        from apps.services.models import Species
+
+        species = Species.objects.create(name='Cat', slug='cat')
+        field = CachedPrimaryKeyRelatedField(reference_model='services.Species', many=True)
+        self.assertEqual(field.run_validation([species.id]), [species])
+        with self.assertRaises(serializers.ValidationError):
+            field.run_validation([species.id + 100])
@@ -0,0 +1,260 @@
+import hashlib
+import io
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+# (offset, signature, content type). Checked in order against the first bytes of a file.
+SIGNATURES = (
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (0, b'%PDF-', 'application/pdf'),
+    (0, b'\x1a\x45\xdf\xa3', 'video/webm'),
+)
+
+# ISO base media major brands (bytes 8-12, after 'ftyp') accepted as video. HEIC, AVIF
+# and other still-image brands share the container but are not videos.
+VIDEO_BRANDS = {
+    b'isom': 'video/mp4',
+    b'iso2': 'video/mp4',
+    b'mp41': 'video/mp4',
+    b'mp42': 'video/mp4',
+    b'avc1': 'video/mp4',
+    b'M4V ': 'video/mp4',
+    b'qt  ': 'video/quicktime',
+}
+
+# content type -> (kind, extension). Anything not listed is rejected.
+ALLOWED_TYPES = {
+    'image/jpeg': ('image', 'jpg'),
+    'image/png': ('image', 'png'),
+    'image/gif': ('image', 'gif'),
+    'image/webp': ('image', 'webp'),
+    'application/pdf': ('document', 'pdf'),
+    'video/mp4': ('video', 'mp4'),
+    'video/quicktime': ('video', 'mov'),
+    'video/webm': ('video', 'webm'),
+}
+
+# Enough leading bytes for every signature above
+SNIFF_BYTES = 32
+
+
+class UploadRejected(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def sniff_content_type(head):
+    """
+    Content type from a file's first bytes, or None if it is not a known format.
+    The client's declared type and file name are never trusted.
+    """
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[4:8] == b'ftyp':
+        return VIDEO_BRANDS.get(head[8:12])
+    for offset, signature, content_type in SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return content_type
+    return None
+
+
+def check_upload(head, size):
+    """
+    Returns (content_type, extension) for an upload of `size` bytes starting with
+    `head`, or raises UploadRejected if its type is not allowed or it is too large for its kind.
+    """
+    content_type = sniff_content_type(head)
+    if content_type not in ALLOWED_TYPES:
+        raise UploadRejected("Unsupported file type.", status_code=415)
+    kind, extension = ALLOWED_TYPES[content_type]
+    limit = settings.UPLOAD_SIZE_LIMITS[kind]
+    if size > limit:
+        raise UploadRejected(f"{kind.capitalize()} files are limited to {limit // (1024 * 1024)} MB.", status_code=413)
+    return content_type, extension
+
+
+class UploadGuardHandler(FileUploadHandler):
+    """
+    Sees every multipart file chunk before it is spooled anywhere. Stops reading
+    once the body exceeds `max_size` (setting `exceeded` so the view can answer
+    413 instead of reporting a missing file) and hashes each file as it streams
+    in, so the content hash costs no extra pass. Must be the first upload handler.
+    """
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size or settings.UPLOAD_MAX_SIZE
+        self.received = 0
+        self.exceeded = False
+        self.digests = {}
+        self._hash = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > self.max_size + 64 * 1024:
+            self.exceeded = True
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.exceeded or self.received > self.max_size:
+            self.exceeded = True
+            raise StopUpload(connection_reset=False)
+        self._hash.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.digests[self.field_name] = self._hash.hexdigest()
+        return None
+
+
+def read_head(uploaded_file):
+    uploaded_file.seek(0)
+    head = uploaded_file.read(SNIFF_BYTES)
+    uploaded_file.seek(0)
+    return head
+
+
+class _StreamReader(io.RawIOBase):
+    """
+    Reads exactly `length` bytes from a request body, keeping the first bytes for sniffing.
+    """
+
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.remaining = length
+        self.read_bytes = 0
+        self.head = b''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.stream.read(size)
+        self.remaining -= len(data)
+        self.read_bytes += len(data)
+        if len(self.head) < SNIFF_BYTES:
+            self.head += data[:SNIFF_BYTES - len(self.head)]
+        if not data:
+            self.remaining = 0
+        return data
+
+
+class _ConcatenatedReader(io.RawIOBase):
+    """
+    Reads stored parts back to back, opening one at a time.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.current = None
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while True:
+            if self.current is None:
+                if not self.paths:
+                    return b''
+                self.current = default_storage.open(self.paths.pop(0), 'rb')
+            data = self.current.read(size if size is not None and size >= 0 else -1)
+            if data:
+                return data
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+        super().close()
+
+
+class HashingReader(io.RawIOBase):
+    """
+    Passes reads through from `raw`, computing the SHA-256 of everything read.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.sha256.update(data)
+        return data
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+
+def sized_file(raw, size, name):
+    content = File(raw, name=name)
+    content.size = size
+    return content
+
+
+def part_path(session, offset):
+    return f'upload-sessions/{session.id}/{offset:012d}.part'
+
+
+def write_part(session, offset, stream, length):
+    """
+    Stores `length` bytes from `stream` as the part of the session starting at
+    `offset` and returns (path, content type). The first part's bytes decide the
+    content type; later parts return None for it. The session itself is not
+    changed: the caller records the part once it has checked the offset is still current.
+    """
+    reader = _StreamReader(stream, length)
+    path = default_storage.save(part_path(session, offset), sized_file(reader, length, 'part'))
+    if reader.read_bytes != length:
+        default_storage.delete(path)
+        raise UploadRejected("Chunk was shorter than its Content-Length.")
+
+    content_type = None
+    if offset == 0:
+        try:
+            content_type, _ = check_upload(reader.head, session.total_size)
+        except UploadRejected:
+            default_storage.delete(path)
+            raise
+    return path, content_type
+
+
+def assemble(session):
+    """
+    The session's parts as one File, read part by part when stored.
+    """
+    return sized_file(_ConcatenatedReader(session.parts), session.received_size, session.filename or 'upload')
+
+
+def file_digest(content):
+    """
+    SHA-256 of a File, read in chunks.
+    """
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def discard_parts(session):
+    for path in session.parts:
+        default_storage.delete(path)
+    session.parts = []
@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import FileUploadView
+from .views import FileUploadView, UploadSessionCreateView, UploadSessionView, metrics_view
 
 urlpatterns = [
     path('upload/', FileUploadView.as_view(), name='file-upload'),
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('uploads/<uuid:pk>/', UploadSessionView.as_view(), name='upload-session'),
+    path('metrics/', metrics_view, name='metrics'),
 ]
@@ -1,45 +1,209 @@
-import os
-import uuid
-from rest_framework import views, status, parsers, permissions
-from rest_framework.response import Response
+import hmac
+
 from django.conf import settings
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-from .serializers import FileUploadSerializer
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import views, status, parsers, permissions
+from rest_framework.response import Response
+from .media import store_streamed_upload, store_upload
+from .metrics import render_text
+from .models import UploadSession
+from .serializers import FileUploadSerializer, UploadSessionCreateSerializer, UploadSessionSerializer
+from .uploads import (
+    ALLOWED_TYPES, UploadGuardHandler, UploadRejected,
+    assemble, check_upload, discard_parts, read_head, write_part,
+)
+
+# Allowance for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _base_url(request):
+    # Local dev serves media from this host, so URLs are made absolute
+    return request.build_absolute_uri('/') if settings.DEBUG else None
+
+
+def _too_large():
+    return Response({
+        "error": f"Uploads are limited to {settings.UPLOAD_MAX_SIZE // (1024 * 1024)} MB per request; "
+                 f"use a resumable upload (/api/common/uploads/) for larger files."
+    }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
 
 class FileUploadView(views.APIView):
     """
     Generic file upload endpoint.
     Accepts 'multipart/form-data' with a 'file' field.
-    Returns: {"url": "..."}
+    Returns: {"url": "..."}; identical content gets the URL of the copy already stored.
+    Resized copies of images are generated in the background.
     """
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
     permission_classes = [permissions.IsAuthenticated] # Require auth for safety
 
     def post(self, request, format=None):
+        # Refuse oversized bodies before anything is read, and stop mid-stream if the length was not declared
+        if int(request.META.get('CONTENT_LENGTH') or 0) > settings.UPLOAD_MAX_SIZE + MULTIPART_OVERHEAD:
+            return _too_large()
+        guard = UploadGuardHandler(request, settings.UPLOAD_MAX_SIZE)
+        request.upload_handlers.insert(0, guard)
+
         serializer = FileUploadSerializer(data=request.data)
+        if guard.exceeded:
+            return _too_large()
         if serializer.is_valid():
-            uploaded_file = request.FILES['file']
-            
-            # Generate a unique filename to prevent overwrites and guessing
-            ext = os.path.splitext(uploaded_file.name)[1]
-            unique_filename = f"{uuid.uuid4()}{ext}"
+            uploaded_file = serializer.validated_data['file']
+            try:
+                content_type, extension = check_upload(read_head(uploaded_file), uploaded_file.size)
+            except UploadRejected as e:
+                return Response({"error": str(e)}, status=e.status_code)
             
-            # Use Django's storage system (works with S3 if configured later, or local now)
-            file_path = default_storage.save(f"uploads/{unique_filename}", ContentFile(uploaded_file.read()))
-            
-            # Generate full URL
-            if settings.DEBUG:
-                # Local dev
-                file_url = request.build_absolute_uri(settings.MEDIA_URL + file_path)
-            else:
-                # Production (S3 or similar)
-                file_url = default_storage.url(file_path)
+            # Stored once per distinct content (works with S3 if configured later, or local now)
+            media_file = store_upload(
+                uploaded_file, uploaded_file.name, content_type, extension,
+                owner=request.user, base_url=_base_url(request), sha256=guard.digests.get('file')
+            )
                 
             return Response({
-                "url": file_url,
-                "filename": unique_filename,
-                "original_name": uploaded_file.name
+                "id": media_file.id,
+                "url": media_file.url,
+                "filename": media_file.path.rsplit('/', 1)[-1],
+                "original_name": media_file.original_name,
+                "content_type": media_file.content_type,
+                "status": media_file.status
             }, status=status.HTTP_201_CREATED)
             
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UploadSessionCreateView(views.APIView):
+    """
+    Starts a resumable upload.
+    Input: {"filename": "...", "size": <total bytes>}
+    Then PATCH each chunk as the raw request body to /uploads/<id>/ with an
+    `Upload-Offset` header equal to the bytes already received.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = UploadSessionCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = UploadSession.objects.create(
+            owner=request.user,
+            filename=serializer.validated_data.get('filename', ''),
+            total_size=serializer.validated_data['size'],
+        )
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionView(views.APIView):
+    """
+    GET: current offset, to resume after a dropped connection.
+    PATCH: append one chunk (raw body, `Upload-Offset` header). Once every byte is
+    in, an empty PATCH at the final offset retries storing the file if that failed.
+    DELETE: abort and discard the received parts.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, owner=request.user)
+        return Response(UploadSessionSerializer(session).data)
+
+    def patch(self, request, pk):
+        # The row is locked only to check and to record the offset; the chunk itself
+        # streams into storage outside any transaction
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response({"error": "Upload-Offset and Content-Length headers are required."}, status=400)
+
+        with transaction.atomic():
+            session = get_object_or_404(UploadSession.objects.select_for_update(), pk=pk, owner=request.user)
+            error = self._check_chunk(session, offset, length)
+        if error is not None:
+            return error
+
+        if length:
+            try:
+                path, content_type = write_part(session, offset, request.stream, length)
+            except UploadRejected as e:
+                if offset == 0:
+                    # Rejected on its first bytes: the file can never be accepted
+                    UploadSession.objects.filter(pk=session.pk, status='active', received_size=0).update(
+                        status='aborted', updated_at=timezone.now()
+                    )
+                return Response({"error": str(e), "offset": offset}, status=e.status_code)
+
+            with transaction.atomic():
+                session = get_object_or_404(UploadSession.objects.select_for_update(), pk=pk, owner=request.user)
+                if session.status != 'active' or session.received_size != offset:
+                    # Another request recorded this offset (or ended the upload) while the chunk was written
+                    default_storage.delete(path)
+                    return self._offset_conflict(session)
+                session.parts.append(path)
+                session.received_size += length
+                if content_type:
+                    session.content_type = content_type
+                session.save(update_fields=['parts', 'received_size', 'content_type', 'updated_at'])
+
+        if session.received_size == session.total_size:
+            self._complete(request, session)
+        return Response(UploadSessionSerializer(session).data)
+
+    def _check_chunk(self, session, offset, length):
+        if session.status != 'active' or offset != session.received_size:
+            return self._offset_conflict(session)
+        if length == 0 and offset == session.total_size:
+            # Every byte is in but the file was not stored (the last request failed): retry that
+            return None
+        if length <= 0 or length > settings.UPLOAD_CHUNK_MAX_SIZE or offset + length > session.total_size:
+            return Response({
+                "error": f"Chunks must be 1 to {settings.UPLOAD_CHUNK_MAX_SIZE} bytes and end within the file.",
+                "offset": session.received_size
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        return None
+
+    def _offset_conflict(self, session):
+        if session.status != 'active':
+            return Response({"error": f"Upload is {session.status}."}, status=status.HTTP_409_CONFLICT)
+        return Response({"error": "Offset mismatch.", "offset": session.received_size}, status=status.HTTP_409_CONFLICT)
+
+    def _complete(self, request, session):
+        # Reached by the request that recorded the last chunk (or an empty retry after it failed).
+        # The parts are read once, after the offset has been committed
+        _, extension = ALLOWED_TYPES[session.content_type]
+        media_file = store_streamed_upload(
+            assemble(session), session.filename, session.content_type, extension,
+            owner=request.user, base_url=_base_url(request)
+        )
+        if UploadSession.objects.filter(pk=session.pk, status='active').update(
+            status='complete', media_file=media_file, parts=[], updated_at=timezone.now()
+        ):
+            discard_parts(session)
+        session.refresh_from_db()
+
+    def delete(self, request, pk):
+        with transaction.atomic():
+            session = get_object_or_404(UploadSession.objects.select_for_update(), pk=pk, owner=request.user)
+            if session.status == 'active':
+                discard_parts(session)
+                session.status = 'aborted'
+                session.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def metrics_view(request):
+    """
+    Metrics of every worker process in the Prometheus text format.
+    Plain Django view so scrapers need no JWT: send METRICS_TOKEN as a bearer token.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            raise Http404
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(render_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
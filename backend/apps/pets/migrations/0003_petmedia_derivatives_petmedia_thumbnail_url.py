@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petmedia',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='petmedia',
+            name='thumbnail_url',
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+    ]
@@ -1,8 +1,39 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# Thresholds used by PetProfile.profile_is_complete
+MIN_COMPLETE_PHOTOS = 3
+MIN_COMPLETE_TRAITS = 2
+
+
+def _count_subquery(model):
+    counts = model.objects.filter(pet=OuterRef('pk')).order_by().values('pet').annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+class PetProfileQuerySet(models.QuerySet):
+    def with_completion(self):
+        """
+        Annotates media_count and trait_count so profile_is_complete needs no extra queries.
+        Uses correlated subqueries rather than joins, so the two counts don't multiply rows.
+        """
+        return self.annotate(
+            media_count=_count_subquery(PetMedia),
+            trait_count=_count_subquery(PetPersonality),
+        )
+
+    def with_details(self):
+        """
+        Loads what PetProfileSerializer renders (owner, media, traits) in a fixed
+        number of queries. profile_is_complete is then computed from the prefetched rows.
+        """
+        return self.select_related('owner').prefetch_related('media', 'traits__trait')
+
+
 class PetProfile(models.Model):
     """
     Refactored PetProfile: The canonical source of pet truth.
@@ -63,9 +94,22 @@ class PetProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PetProfileQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.species})"
 
+    def _related_count(self, relation, annotation):
+        """
+        Counts a reverse relation using, in order: a with_completion() annotation,
+        rows loaded by prefetch_related, or a COUNT query.
+        """
+        if hasattr(self, annotation):
+            return getattr(self, annotation)
+        if relation in getattr(self, '_prefetched_objects_cache', {}):
+            return len(getattr(self, relation).all())
+        return getattr(self, relation).count()
+
     @property
     def profile_is_complete(self):
         """
@@ -84,10 +128,10 @@ class PetProfile(models.Model):
         has_age = self.birth_date is not None
 
         # Check photos (minimum 3)
-        has_photos = self.media.count() >= 3
+        has_photos = self._related_count('media', 'media_count') >= MIN_COMPLETE_PHOTOS
 
         # Check personality traits (minimum 2)
-        has_traits = self.traits.count() >= 2
+        has_traits = self._related_count('traits', 'trait_count') >= MIN_COMPLETE_TRAITS
 
         return all(required_fields) and has_age and has_photos and has_traits
 
@@ -99,10 +143,16 @@ class PetMedia(models.Model):
     pet = models.ForeignKey(PetProfile, on_delete=models.CASCADE, related_name="media")
     url = models.URLField()
     delete_url = models.URLField(max_length=500, blank=True, null=True)
+    # Resized copies, filled in once the upload's derivatives exist (see apps.common.media)
+    thumbnail_url = models.URLField(max_length=500, blank=True, null=True)
+    derivatives = models.JSONField(default=dict, blank=True)
     is_primary = models.BooleanField(default=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def save(self, *args, **kwargs):
+        if self._state.adding and not self.thumbnail_url:
+            from apps.common.media import attach_derivatives
+            attach_derivatives([self], 'url')
         if self.is_primary:
             # Demote others
             PetMedia.objects.filter(pet=self.pet, is_primary=True).update(is_primary=False)
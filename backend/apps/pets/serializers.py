@@ -1,5 +1,9 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Case, When, Value
 from .models import PetProfile, PetMedia, PersonalityTrait, PetPersonality
+from apps.common.media import attach_derivatives, count_references
+from apps.common.reference_data import invalidate
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -12,7 +16,8 @@ class PetOwnerSimpleSerializer(serializers.ModelSerializer):
 class PetMediaSerializer(serializers.ModelSerializer):
     class Meta:
         model = PetMedia
-        fields = ['id', 'url', 'delete_url', 'is_primary', 'uploaded_at']
+        fields = ['id', 'url', 'delete_url', 'thumbnail_url', 'derivatives', 'is_primary', 'uploaded_at']
+        read_only_fields = ['thumbnail_url', 'derivatives']
 
 class PersonalityTraitSerializer(serializers.ModelSerializer):
     class Meta:
@@ -67,6 +72,7 @@ class PetProfileCreateUpdateSerializer(serializers.ModelSerializer):
             'description', 'traits', 'media_data', 'status'
         ]
 
+    @transaction.atomic
     def create(self, validated_data):
         traits_data = validated_data.pop('traits', [])
         media_data = validated_data.pop('media_data', [])
@@ -78,6 +84,7 @@ class PetProfileCreateUpdateSerializer(serializers.ModelSerializer):
         
         return pet
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         traits_data = validated_data.pop('traits', None)
         media_data = validated_data.pop('media_data', None)
@@ -95,21 +102,71 @@ class PetProfileCreateUpdateSerializer(serializers.ModelSerializer):
         return instance
 
     def _assign_traits(self, pet, traits_list):
-        pet.traits.all().delete() 
-        for trait_name in traits_list:
-            trait_obj, _ = PersonalityTrait.objects.get_or_create(name=trait_name)
-            PetPersonality.objects.create(pet=pet, trait=trait_obj)
+        """
+        Makes the pet's traits exactly `traits_list` (names), creating unknown
+        trait names. Only the difference to the current set is written.
+        """
+        names = list(dict.fromkeys(traits_list))
+        traits = dict(PersonalityTrait.objects.filter(name__in=names).values_list('name', 'id'))
+
+        missing = [name for name in names if name not in traits]
+        if missing:
+            PersonalityTrait.objects.bulk_create(
+                [PersonalityTrait(name=name) for name in missing], ignore_conflicts=True
+            )
+            # ignore_conflicts leaves primary keys unset, so read the new ids back
+            traits.update(PersonalityTrait.objects.filter(name__in=missing).values_list('name', 'id'))
+            # bulk_create sends no post_save; reload the trait registry once this commits
+            invalidate('pets.PersonalityTrait')
+
+        wanted = {traits[name] for name in names}
+        current = set(pet.traits.values_list('trait_id', flat=True))
+
+        if current - wanted:
+            pet.traits.filter(trait_id__in=current - wanted).delete()
+        if wanted - current:
+            PetPersonality.objects.bulk_create(
+                [PetPersonality(pet=pet, trait_id=trait_id) for trait_id in wanted - current],
+                ignore_conflicts=True
+            )
 
     def _assign_media(self, pet, media_list):
+        """
+        Syncs the pet's photos to `media_list`, matched by URL; the first item is primary.
+        An empty list leaves existing media untouched.
+        """
         # Expecting [{"url": "...", "delete_url": "..."?}, ...]
         if not media_list:
             return
 
-        pet.media.all().delete()
-        for idx, item in enumerate(media_list):
-            PetMedia.objects.create(
-                pet=pet, 
-                url=item.get('url'),
-                delete_url=item.get('delete_url'),
-                is_primary=(idx == 0)
-            )
+        items = {}
+        for item in media_list:
+            items.setdefault(item.get('url'), item)
+
+        current = {media.url: media for media in pet.media.all()}
+
+        stale_ids = [media.id for url, media in current.items() if url not in items]
+        if stale_ids:
+            PetMedia.objects.filter(id__in=stale_ids).delete()
+
+        changed = []
+        for url, item in items.items():
+            media = current.get(url)
+            if media is not None and media.delete_url != item.get('delete_url'):
+                media.delete_url = item.get('delete_url')
+                changed.append(media)
+        if changed:
+            PetMedia.objects.bulk_update(changed, ['delete_url'])
+
+        # bulk_create skips PetMedia.save() and signals, so derivatives and file references
+        # are handled here and primary is set once below
+        new_media = [
+            PetMedia(pet=pet, url=url, delete_url=item.get('delete_url'), is_primary=False)
+            for url, item in items.items() if url not in current
+        ]
+        attach_derivatives(new_media, 'url')
+        PetMedia.objects.bulk_create(new_media)
+        count_references([media.url for media in new_media], 1)
+
+        primary_url = next(iter(items))
+        pet.media.update(is_primary=Case(When(url=primary_url, then=Value(True)), default=Value(False)))
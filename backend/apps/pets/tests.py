@@ -0,0 +1,100 @@
+import datetime
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from apps.pets.models import PetProfile, PetMedia, PersonalityTrait, PetPersonality
+
+User = get_user_model()
+
+
+class PetProfileCompletionTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', password='password123')
+        traits = [PersonalityTrait.objects.create(name=name) for name in ('Calm', 'Playful')]
+        for i in range(3):
+            pet = PetProfile.objects.create(
+                owner=self.owner, name=f'Pet {i}', species='dog', breed='Mixed', gender='male',
+                description='Friendly', birth_date=datetime.date(2020, 1, 1)
+            )
+            for n in range(3):
+                PetMedia.objects.create(pet=pet, url=f'https://example.com/{i}/{n}.jpg')
+            for trait in traits[:i]:
+                PetPersonality.objects.create(pet=pet, trait=trait)
+
+    def _expected(self):
+        return {'Pet 0': False, 'Pet 1': False, 'Pet 2': True}
+
+    def test_with_completion_annotates_counts(self):
+        with self.assertNumQueries(1):
+            flags = {pet.name: pet.profile_is_complete for pet in PetProfile.objects.with_completion()}
+        self.assertEqual(flags, self._expected())
+
+    def test_prefetched_relations_are_used(self):
+        with self.assertNumQueries(4):
+            flags = {pet.name: pet.profile_is_complete for pet in PetProfile.objects.with_details()}
+        self.assertEqual(flags, self._expected())
+
+    def test_pet_list_queries_do_not_grow_per_row(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        with self.assertNumQueries(5):
+            response = client.get('/api/pets/profiles/')
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual({pet['name']: pet['profile_is_complete'] for pet in results}, self._expected())
+
+
+class PetProfileAssignmentTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        response = self.client.post('/api/pets/profiles/', {
+            'name': 'Rex', 'species': 'dog', 'gender': 'male',
+            'traits': ['Calm', 'Playful'],
+            'media_data': [{'url': 'https://example.com/a.jpg'}, {'url': 'https://example.com/b.jpg'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.pet = PetProfile.objects.get(id=response.data['id'])
+
+    def _state(self):
+        traits = set(self.pet.traits.values_list('trait__name', flat=True))
+        media = dict(self.pet.media.values_list('url', 'is_primary'))
+        return traits, media
+
+    def test_create_assigns_traits_and_primary_media(self):
+        traits, media = self._state()
+        self.assertEqual(traits, {'Calm', 'Playful'})
+        self.assertEqual(media, {'https://example.com/a.jpg': True, 'https://example.com/b.jpg': False})
+
+    def test_update_only_writes_the_difference(self):
+        calm_link = self.pet.traits.get(trait__name='Calm')
+        kept_media = self.pet.media.get(url='https://example.com/b.jpg')
+
+        response = self.client.patch(f'/api/pets/profiles/{self.pet.id}/', {
+            'traits': ['Calm', 'Shy', 'Shy'],
+            'media_data': [{'url': 'https://example.com/b.jpg'}, {'url': 'https://example.com/c.jpg'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        traits, media = self._state()
+        self.assertEqual(traits, {'Calm', 'Shy'})
+        self.assertEqual(media, {'https://example.com/b.jpg': True, 'https://example.com/c.jpg': False})
+        # Unchanged rows are kept rather than deleted and recreated
+        self.assertTrue(self.pet.traits.filter(id=calm_link.id).exists())
+        self.assertTrue(self.pet.media.filter(id=kept_media.id).exists())
+
+    def test_new_traits_appear_in_trait_list(self):
+        def trait_names():
+            data = self.client.get('/api/pets/traits/').data
+            return {row['name'] for row in data.get('results', data) if isinstance(row, dict)}
+
+        self.assertEqual(trait_names(), {'Calm', 'Playful'})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/pets/profiles/', {
+                'name': 'Bo', 'species': 'dog', 'gender': 'male', 'traits': ['Calm', 'Friendly'],
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(trait_names(), {'Calm', 'Playful', 'Friendly'})
@@ -2,7 +2,7 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from django.db.models import Q
-from .models import PetProfile, PetMedia, PersonalityTrait
+from .models import PetProfile, PetMedia
 from .serializers import (
     PetProfileSerializer, 
     PetProfileCreateUpdateSerializer, 
@@ -10,6 +10,7 @@ from .serializers import (
     PersonalityTraitSerializer
 )
 from apps.users.permissions import IsOwnerOrReadOnly
+from apps.common.reference_data import ReferenceDataViewMixin
 
 class PetProfileListCreateView(generics.ListCreateAPIView):
     """
@@ -23,7 +24,7 @@ class PetProfileListCreateView(generics.ListCreateAPIView):
         return PetProfileSerializer
 
     def get_queryset(self):
-        queryset = PetProfile.objects.filter(owner=self.request.user)
+        queryset = PetProfile.objects.filter(owner=self.request.user).with_details()
         
         exclude_active = self.request.query_params.get('exclude_active_listings')
         if exclude_active == 'true':
@@ -57,7 +58,7 @@ class PetProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         user = self.request.user
         # Fix: use status='active' instead of is_active=True
-        return PetProfile.objects.filter(Q(status='active') | Q(owner=user))
+        return PetProfile.objects.filter(Q(status='active') | Q(owner=user)).with_details()
 
 
 class PetMediaCreateView(generics.CreateAPIView):
@@ -93,10 +94,10 @@ class PetMediaDetailView(generics.DestroyAPIView):
         return PetMedia.objects.filter(pet__owner=self.request.user)
 
 
-class PersonalityTraitListView(generics.ListAPIView):
+class PersonalityTraitListView(ReferenceDataViewMixin, generics.ListAPIView):
     """
     List all available personality traits.
     """
-    queryset = PersonalityTrait.objects.all()
+    reference_model = 'pets.PersonalityTrait'
     serializer_class = PersonalityTraitSerializer
     permission_classes = [permissions.AllowAny]
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
-from .models import RehomingListing, RehomingRequest, AdoptionInquiry
+from .models import RehomingListing, RehomingRequest, AdoptionInquiry, AIResponseCache, AIResponseCacheStats
 
 @admin.register(RehomingRequest)
 class RehomingRequestAdmin(ModelAdmin):
@@ -19,3 +19,14 @@ class AdoptionInquiryAdmin(ModelAdmin):
     list_display = ('listing', 'requester', 'status', 'created_at')
     list_filter = ('status',)
     search_fields = ('listing__pet__name', 'requester__email')
+
+@admin.register(AIResponseCache)
+class AIResponseCacheAdmin(ModelAdmin):
+    list_display = ('prompt_hash', 'model_name', 'hit_count', 'last_accessed_at', 'expires_at')
+    search_fields = ('prompt_hash',)
+    readonly_fields = ('prompt_hash', 'model_name', 'response_text', 'hit_count', 'created_at', 'last_accessed_at')
+
+@admin.register(AIResponseCacheStats)
+class AIResponseCacheStatsAdmin(ModelAdmin):
+    list_display = ('day', 'hits', 'misses')
+    readonly_fields = ('day', 'hits', 'misses')
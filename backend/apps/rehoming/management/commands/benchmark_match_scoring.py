@@ -0,0 +1,91 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.rehoming.models import AdoptionInquiry
+from apps.rehoming.services.match_scoring import scoring_queryset, prescore_inquiries
+
+
+def _band(score):
+    if score < settings.MATCH_PRESCORE_LOW:
+        return 'low'
+    if score > settings.MATCH_PRESCORE_HIGH:
+        return 'high'
+    return 'borderline'
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the local match pre-scorer against LLM match scores. By default only inquiries '
+        'that already have a stored LLM score are sampled; since the pre-scorer sends only borderline '
+        'inquiries to the LLM, that sample is biased toward the borderline band. Use --live for an '
+        'unbiased sample of recent inquiries (one LLM call each).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=500, help='Number of inquiries to sample')
+        parser.add_argument('--tolerance', type=int, default=15, help='Max point difference counted as agreement')
+        parser.add_argument(
+            '--live', action='store_true',
+            help='Sample the most recent inquiries regardless of how they were scored and call the LLM for each'
+        )
+
+    def handle(self, *args, **options):
+        queryset = AdoptionInquiry.objects.order_by('-id')
+        if not options['live']:
+            queryset = queryset.filter(match_source='llm')
+        inquiries = list(scoring_queryset(queryset)[:options['limit']])
+
+        if not inquiries:
+            self.stdout.write(self.style.WARNING('No inquiries with LLM scores to compare against.'))
+            return
+
+        started = time.perf_counter()
+        results = prescore_inquiries(inquiries)
+        prescore_seconds = time.perf_counter() - started
+
+        llm_scores = {}
+        llm_seconds = 0.0
+        if options['live']:
+            from apps.rehoming.services.ai_service import calculate_match_score, AIServiceError
+            from apps.rehoming.tasks import build_match_context
+            for inquiry in inquiries:
+                pet_data, applicant_data = build_match_context(inquiry)
+                started = time.perf_counter()
+                try:
+                    llm_scores[inquiry.id] = calculate_match_score(pet_data, applicant_data, inquiry.message)
+                except AIServiceError:
+                    continue
+                finally:
+                    llm_seconds += time.perf_counter() - started
+            results = [r for r in results if r.inquiry_id in llm_scores]
+            if not results:
+                self.stdout.write(self.style.ERROR('The LLM did not return any scores.'))
+                return
+        else:
+            llm_scores = {inquiry.id: inquiry.match_percentage for inquiry in inquiries}
+
+        total = len(results)
+        diffs = [abs(r.score - llm_scores[r.inquiry_id]) for r in results]
+        within = sum(1 for d in diffs if d <= options['tolerance'])
+        band_agreement = sum(1 for r in results if _band(r.score) == _band(llm_scores[r.inquiry_id]))
+        decisive = [r for r in results if r.decisive]
+        decisive_agreement = sum(1 for r in decisive if _band(r.score) == _band(llm_scores[r.inquiry_id]))
+
+        if not options['live']:
+            self.stdout.write(self.style.WARNING(
+                'Sample is limited to inquiries scored by the LLM, which are mostly borderline cases; '
+                'agreement on clear-cut inquiries is not measured. Run with --live for an unbiased sample.'
+            ))
+        self.stdout.write(f'Sampled inquiries:          {total}')
+        self.stdout.write(f'Mean absolute difference:   {sum(diffs) / total:.1f} points')
+        self.stdout.write(f'Within +/-{options["tolerance"]} points:       {within / total:.1%}')
+        self.stdout.write(f'Same band (low/border/high): {band_agreement / total:.1%}')
+        self.stdout.write(
+            f'Decided locally:            {len(decisive) / total:.1%} '
+            f'(band agreement {decisive_agreement / len(decisive):.1%})' if decisive else
+            'Decided locally:            0.0%'
+        )
+        self.stdout.write(f'Pre-score time:             {prescore_seconds * 1000 / total:.3f} ms/inquiry')
+        if options['live']:
+            self.stdout.write(f'LLM time:                   {llm_seconds * 1000 / total:.1f} ms/inquiry')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from apps.rehoming.services.ai_cache import prune_cache, get_cache_stats
+
+class Command(BaseCommand):
+    help = 'Prunes expired and least recently used AI response cache entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-entries', type=int, default=None, help='Override AI_RESPONSE_CACHE_MAX_ENTRIES')
+        parser.add_argument('--stats', action='store_true', help='Only print cache hit-rate statistics')
+        parser.add_argument('--days', type=int, default=None, help='Hit rate over the last N days (default: all)')
+
+    def handle(self, *args, **options):
+        if not options['stats']:
+            expired, evicted = prune_cache(max_entries=options['max_entries'])
+            self.stdout.write(self.style.SUCCESS(f'Removed {expired} expired and {evicted} evicted cache entries.'))
+
+        stats = get_cache_stats(days=options['days'])
+        self.stdout.write(
+            f"Entries: {stats['entries']} | Hits: {stats['hits']} | Misses: {stats['misses']} | "
+            f"Hit rate: {stats['hit_rate']:.1%}"
+        )
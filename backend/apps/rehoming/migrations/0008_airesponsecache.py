@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rehoming', '0007_adoptioninquiry_ai_processed_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIResponseCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prompt_hash', models.CharField(max_length=64, unique=True)),
+                ('model_name', models.CharField(max_length=100)),
+                ('response_text', models.TextField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'AI Response Cache Entry',
+                'verbose_name_plural': 'AI Response Cache',
+                'indexes': [models.Index(fields=['expires_at'], name='rehoming_ai_expires_e7f065_idx'), models.Index(fields=['last_accessed_at'], name='rehoming_ai_last_ac_2e6f33_idx')],
+            },
+        ),
+    ]
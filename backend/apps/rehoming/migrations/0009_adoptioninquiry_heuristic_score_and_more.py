@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rehoming', '0008_airesponsecache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adoptioninquiry',
+            name='heuristic_score',
+            field=models.IntegerField(blank=True, help_text='Local pre-score (0-100), kept for comparison with the LLM', null=True),
+        ),
+        migrations.AddField(
+            model_name='adoptioninquiry',
+            name='match_source',
+            field=models.CharField(blank=True, choices=[('heuristic', 'Heuristic Pre-Score'), ('llm', 'LLM Analysis')], help_text='Which scorer produced match_percentage', max_length=20),
+        ),
+    ]
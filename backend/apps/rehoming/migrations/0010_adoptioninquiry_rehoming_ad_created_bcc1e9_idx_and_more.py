@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0002_initial'),
+        ('rehoming', '0009_adoptioninquiry_heuristic_score_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adoptioninquiry',
+            index=models.Index(fields=['created_at'], name='rehoming_ad_created_bcc1e9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rehominglisting',
+            index=models.Index(fields=['created_at'], name='rehoming_re_created_c54c80_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rehominglisting',
+            index=models.Index(fields=['rehomed_at'], name='rehoming_re_rehomed_e6b62d_idx'),
+        ),
+    ]
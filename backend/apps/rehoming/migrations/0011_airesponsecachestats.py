@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rehoming', '0010_adoptioninquiry_rehoming_ad_created_bcc1e9_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIResponseCacheStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('misses', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'AI Response Cache Stats',
+                'verbose_name_plural': 'AI Response Cache Stats',
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+from django.db.models import F
+
+
+def backfill(apps, schema_editor):
+    # Status changes did not record their timestamps; the last update is the best estimate
+    RehomingListing = apps.get_model('rehoming', 'RehomingListing')
+    RehomingListing.objects.filter(status='closed', closed_at__isnull=True).update(closed_at=F('updated_at'))
+    RehomingListing.objects.filter(status='paused', paused_at__isnull=True).update(paused_at=F('updated_at'))
+    RehomingListing.objects.filter(status='rehomed', rehomed_at__isnull=True).update(rehomed_at=F('updated_at'))
+    RehomingListing.objects.exclude(status='paused').filter(paused_at__isnull=False).update(paused_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rehoming', '0011_airesponsecachestats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -139,7 +139,7 @@ class RehomingListing(models.Model):
         return new_status in self.STATUS_TRANSITIONS.get(self.status, [])
     
     def save(self, *args, **kwargs):
-        """Validate status transitions before saving"""
+        """Validate status transitions and record their timestamps before saving"""
         if self.pk:  # Existing object
             try:
                 old_instance = RehomingListing.objects.get(pk=self.pk)
@@ -149,9 +149,35 @@ class RehomingListing(models.Model):
                         raise ValidationError(
                             f"Cannot transition from '{old_instance.status}' to '{self.status}'"
                         )
+                    changed = self._stamp_status_change()
+                    if kwargs.get('update_fields') is not None and changed:
+                        kwargs['update_fields'] = {*kwargs['update_fields'], *changed}
             except RehomingListing.DoesNotExist:
                 pass # Should not happen if self.pk exists
         super().save(*args, **kwargs)
+
+    def _stamp_status_change(self):
+        """
+        Keeps the timeline fields in step with the new status (the analytics
+        rollup reconstructs past days from them). paused_at is only set while
+        the listing is paused. Returns the names of the fields changed.
+        """
+        from django.utils import timezone
+        now = timezone.now()
+        changed = []
+        if self.status == 'paused':
+            self.paused_at = now
+            changed.append('paused_at')
+        elif self.paused_at is not None:
+            self.paused_at = None
+            changed.append('paused_at')
+        if self.status == 'closed' and self.closed_at is None:
+            self.closed_at = now
+            changed.append('closed_at')
+        if self.status == 'rehomed' and self.rehomed_at is None:
+            self.rehomed_at = now
+            changed.append('rehomed_at')
+        return changed
     
     # Copy key fields from request (for query performance)
     reason = models.TextField()
@@ -188,6 +214,8 @@ class RehomingListing(models.Model):
             models.Index(fields=['status', 'urgency']),
             models.Index(fields=['location_state', 'status']),
             models.Index(fields=['published_at']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['rehomed_at']),
         ]
     
     def __str__(self):
@@ -238,11 +266,67 @@ class AdoptionInquiry(models.Model):
     match_percentage = models.IntegerField(default=0, help_text="AI Calculated match percentage (0-100)")
     ai_processed = models.BooleanField(default=False, help_text="Whether this application has been analyzed by AI")
 
+    MATCH_SOURCE_CHOICES = [
+        ('heuristic', 'Heuristic Pre-Score'),
+        ('llm', 'LLM Analysis'),
+    ]
+    match_source = models.CharField(max_length=20, choices=MATCH_SOURCE_CHOICES, blank=True, help_text="Which scorer produced match_percentage")
+    heuristic_score = models.IntegerField(null=True, blank=True, help_text="Local pre-score (0-100), kept for comparison with the LLM")
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('listing', 'requester') 
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
 
     def __str__(self):
         return f"Inquiry by {self.requester.email} for {self.listing.pet.name}"
+
+
+class AIResponseCache(models.Model):
+    """
+    Content-addressed cache of Gemini responses.
+    Keyed by a hash of the (normalized) prompt and model name, so retries and
+    repeated prompts reuse the stored answer instead of calling the model again.
+    Lives in the database so it survives worker restarts and Redis flushes.
+    """
+    prompt_hash = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=100)
+    response_text = models.TextField()
+
+    hit_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "AI Response Cache Entry"
+        verbose_name_plural = "AI Response Cache"
+        indexes = [
+            models.Index(fields=['expires_at']),
+            models.Index(fields=['last_accessed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} response {self.prompt_hash[:12]}"
+
+
+class AIResponseCacheStats(models.Model):
+    """
+    Daily hit/miss counters of the AI response cache, kept in the database so
+    every web and Celery process (and prune_ai_cache) sees the same totals.
+    """
+    day = models.DateField(unique=True)
+    hits = models.PositiveIntegerField(default=0)
+    misses = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "AI Response Cache Stats"
+        verbose_name_plural = "AI Response Cache Stats"
+
+    def __str__(self):
+        return f"{self.day}: {self.hits} hits, {self.misses} misses"
@@ -10,13 +10,14 @@ class PetSnapshotSerializer(serializers.ModelSerializer):
     traits = serializers.SerializerMethodField()
     age_display = serializers.SerializerMethodField()
     main_photo = serializers.SerializerMethodField()
+    main_photo_thumbnail = serializers.SerializerMethodField()
     photos = serializers.SerializerMethodField()
 
     class Meta:
         model = PetProfile
         fields = [
             'id', 'name', 'species', 'breed', 'gender', 'age_display', 
-            'main_photo', 'photos', 'status',
+            'main_photo', 'main_photo_thumbnail', 'photos', 'status',
             'size_category', 'weight_kg', 'spayed_neutered', 'microchipped', 
             'description', 'traits'
         ]
@@ -33,18 +34,29 @@ class PetSnapshotSerializer(serializers.ModelSerializer):
             return f"{age_years} years"
         return "Unknown"
 
+    def _main_media(self, obj):
+        # Primary photo, else the oldest; looked up once per pet (and from prefetched media when present)
+        if not hasattr(obj, '_main_media'):
+            media = list(obj.media.all())
+            primary = next((m for m in media if m.is_primary), None)
+            obj._main_media = primary or (min(media, key=lambda m: m.pk) if media else None)
+        return obj._main_media
+
     def get_main_photo(self, obj):
-        main = obj.media.filter(is_primary=True).first()
-        if main:
-            return main.url
-        any_photo = obj.media.first()
-        return any_photo.url if any_photo else None
+        main = self._main_media(obj)
+        return main.url if main else None
+
+    def get_main_photo_thumbnail(self, obj):
+        """Resized copy for list cards; the original until derivatives exist"""
+        main = self._main_media(obj)
+        return (main.thumbnail_url or main.url) if main else None
 
     def get_photos(self, obj):
         """Return all photos for gallery"""
         return [
             {
                 'url': media.url,
+                'thumbnail_url': media.thumbnail_url or media.url,
                 'is_primary': media.is_primary
             }
             for media in obj.media.all().order_by('-is_primary', 'uploaded_at')
@@ -0,0 +1,180 @@
+import atexit
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.common.metrics import record_cache_lookup
+from apps.rehoming.models import AIResponseCache, AIResponseCacheStats
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def prompt_hash(prompt, model_name):
+    """
+    Returns the cache key for a prompt.
+    Whitespace is collapsed first so re-indented or re-wrapped prompts share an entry.
+    """
+    normalized = _WHITESPACE_RE.sub(' ', prompt).strip()
+    return hashlib.sha256(f"{model_name}\n{normalized}".encode('utf-8')).hexdigest()
+
+
+class _LookupCounters:
+    """
+    Hit/miss counts and per-entry hits of this process, written with a few F()
+    updates at most every AI_RESPONSE_CACHE_FLUSH_INTERVAL seconds instead of
+    two UPDATEs per lookup. Counts not yet flushed are lost if the process dies.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entry_hits = Counter()
+        self.totals = Counter()
+        self.last_flush = time.monotonic()
+
+    def add(self, entry_id=None):
+        with self.lock:
+            if entry_id is None:
+                self.totals['misses'] += 1
+            else:
+                self.totals['hits'] += 1
+                self.entry_hits[entry_id] += 1
+            due = time.monotonic() - self.last_flush >= settings.AI_RESPONSE_CACHE_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            entry_hits, self.entry_hits = self.entry_hits, Counter()
+            totals, self.totals = self.totals, Counter()
+            self.last_flush = time.monotonic()
+
+        now = timezone.now()
+        # One UPDATE per distinct hit count, usually just one
+        by_count = defaultdict(list)
+        for entry_id, hits in entry_hits.items():
+            by_count[hits].append(entry_id)
+        for hits, entry_ids in by_count.items():
+            AIResponseCache.objects.filter(id__in=entry_ids).update(
+                hit_count=F('hit_count') + hits, last_accessed_at=now
+            )
+        if totals:
+            _add_stats(totals)
+
+    def clear(self):
+        with self.lock:
+            self.entry_hits.clear()
+            self.totals.clear()
+
+
+def _add_stats(totals):
+    # One counter row per day, shared by every process through the database
+    day = timezone.localdate()
+    increments = {field: F(field) + count for field, count in totals.items()}
+    if AIResponseCacheStats.objects.filter(day=day).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            AIResponseCacheStats.objects.create(day=day, **totals)
+    except IntegrityError:
+        # Another process created today's row first
+        AIResponseCacheStats.objects.filter(day=day).update(**increments)
+
+
+lookup_counters = _LookupCounters()
+atexit.register(lookup_counters.flush)
+
+
+def get_cached_response(prompt, model_name):
+    """
+    Returns the stored response for this prompt, or None on a miss.
+    """
+    key = prompt_hash(prompt, model_name)
+
+    entry = (
+        AIResponseCache.objects
+        .filter(prompt_hash=key, expires_at__gt=timezone.now())
+        .only('id', 'response_text')
+        .first()
+    )
+    lookup_counters.add(entry.id if entry is not None else None)
+    record_cache_lookup('ai_response', hit=entry is not None)
+    return entry.response_text if entry is not None else None
+
+
+def store_response(prompt, model_name, response_text):
+    """
+    Saves a model response. The size limit is enforced by the periodic
+    prune-ai-response-cache job, not on every store.
+    """
+    now = timezone.now()
+    AIResponseCache.objects.update_or_create(
+        prompt_hash=prompt_hash(prompt, model_name),
+        defaults={
+            'model_name': model_name,
+            'response_text': response_text,
+            'last_accessed_at': now,
+            'expires_at': now + timedelta(seconds=settings.AI_RESPONSE_CACHE_TTL),
+        }
+    )
+
+
+def prune_cache(max_entries=None):
+    """
+    Deletes expired entries, then the least recently used ones above `max_entries`.
+    Returns (expired_count, evicted_count).
+    """
+    if max_entries is None:
+        max_entries = settings.AI_RESPONSE_CACHE_MAX_ENTRIES
+
+    expired_count, _ = AIResponseCache.objects.filter(expires_at__lte=timezone.now()).delete()
+
+    evicted_count = 0
+    overflow = AIResponseCache.objects.count() - max_entries
+    if overflow > 0:
+        stale_ids = list(
+            AIResponseCache.objects.order_by('last_accessed_at', 'id').values_list('id', flat=True)[:overflow]
+        )
+        evicted_count, _ = AIResponseCache.objects.filter(id__in=stale_ids).delete()
+
+    if expired_count or evicted_count:
+        logger.info(f"AI response cache pruned: {expired_count} expired, {evicted_count} evicted")
+
+    return expired_count, evicted_count
+
+
+def get_cache_stats(days=None):
+    """
+    Returns hit/miss counters and the hit rate (0.0 - 1.0), over the last
+    `days` days or since the counters were last reset. This process's unflushed
+    counts are written first; other processes' appear after their next flush.
+    """
+    lookup_counters.flush()
+    counters = AIResponseCacheStats.objects.all()
+    if days:
+        counters = counters.filter(day__gt=timezone.localdate() - timedelta(days=days))
+    totals = counters.aggregate(hits=Sum('hits'), misses=Sum('misses'))
+    hits = totals['hits'] or 0
+    misses = totals['misses'] or 0
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+        'entries': AIResponseCache.objects.count(),
+    }
+
+
+def reset_cache_stats():
+    lookup_counters.clear()
+    AIResponseCacheStats.objects.all().delete()
@@ -1,6 +1,22 @@
 import google.generativeai as genai
 from decouple import config
 import json
+import logging
+import re
+import time
+from google.api_core import exceptions
+
+from apps.common import metrics
+
+from .ai_cache import get_cached_response, store_response
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'gemini-flash-latest'
+
+
+class AIServiceError(Exception):
+    """Raised when Gemini could not produce a response after all retries."""
 
 # Setup API Key
 api_key = config('GEMINI_API_KEY', default=None)
@@ -9,6 +25,47 @@ if api_key:
 else:
     print("Warning: GEMINI_API_KEY not found in environment variables.")
 
+
+def _generate_content(prompt, use_cache=True):
+    """
+    Sends a prompt to Gemini, reusing a cached response for identical prompts.
+    Retries rate-limit errors (429) up to 4 times with linear backoff.
+    Returns the raw response text, or None if the model could not be reached.
+    """
+    if use_cache:
+        cached = get_cached_response(prompt, MODEL_NAME)
+        if cached is not None:
+            return cached
+
+    started = time.perf_counter()
+    outcome = 'rate_limited'
+    for attempt in range(4):
+        if attempt:
+            metrics.LLM_RETRIES.inc()
+        try:
+            # Using stable flash model for better reliability
+            model = genai.GenerativeModel(MODEL_NAME)
+            response = model.generate_content(prompt)
+            text = response.text
+            metrics.LLM_DURATION.observe(time.perf_counter() - started, outcome='success')
+            if use_cache:
+                store_response(prompt, MODEL_NAME, text)
+            return text
+
+        except exceptions.ResourceExhausted:
+            wait_time = 3 * (attempt + 1)
+            time.sleep(wait_time)
+            continue
+
+        except Exception as e:
+            # For other errors, log and break to the caller's fallback
+            logger.error(f"Gemini Error: {e}")
+            outcome = 'error'
+            break
+
+    metrics.LLM_DURATION.observe(time.perf_counter() - started, outcome=outcome)
+    return None
+
 def generate_application_content(user, listing, form_data):
     """
     Generates a personalized adoption application using Google Gemini.
@@ -64,27 +121,10 @@ def generate_application_content(user, listing, form_data):
     - Keep it under 300 words.
     """
     
-    # Retry logic for Rate Limits (429)
-    # Try up to 4 times with exponential backoff
-    import time
-    from google.api_core import exceptions
-    
-    for attempt in range(4):
-        try:
-            # Using stable flash model for better reliability
-            model = genai.GenerativeModel('gemini-flash-latest')
-            response = model.generate_content(prompt)
-            return response.text.replace('**', '').strip() 
-            
-        except exceptions.ResourceExhausted:
-            wait_time = 3 * (attempt + 1)
-            time.sleep(wait_time)
-            continue
-            
-        except Exception:
-            # For other errors, log (optionally) and break to fallback
-            break
-            
+    text = _generate_content(prompt)
+    if text is not None:
+        return text.replace('**', '').strip()
+
     # Fallback to a basic template if all retries fail
     return f"Dear {owner_name},\n\nI am writing to apply for {pet_name}. I have reviewed the profile and believe I can provide a loving home. I live in a {living.get('home_type')} and have a plan for daily care. I look forward to hearing from you.\n\nSincerely,\n{applicant_name}"
 
@@ -93,12 +133,9 @@ def calculate_match_score(pet_details, applicant_details, message):
     """
     Analyzes the match between a pet and an applicant.
     Returns: integer percentage (0-100)
+    Raises AIServiceError if the model is unreachable, so callers can retry
+    instead of storing a bogus score.
     """
-    
-    # Retry logic details...
-    import time
-    from google.api_core import exceptions
-    
     prompt = f"""
     You are an expert pet adoption counselor. Evaluate the compatibility between this pet and the applicant.
     
@@ -122,24 +159,12 @@ def calculate_match_score(pet_details, applicant_details, message):
     Just the number. Nothing else.
     """
 
-    for attempt in range(4):
-        try:
-            model = genai.GenerativeModel('gemini-flash-latest')
-            response = model.generate_content(prompt)
-            text = response.text.strip()
-            # Extract number
-            import re
-            match = re.search(r'\d+', text)
-            if match:
-                return int(match.group())
-            return 50 # Default if no number found
-            
-        except exceptions.ResourceExhausted:
-            wait_time = 3 * (attempt + 1)
-            time.sleep(wait_time)
-            continue
-        except Exception as e:
-            print(f"Match Analysis Error: {e}")
-            break
-            
-    return 0 # Error default
+    text = _generate_content(prompt)
+    if text is None:
+        raise AIServiceError("Match analysis failed: no response from Gemini.")
+
+    # Extract number
+    match = re.search(r'\d+', text.strip())
+    if match:
+        return int(match.group())
+    return 50 # Default if no number found
@@ -0,0 +1,186 @@
+import math
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+# Weight of each feature column in the final 0-100 score. Must sum to 100.
+FEATURE_WEIGHTS = (
+    ('verification', 25),
+    ('profile', 15),
+    ('distance', 25),
+    ('species_size', 20),
+    ('traits', 15),
+)
+
+# Applicants within NEAR_KM of the listing get full distance credit, beyond FAR_KM none.
+NEAR_KM = 25.0
+FAR_KM = 500.0
+
+SIZE_RANK = {'small': 0, 'medium': 1, 'large': 2}
+
+# Compatibility traits keyed by the species they refer to
+GOOD_WITH_TRAITS = {
+    'dog': 'good with dogs',
+    'cat': 'good with cats',
+}
+
+
+@dataclass
+class PreScore:
+    inquiry_id: int
+    score: int
+    features: dict = field(default_factory=dict)
+    red_flags: list = field(default_factory=list)
+    decisive: bool = False
+
+
+def scoring_queryset(queryset):
+    """
+    Loads everything the pre-scorer reads in a fixed number of queries,
+    independent of the number of inquiries.
+    """
+    return queryset.select_related('listing__pet', 'requester').prefetch_related(
+        'listing__pet__traits__trait',
+        'requester__pets',
+    )
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (float(lat1), float(lon1), float(lat2), float(lon2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2 +
+        math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 6371 * 2 * math.asin(math.sqrt(a))
+
+
+def _verification_feature(applicant):
+    return (
+        0.3 * applicant.email_verified +
+        0.3 * applicant.phone_verified +
+        0.4 * applicant.verified_identity
+    )
+
+
+def _profile_feature(applicant):
+    missing = len(applicant.missing_profile_fields)
+    return max(0.0, 1 - missing / 7)
+
+
+def _distance_feature(applicant, listing):
+    """
+    Returns (value, location_known).
+    Uses coordinates when both sides have them, otherwise falls back to city/state.
+    """
+    if None not in (applicant.latitude, applicant.longitude, listing.latitude, listing.longitude):
+        km = haversine_km(applicant.latitude, applicant.longitude, listing.latitude, listing.longitude)
+        if km <= NEAR_KM:
+            return 1.0, True
+        return max(0.0, 1 - (km - NEAR_KM) / (FAR_KM - NEAR_KM)), True
+
+    city = (applicant.location_city or '').strip().lower()
+    state = (applicant.location_state or '').strip().lower()
+    if not city and not state:
+        return 0.0, False
+    if city and city == (listing.location_city or '').strip().lower():
+        return 0.9, True
+    if state and state == (listing.location_state or '').strip().lower():
+        return 0.6, True
+    return 0.2, True
+
+
+def _species_size_feature(pet, owned_pets):
+    if not owned_pets:
+        # First-time owner: not a red flag, but no demonstrated experience either
+        value = 0.4
+    elif any(p.species == pet.species for p in owned_pets):
+        value = 1.0
+    else:
+        value = 0.6
+
+    # Large pets are a harder fit for applicants who have only kept small animals
+    pet_size = SIZE_RANK.get(pet.size_category)
+    owned_sizes = [SIZE_RANK[p.size_category] for p in owned_pets if p.size_category in SIZE_RANK]
+    if pet_size is not None and owned_sizes and pet_size - max(owned_sizes) >= 2:
+        value -= 0.2
+
+    return max(0.0, value)
+
+
+def _traits_feature(pet, owned_pets):
+    trait_names = {pp.trait.name.lower() for pp in pet.traits.all()}
+    value = 0.5
+    for species in {p.species for p in owned_pets}:
+        good_with = GOOD_WITH_TRAITS.get(species)
+        if good_with is None:
+            continue
+        if good_with in trait_names:
+            value += 0.25
+        elif trait_names:
+            # The owner described the pet but did not mark it as compatible
+            value -= 0.25
+    return min(1.0, max(0.0, value))
+
+
+def _feature_row(inquiry):
+    applicant = inquiry.requester
+    listing = inquiry.listing
+    pet = listing.pet
+    owned_pets = [p for p in applicant.pets.all() if p.id != pet.id]
+
+    distance, location_known = _distance_feature(applicant, listing)
+    row = (
+        _verification_feature(applicant),
+        _profile_feature(applicant),
+        distance,
+        _species_size_feature(pet, owned_pets),
+        _traits_feature(pet, owned_pets),
+    )
+
+    red_flags = []
+    if not applicant.email_verified and not applicant.phone_verified:
+        red_flags.append('no_verified_contact')
+    if not location_known:
+        red_flags.append('unknown_location')
+    return row, red_flags
+
+
+def prescore_inquiries(inquiries):
+    """
+    Scores many inquiries at once.
+    Builds one feature row per inquiry, then applies the weight vector to the whole
+    matrix. Pass a queryset prepared with `scoring_queryset` to avoid per-row queries.
+
+    Scores outside the [MATCH_PRESCORE_LOW, MATCH_PRESCORE_HIGH] band, or with a
+    red flag, are marked decisive and do not need an LLM call.
+    """
+    inquiries = list(inquiries)
+    rows, flags = [], []
+    for inquiry in inquiries:
+        row, red_flags = _feature_row(inquiry)
+        rows.append(row)
+        flags.append(red_flags)
+
+    weights = [w for _, w in FEATURE_WEIGHTS]
+    scores = [round(sum(w * v for w, v in zip(weights, row))) for row in rows]
+
+    low = settings.MATCH_PRESCORE_LOW
+    high = settings.MATCH_PRESCORE_HIGH
+    cap = settings.MATCH_PRESCORE_RED_FLAG_CAP
+
+    results = []
+    for inquiry, row, score, red_flags in zip(inquiries, rows, scores, flags):
+        if red_flags:
+            score = min(score, cap)
+        results.append(PreScore(
+            inquiry_id=inquiry.id,
+            score=score,
+            features={name: round(value, 3) for (name, _), value in zip(FEATURE_WEIGHTS, row)},
+            red_flags=red_flags,
+            decisive=bool(red_flags) or score < low or score > high,
+        ))
+    return results
+
+
+def prescore_inquiry(inquiry):
+    return prescore_inquiries([inquiry])[0]
@@ -1,56 +1,189 @@
+from contextlib import ExitStack
+from datetime import timedelta
+
 from celery import shared_task
-from .models import AdoptionInquiry
-from .services.ai_service import calculate_match_score
-from apps.users.serializers import UserSerializer
+from celery.schedules import crontab
+from django.conf import settings
+from django.db import OperationalError
+from django.utils import timezone
+from apps.common.dispatch import ReliableTask, enqueue_on_commit
+from apps.common.locks import cache_lock
+from apps.common.scheduler import periodic_job, update_in_batches
+from .models import AdoptionInquiry, RehomingRequest
+from .services.ai_cache import prune_cache
+from .services.ai_service import calculate_match_score, AIServiceError
+from .services.match_scoring import scoring_queryset, prescore_inquiries, prescore_inquiry
 
 import logging
 
 logger = logging.getLogger(__name__)
 
-@shared_task
-def analyze_application_match(inquiry_id):
-    try:
-        inquiry = AdoptionInquiry.objects.get(id=inquiry_id)
-        
-        # Prepare Data
-        # Prepare Data
-        # Pet & Listing Context
-        pet_data = {
-            "name": inquiry.listing.pet.name,
-            "species": inquiry.listing.pet.species,
-            "breed": inquiry.listing.pet.breed,
-            "age": str(inquiry.listing.pet.birth_date) if inquiry.listing.pet.birth_date else "Unknown",
-            "gender": inquiry.listing.pet.gender,
-            "size": inquiry.listing.pet.size_category,
-            "description": inquiry.listing.pet.description or "",
-            "rehoming_reason": inquiry.listing.reason or "",
-            "ideal_home": inquiry.listing.ideal_home_notes or ""
-        }
-        
-        # Applicant Context
-        applicant = inquiry.requester
-        applicant_data = {
-            "full_name": f"{applicant.first_name} {applicant.last_name}",
-            "email_verified": applicant.email_verified,
-            "phone_verified": applicant.phone_verified,
-            "identity_verified": applicant.verified_identity,
-            "profile_complete": applicant.profile_is_complete,
-            "bio": applicant.bio or "",
-            "location": f"{applicant.location_city or ''}, {applicant.location_state or ''}",
-            "member_since": str(applicant.date_joined.date())
-        }
-        
-        # Run AI Analysis
-        score = calculate_match_score(pet_data, applicant_data, inquiry.message)
-        
+# Upper bound on a single analysis run (LLM retries included) before the lock lapses
+ANALYSIS_LOCK_TIMEOUT = 5 * 60
+
+
+def build_match_context(inquiry):
+    """
+    Returns the (pet_data, applicant_data) dicts sent to the LLM.
+    """
+    # Pet & Listing Context
+    pet_data = {
+        "name": inquiry.listing.pet.name,
+        "species": inquiry.listing.pet.species,
+        "breed": inquiry.listing.pet.breed,
+        "age": str(inquiry.listing.pet.birth_date) if inquiry.listing.pet.birth_date else "Unknown",
+        "gender": inquiry.listing.pet.gender,
+        "size": inquiry.listing.pet.size_category,
+        "description": inquiry.listing.pet.description or "",
+        "rehoming_reason": inquiry.listing.reason or "",
+        "ideal_home": inquiry.listing.ideal_home_notes or ""
+    }
+
+    # Applicant Context
+    applicant = inquiry.requester
+    applicant_data = {
+        "full_name": f"{applicant.first_name} {applicant.last_name}",
+        "email_verified": applicant.email_verified,
+        "phone_verified": applicant.phone_verified,
+        "identity_verified": applicant.verified_identity,
+        "profile_complete": applicant.profile_is_complete,
+        "bio": applicant.bio or "",
+        "location": f"{applicant.location_city or ''}, {applicant.location_state or ''}",
+        "member_since": str(applicant.date_joined.date())
+    }
+    return pet_data, applicant_data
+
+
+@shared_task(
+    bind=True,
+    base=ReliableTask,
+    autoretry_for=(AIServiceError, OperationalError),
+    max_retries=3,
+    retry_backoff=10,
+    retry_backoff_max=600,
+    retry_jitter=True,
+)
+def analyze_application_match(self, inquiry_id, force=False):
+    """
+    Scores an inquiry once. Safe to receive more than once: a per-inquiry lock
+    keeps concurrent deliveries from running together, and already processed
+    inquiries are skipped unless `force` is set.
+    Transient failures are retried with backoff; final failures go to the dead-letter table.
+    """
+    with cache_lock(f'analyze-inquiry:{inquiry_id}', timeout=ANALYSIS_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            logger.info(f"Inquiry {inquiry_id} is already being analyzed, skipping.")
+            return
+
+        try:
+            inquiry = scoring_queryset(AdoptionInquiry.objects.all()).get(id=inquiry_id)
+        except AdoptionInquiry.DoesNotExist:
+            logger.error(f"Inquiry {inquiry_id} not found.")
+            return
+
+        if inquiry.ai_processed and not force:
+            logger.info(f"Inquiry {inquiry_id} already analyzed, skipping.")
+            return
+
+        # Cheap local pre-score first; only borderline cases go to the LLM
+        prescore = prescore_inquiry(inquiry)
+        inquiry.heuristic_score = prescore.score
+
+        if prescore.decisive:
+            score = prescore.score
+            inquiry.match_source = 'heuristic'
+        else:
+            pet_data, applicant_data = build_match_context(inquiry)
+            score = calculate_match_score(pet_data, applicant_data, inquiry.message)
+            inquiry.match_source = 'llm'
+
         # Update Model
         inquiry.match_percentage = score
         inquiry.ai_processed = True
-        inquiry.save()
-        
-        logger.info(f"Updated match score for Inquiry {inquiry_id}: {score}%")
-        
-    except AdoptionInquiry.DoesNotExist:
-        logger.error(f"Inquiry {inquiry_id} not found.")
-    except Exception as e:
-        logger.error(f"Error in analyze_application_match: {e}")
+        inquiry.save(update_fields=['heuristic_score', 'match_percentage', 'match_source', 'ai_processed', 'updated_at'])
+
+        logger.info(f"Updated match score for Inquiry {inquiry_id}: {score}% ({inquiry.match_source})")
+
+
+def dispatch_match_analysis(inquiry_id):
+    """
+    Queues match analysis after the surrounding transaction commits,
+    at most once per inquiry.
+    """
+    enqueue_on_commit(
+        analyze_application_match, inquiry_id,
+        idempotency_key=f'analyze-inquiry:{inquiry_id}'
+    )
+
+
+@shared_task
+def prescore_pending_inquiries(batch_size=500):
+    """
+    Bulk pass over unprocessed inquiries.
+    Decisive pre-scores are written directly; borderline ones are queued for LLM analysis.
+    """
+    pending = scoring_queryset(
+        AdoptionInquiry.objects.filter(ai_processed=False).order_by('id')
+    )[:batch_size]
+
+    decided, escalated = [], []
+    inquiries = {inquiry.id: inquiry for inquiry in pending}
+    for result in prescore_inquiries(inquiries.values()):
+        inquiry = inquiries[result.inquiry_id]
+        if result.decisive:
+            inquiry.heuristic_score = result.score
+            inquiry.match_percentage = result.score
+            inquiry.match_source = 'heuristic'
+            inquiry.ai_processed = True
+            decided.append(inquiry)
+        else:
+            escalated.append(inquiry.id)
+
+    with ExitStack() as locks:
+        # Same per-inquiry lock as analyze_application_match; inquiries it is working on are left to it
+        decided = [
+            inquiry for inquiry in decided
+            if locks.enter_context(cache_lock(f'analyze-inquiry:{inquiry.id}', timeout=ANALYSIS_LOCK_TIMEOUT))
+        ]
+        # ...and so are those it finished since the batch was loaded
+        done = set(AdoptionInquiry.objects.filter(
+            id__in=[inquiry.id for inquiry in decided], ai_processed=True
+        ).values_list('id', flat=True))
+        decided = [inquiry for inquiry in decided if inquiry.id not in done]
+
+        now = timezone.now()
+        for inquiry in decided:
+            inquiry.updated_at = now
+        AdoptionInquiry.objects.bulk_update(
+            decided, ['heuristic_score', 'match_percentage', 'match_source', 'ai_processed', 'updated_at']
+        )
+    for inquiry_id in escalated:
+        dispatch_match_analysis(inquiry_id)
+
+    logger.info(f"Pre-scored {len(decided)} inquiries locally, escalated {len(escalated)} to the LLM")
+    return {'decided': len(decided), 'escalated': len(escalated)}
+
+
+@periodic_job(crontab(minute=45), name='prune-ai-response-cache')
+def prune_ai_response_cache():
+    """
+    Deletes expired AI responses and the least recently used ones above AI_RESPONSE_CACHE_MAX_ENTRIES.
+    """
+    expired_count, evicted_count = prune_cache()
+    return expired_count + evicted_count
+
+
+@periodic_job(crontab(minute=15), name='expire-stale-rehoming-drafts')
+def expire_stale_rehoming_drafts():
+    """
+    Moves drafts untouched for REHOMING_DRAFT_EXPIRY_DAYS to 'expired'.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(days=settings.REHOMING_DRAFT_EXPIRY_DAYS)
+    stale = RehomingRequest.objects.filter(status='draft', updated_at__lt=cutoff).only('id', 'status', 'updated_at')
+
+    def expire(rehoming_request):
+        rehoming_request.status = 'expired'
+        rehoming_request.updated_at = now
+
+    return update_in_batches(stale, ['status', 'updated_at'], expire)
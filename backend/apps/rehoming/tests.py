@@ -74,3 +74,299 @@ class RehomingRequestTests(TestCase):
         }
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AIResponseCacheTests(TestCase):
+    def setUp(self):
+        from apps.rehoming.services.ai_cache import reset_cache_stats
+        reset_cache_stats()
+
+    def _mock_model(self, mock_model_cls, text):
+        mock_model_cls.return_value.generate_content.return_value.text = text
+        return mock_model_cls.return_value.generate_content
+
+    def test_identical_prompts_call_model_once(self):
+        from unittest.mock import patch
+        from apps.rehoming.services.ai_service import calculate_match_score
+        from apps.rehoming.services.ai_cache import get_cache_stats
+
+        with patch('apps.rehoming.services.ai_service.genai.GenerativeModel') as model_cls:
+            generate = self._mock_model(model_cls, '87')
+            first = calculate_match_score({'name': 'Buddy'}, {'full_name': 'A B'}, 'Hello')
+            second = calculate_match_score({'name': 'Buddy'}, {'full_name': 'A B'}, 'Hello')
+
+        self.assertEqual(first, 87)
+        self.assertEqual(second, 87)
+        self.assertEqual(generate.call_count, 1)
+
+        stats = get_cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_hits_are_counted_in_batches(self):
+        from django.test import override_settings
+        from apps.rehoming.models import AIResponseCache
+        from apps.rehoming.services.ai_cache import store_response, get_cached_response, get_cache_stats
+
+        store_response('prompt', 'm', 'answer')
+        get_cache_stats()
+        with override_settings(AI_RESPONSE_CACHE_FLUSH_INTERVAL=60):
+            # One SELECT per lookup; the counters are written on the next flush
+            with self.assertNumQueries(4):
+                for _ in range(3):
+                    self.assertEqual(get_cached_response('prompt', 'm'), 'answer')
+                self.assertIsNone(get_cached_response('other', 'm'))
+        stats = get_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (3, 1))
+        self.assertEqual(AIResponseCache.objects.get().hit_count, 3)
+
+    def test_whitespace_only_changes_share_entry(self):
+        from apps.rehoming.services.ai_cache import prompt_hash
+        self.assertEqual(
+            prompt_hash("Score   this\n applicant ", 'm'),
+            prompt_hash("Score this applicant", 'm')
+        )
+        self.assertNotEqual(prompt_hash("Score this applicant", 'm'), prompt_hash("Score this applicant", 'other'))
+
+    def test_expired_entries_are_ignored_and_pruned(self):
+        from django.utils import timezone
+        from apps.rehoming.models import AIResponseCache
+        from apps.rehoming.services.ai_cache import store_response, get_cached_response, prune_cache
+
+        store_response('prompt', 'm', 'answer')
+        AIResponseCache.objects.update(expires_at=timezone.now() - datetime.timedelta(seconds=1))
+
+        self.assertIsNone(get_cached_response('prompt', 'm'))
+        self.assertEqual(prune_cache(), (1, 0))
+        self.assertFalse(AIResponseCache.objects.exists())
+
+    def test_size_bound_evicts_least_recently_used(self):
+        from django.test import override_settings
+        from apps.rehoming.models import AIResponseCache
+        from apps.rehoming.services.ai_cache import store_response, prompt_hash
+        from apps.rehoming.tasks import prune_ai_response_cache
+
+        with override_settings(AI_RESPONSE_CACHE_MAX_ENTRIES=2):
+            store_response('one', 'm', '1')
+            store_response('two', 'm', '2')
+            store_response('three', 'm', '3')
+            self.assertEqual(AIResponseCache.objects.count(), 3)
+            self.assertEqual(prune_ai_response_cache(), 1)
+
+        remaining = set(AIResponseCache.objects.values_list('prompt_hash', flat=True))
+        self.assertEqual(remaining, {prompt_hash('two', 'm'), prompt_hash('three', 'm')})
+
+    def test_failed_generation_is_not_cached(self):
+        from unittest.mock import patch
+        from apps.rehoming.models import AIResponseCache
+        from apps.rehoming.services.ai_service import calculate_match_score, AIServiceError
+
+        with patch('apps.rehoming.services.ai_service.genai.GenerativeModel') as model_cls:
+            model_cls.return_value.generate_content.side_effect = RuntimeError('boom')
+            with self.assertRaises(AIServiceError):
+                calculate_match_score({}, {}, 'Hi')
+
+        self.assertFalse(AIResponseCache.objects.exists())
+
+
+class MatchPreScoringTests(TestCase):
+    def setUp(self):
+        from apps.rehoming.models import RehomingListing
+        self.owner = User.objects.create_user(email='owner@example.com', password='password123')
+        self.pet = PetProfile.objects.create(
+            owner=self.owner, name='Rex', species='dog', size_category='large', gender='male'
+        )
+        request = RehomingRequest.objects.create(
+            owner=self.owner, pet=self.pet, status='listed', reason='Moving', urgency='soon',
+            location_city='Austin', location_state='TX'
+        )
+        self.listing = RehomingListing.objects.create(
+            request=request, pet=self.pet, owner=self.owner, reason='Moving', urgency='soon',
+            location_city='Austin', location_state='TX', latitude=30.2672, longitude=-97.7431
+        )
+
+    def _inquiry(self, email, **user_fields):
+        from apps.rehoming.models import AdoptionInquiry
+        applicant = User.objects.create_user(email=email, password='password123', **user_fields)
+        return AdoptionInquiry.objects.create(listing=self.listing, requester=applicant, message='Hi!')
+
+    def test_unverified_applicant_without_location_is_decided_locally(self):
+        from apps.rehoming.services.match_scoring import prescore_inquiry
+        result = prescore_inquiry(self._inquiry('ghost@example.com'))
+
+        self.assertTrue(result.decisive)
+        self.assertIn('no_verified_contact', result.red_flags)
+        self.assertIn('unknown_location', result.red_flags)
+        self.assertLessEqual(result.score, 25)
+
+    def test_strong_nearby_applicant_scores_high(self):
+        from apps.rehoming.services.match_scoring import prescore_inquiry
+        inquiry = self._inquiry(
+            'great@example.com', first_name='Great', last_name='Match', phone_number='555',
+            location_city='Austin', location_state='TX', latitude=30.30, longitude=-97.75,
+            date_of_birth=datetime.date(1990, 1, 1),
+            email_verified=True, phone_verified=True, verified_identity=True
+        )
+        PetProfile.objects.create(owner=inquiry.requester, name='Old Dog', species='dog', size_category='large')
+
+        result = prescore_inquiry(inquiry)
+        self.assertEqual(result.red_flags, [])
+        self.assertGreater(result.score, 80)
+        self.assertTrue(result.decisive)
+
+    def test_bulk_prescoring_uses_constant_queries(self):
+        from apps.rehoming.models import AdoptionInquiry
+        from apps.rehoming.services.match_scoring import scoring_queryset, prescore_inquiries
+        from apps.pets.models import PersonalityTrait, PetPersonality
+        PetPersonality.objects.create(pet=self.pet, trait=PersonalityTrait.objects.create(name='Good with Dogs'))
+        for i in range(5):
+            self._inquiry(f'applicant{i}@example.com', location_state='TX', email_verified=True)
+
+        with self.assertNumQueries(4):
+            results = prescore_inquiries(scoring_queryset(AdoptionInquiry.objects.all()))
+        self.assertEqual(len(results), 5)
+
+    def test_bulk_pass_leaves_inquiries_under_analysis_alone(self):
+        from django.core.cache import cache
+        from apps.common.locks import cache_lock
+        from apps.rehoming.tasks import prescore_pending_inquiries
+        cache.clear()
+        busy = self._inquiry('busy@example.com')
+        free = self._inquiry('free@example.com')
+        before = free.updated_at
+
+        with cache_lock(f'analyze-inquiry:{busy.id}'):
+            self.assertEqual(prescore_pending_inquiries()['decided'], 1)
+
+        busy.refresh_from_db()
+        free.refresh_from_db()
+        self.assertFalse(busy.ai_processed)
+        self.assertTrue(free.ai_processed)
+        self.assertGreater(free.updated_at, before)
+
+    def test_task_skips_llm_for_decisive_prescore(self):
+        from unittest.mock import patch
+        from apps.rehoming.tasks import analyze_application_match
+        inquiry = self._inquiry('ghost@example.com')
+
+        with patch('apps.rehoming.tasks.calculate_match_score') as llm:
+            analyze_application_match(inquiry.id)
+        llm.assert_not_called()
+
+        inquiry.refresh_from_db()
+        self.assertTrue(inquiry.ai_processed)
+        self.assertEqual(inquiry.match_source, 'heuristic')
+        self.assertEqual(inquiry.match_percentage, inquiry.heuristic_score)
+
+    def test_task_escalates_borderline_prescore(self):
+        from unittest.mock import patch
+        from apps.rehoming.tasks import analyze_application_match
+        inquiry = self._inquiry(
+            'maybe@example.com', location_city='Dallas', location_state='TX', email_verified=True
+        )
+
+        with patch('apps.rehoming.tasks.calculate_match_score', return_value=64) as llm:
+            analyze_application_match(inquiry.id)
+        llm.assert_called_once()
+
+        inquiry.refresh_from_db()
+        self.assertEqual(inquiry.match_source, 'llm')
+        self.assertEqual(inquiry.match_percentage, 64)
+        self.assertIsNotNone(inquiry.heuristic_score)
+
+
+class MatchAnalysisDeliveryTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from apps.rehoming.models import RehomingListing, AdoptionInquiry
+        cache.clear()
+        self.owner = User.objects.create_user(email='owner@example.com', password='password123')
+        pet = PetProfile.objects.create(owner=self.owner, name='Rex', species='dog', gender='male')
+        request = RehomingRequest.objects.create(
+            owner=self.owner, pet=pet, status='listed', reason='Moving', urgency='soon'
+        )
+        listing = RehomingListing.objects.create(
+            request=request, pet=pet, owner=self.owner, reason='Moving', urgency='soon',
+            location_city='Austin', location_state='TX'
+        )
+        applicant = User.objects.create_user(
+            email='maybe@example.com', password='password123',
+            location_city='Dallas', location_state='TX', email_verified=True
+        )
+        self.inquiry = AdoptionInquiry.objects.create(listing=listing, requester=applicant, message='Hi!')
+
+    def test_dispatch_waits_for_commit_and_dedupes(self):
+        from unittest.mock import patch
+        from apps.rehoming.tasks import dispatch_match_analysis
+
+        with patch('apps.rehoming.tasks.analyze_application_match.apply_async') as send:
+            with self.captureOnCommitCallbacks(execute=True):
+                dispatch_match_analysis(self.inquiry.id)
+                dispatch_match_analysis(self.inquiry.id)
+                send.assert_not_called()
+        send.assert_called_once_with(args=(self.inquiry.id,), kwargs={})
+
+    def test_redelivery_of_processed_inquiry_is_skipped(self):
+        from unittest.mock import patch
+        from apps.rehoming.tasks import analyze_application_match
+
+        with patch('apps.rehoming.tasks.calculate_match_score', return_value=64) as llm:
+            analyze_application_match(self.inquiry.id)
+            analyze_application_match(self.inquiry.id)
+        llm.assert_called_once()
+
+    def test_concurrent_delivery_is_skipped_while_locked(self):
+        from unittest.mock import patch
+        from apps.common.locks import cache_lock
+        from apps.rehoming.tasks import analyze_application_match
+
+        with cache_lock(f'analyze-inquiry:{self.inquiry.id}'):
+            with patch('apps.rehoming.tasks.calculate_match_score', return_value=64) as llm:
+                analyze_application_match(self.inquiry.id)
+        llm.assert_not_called()
+        self.inquiry.refresh_from_db()
+        self.assertFalse(self.inquiry.ai_processed)
+
+    def test_exhausted_retries_are_dead_lettered(self):
+        from unittest.mock import patch
+        from apps.common.models import DeadLetterTask
+        from apps.rehoming.services.ai_service import AIServiceError
+        from apps.rehoming.tasks import analyze_application_match
+
+        with patch('apps.rehoming.tasks.calculate_match_score', side_effect=AIServiceError('quota')) as llm:
+            result = analyze_application_match.apply(args=(self.inquiry.id,))
+        self.assertTrue(result.failed())
+        self.assertEqual(llm.call_count, analyze_application_match.max_retries + 1)
+
+        dead = DeadLetterTask.objects.get()
+        self.assertEqual(dead.task_name, analyze_application_match.name)
+        self.assertEqual(dead.args, [self.inquiry.id])
+        self.assertIn('quota', dead.exception)
+        self.inquiry.refresh_from_db()
+        self.assertFalse(self.inquiry.ai_processed)
+
+
+class DraftExpiryTests(TestCase):
+    def test_only_stale_drafts_expire(self):
+        from datetime import timedelta
+        from django.core.cache import cache
+        from django.utils import timezone
+        from apps.rehoming.tasks import expire_stale_rehoming_drafts
+        cache.clear()
+
+        owner = User.objects.create_user(email='owner@example.com', password='password123')
+        stale, fresh, confirmed = (
+            RehomingRequest.objects.create(
+                owner=owner, pet=PetProfile.objects.create(owner=owner, name=name, species='dog', gender='male'),
+                status=status, reason='Moving', urgency='soon'
+            )
+            for name, status in (('Old', 'draft'), ('New', 'draft'), ('Done', 'confirmed'))
+        )
+        RehomingRequest.objects.filter(id__in=[stale.id, confirmed.id]).update(
+            updated_at=timezone.now() - timedelta(days=90)
+        )
+
+        self.assertEqual(expire_stale_rehoming_drafts(), 1)
+        statuses = dict(RehomingRequest.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {stale.id: 'expired', fresh.id: 'draft', confirmed.id: 'confirmed'})
@@ -351,9 +351,9 @@ class AdoptionInquiryViewSet(viewsets.ModelViewSet):
              
         instance = serializer.save(requester=self.request.user)
 
-        # Trigger Async AI Match Analysis
-        from .tasks import analyze_application_match
-        analyze_application_match.delay(instance.id)
+        # Trigger Async AI Match Analysis once the inquiry is committed
+        from .tasks import dispatch_match_analysis
+        dispatch_match_analysis(instance.id)
 
     @action(detail=True, methods=['post'])
     def update_status(self, request, pk=None):
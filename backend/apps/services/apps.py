@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class ServicesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.services'
+
+    def ready(self):
+        from . import signals  # noqa: F401
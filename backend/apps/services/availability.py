@@ -0,0 +1,48 @@
+from django.core.cache import cache
+
+from apps.common.locks import cache_is_shared
+from apps.common.metrics import record_cache_lookup
+
+from .models import BusinessHours
+
+HOURS_CACHE_TIMEOUT = 60 * 60
+# Without a shared cache version bumps stay in the process that made them
+LOCAL_HOURS_CACHE_TIMEOUT = 60
+
+
+def _version_key(provider_id):
+    return f'availability-version:{provider_id}'
+
+
+def availability_version(provider_id):
+    """
+    Version of a provider's availability inputs. Cache keys derived from a
+    provider's hours should include it, so a bump retires them all at once.
+    """
+    return cache.get(_version_key(provider_id)) or 1
+
+
+def bump_availability_version(provider_id):
+    key = _version_key(provider_id)
+    if cache.add(key, 2, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def get_business_hours(provider_id):
+    """
+    Returns {day: BusinessHours} for the provider, cached until its hours change
+    (any BusinessHours save or delete, or update_hours, bumps the version).
+    With a process-local cache other workers only see changes once their copy
+    expires, so it is kept for LOCAL_HOURS_CACHE_TIMEOUT seconds there.
+    """
+    key = f'business-hours:{provider_id}:v{availability_version(provider_id)}'
+    hours = cache.get(key)
+    record_cache_lookup('business_hours', hit=hours is not None)
+    if hours is None:
+        hours = {hour.day: hour for hour in BusinessHours.objects.filter(provider_id=provider_id)}
+        cache.set(key, hours, timeout=HOURS_CACHE_TIMEOUT if cache_is_shared() else LOCAL_HOURS_CACHE_TIMEOUT)
+    return hours
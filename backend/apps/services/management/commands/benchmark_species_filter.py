@@ -0,0 +1,116 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from apps.common.reference_data import get_table
+from apps.services.models import (
+    ServiceProvider, Species, FosterService, VeterinaryClinic,
+    TrainerService, GroomerService, PetSitterService,
+)
+from apps.services.species_index import SPECIES_RELATIONS, providers_with_species, sync_provider_species
+from apps.users.models import User
+
+SPECIES_NAMES = ['Dog', 'Cat', 'Rabbit', 'Bird', 'Hamster', 'Guinea Pig', 'Ferret', 'Turtle', 'Fish', 'Horse']
+
+# Required fields per service type, beyond the provider
+DETAIL_DEFAULTS = {
+    FosterService: {'daily_rate': Decimal('25.00'), 'monthly_rate': Decimal('600.00')},
+    VeterinaryClinic: {'pricing_info': 'Varies'},
+    TrainerService: {'training_philosophy': 'Reward based', 'private_session_rate': Decimal('60.00')},
+    GroomerService: {'base_price': Decimal('40.00')},
+    PetSitterService: {},
+}
+
+
+def legacy_species_filter(queryset, value):
+    # The species filter as it was before ProviderSpecies
+    return queryset.filter(
+        Q(foster_details__species_accepted__slug__iexact=value) |
+        Q(foster_details__species_accepted__name__icontains=value) |
+        Q(vet_details__species_treated__slug__iexact=value) |
+        Q(vet_details__species_treated__name__icontains=value) |
+        Q(trainer_details__species_trained__slug__iexact=value) |
+        Q(trainer_details__species_trained__name__icontains=value) |
+        Q(groomer_details__species_accepted__slug__iexact=value) |
+        Q(groomer_details__species_accepted__name__icontains=value) |
+        Q(sitter_details__species_accepted__slug__iexact=value) |
+        Q(sitter_details__species_accepted__name__icontains=value)
+    ).distinct()
+
+
+def indexed_species_filter(queryset, value):
+    species_ids = [species.id for species in get_table('services.Species').match(value)]
+    return queryset.filter(id__in=providers_with_species(species_ids))
+
+
+class Command(BaseCommand):
+    help = 'Seeds providers in a rolled-back transaction and compares the legacy and indexed species filters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--providers', type=int, default=5000, help='Providers to seed')
+        parser.add_argument('--species', default='dog', help='Species slug or name to filter by')
+        parser.add_argument('--runs', type=int, default=20, help='Timed runs per filter')
+        parser.add_argument('--keep', action='store_true', help='Commit the seeded data instead of rolling back')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._seed(options['providers'])
+            for label, apply in (('Legacy OR joins', legacy_species_filter), ('ProviderSpecies', indexed_species_filter)):
+                count, seconds, queries = self._measure(apply, options['species'], options['runs'])
+                self.stdout.write(
+                    f'{label:<16} {count} providers, {seconds * 1000 / options["runs"]:.2f} ms/query, '
+                    f'{queries[-1]["sql"].count(" JOIN ")} joins'
+                )
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def _measure(self, apply, value, runs):
+        queryset = ServiceProvider.objects.all()
+        count = apply(queryset, value).count()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            for _ in range(runs):
+                list(apply(queryset, value).values_list('id', flat=True))
+            elapsed = time.perf_counter() - started
+        return count, elapsed, captured.captured_queries
+
+    def _seed(self, total):
+        rng = random.Random(42)
+        species = [
+            Species.objects.get_or_create(slug=name.lower().replace(' ', '-'), defaults={'name': name})[0]
+            for name in SPECIES_NAMES
+        ]
+        tag = f'{time.time_ns()}'
+        users = User.objects.bulk_create([
+            User(email=f'bench-{tag}-{i}@example.com', first_name='Bench', last_name=str(i))
+            for i in range(total)
+        ])
+        providers = ServiceProvider.objects.bulk_create([
+            ServiceProvider(
+                user=user, business_name=f'Bench Provider {i}', description='Benchmark provider',
+                address_line1='1 Main St', city='Dhaka', state='Dhaka', zip_code='1000',
+                phone='0100000000', email=user.email,
+            )
+            for i, user in enumerate(users)
+        ], batch_size=1000)
+
+        for offset, (model, field) in enumerate(SPECIES_RELATIONS):
+            assigned = providers[offset::len(SPECIES_RELATIONS)]
+            details = model.objects.bulk_create(
+                [model(provider=provider, **DETAIL_DEFAULTS[model]) for provider in assigned], batch_size=1000
+            )
+            through = getattr(model, field).through
+            detail_field = f'{model._meta.model_name}_id'
+            through.objects.bulk_create([
+                through(**{detail_field: detail.id, 'species_id': chosen.id})
+                for detail in details
+                for chosen in rng.sample(species, rng.randint(1, 3))
+            ], batch_size=1000)
+
+        # bulk_create bypasses the m2m signals
+        sync_provider_species([provider.id for provider in providers])
+        self.stdout.write(f'Seeded {total} providers')
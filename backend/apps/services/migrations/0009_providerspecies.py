@@ -0,0 +1,54 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# (detail model, species M2M field), as in apps.services.species_index
+SPECIES_RELATIONS = (
+    ('FosterService', 'species_accepted'),
+    ('VeterinaryClinic', 'species_treated'),
+    ('TrainerService', 'species_trained'),
+    ('GroomerService', 'species_accepted'),
+    ('PetSitterService', 'species_accepted'),
+)
+
+
+def backfill_provider_species(apps, schema_editor):
+    ProviderSpecies = apps.get_model('services', 'ProviderSpecies')
+
+    pairs = set()
+    for model_name, field in SPECIES_RELATIONS:
+        through = getattr(apps.get_model('services', model_name), field).through
+        detail_column = f'{model_name.lower()}__provider_id'
+        pairs.update(through.objects.values_list(detail_column, 'species_id'))
+
+    ProviderSpecies.objects.bulk_create(
+        [ProviderSpecies(provider_id=provider_id, species_id=species_id) for provider_id, species_id in pairs],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0008_provideravailabilityblock_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderSpecies',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='species_links', to='services.serviceprovider')),
+                ('species', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='provider_links', to='services.species')),
+            ],
+            options={
+                'verbose_name': 'Provider Species',
+                'verbose_name_plural': 'Provider Species',
+                'indexes': [models.Index(fields=['species', 'provider'], name='services_pr_species_0f676a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('provider', 'species'), name='unique_provider_species')],
+            },
+        ),
+        migrations.RunPython(backfill_provider_species, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:11
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+# As in apps.services.price_index
+PRICE_SOURCES = {
+    'FosterService': ('daily_rate',),
+    'TrainerService': ('private_session_rate', 'group_class_rate'),
+    'GroomerService': ('base_price',),
+    'PetSitterService': ('walking_rate', 'house_sitting_rate', 'drop_in_rate'),
+}
+
+
+def _to_decimal(value):
+    try:
+        price = Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return price if price.is_finite() and price >= 0 else None
+
+
+def backfill_price_range(apps, schema_editor):
+    ServiceProvider = apps.get_model('services', 'ServiceProvider')
+
+    prices = {}
+    for model_name, fields in PRICE_SOURCES.items():
+        for detail in apps.get_model('services', model_name).objects.all():
+            values = [getattr(detail, field) for field in fields]
+            if model_name == 'GroomerService':
+                values += [item.get('price') for item in detail.service_menu or [] if isinstance(item, dict)]
+            values = [_to_decimal(value) for value in values if value not in (None, '')]
+            prices.setdefault(detail.provider_id, []).extend(value for value in values if value is not None)
+
+    providers = list(ServiceProvider.objects.filter(pk__in=[pk for pk, values in prices.items() if values]))
+    for provider in providers:
+        provider.min_price = min(prices[provider.pk])
+        provider.max_price = max(prices[provider.pk])
+    ServiceProvider.objects.bulk_update(providers, ['min_price', 'max_price'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0009_providerspecies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='max_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='min_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(backfill_price_range, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:13
+
+from django.db import migrations, models
+
+# As in apps.services.service_types; like the provider serializer, the first entry wins for
+# providers with several details
+SERVICE_TYPE_MODELS = (
+    ('foster', 'FosterService'),
+    ('vet', 'VeterinaryClinic'),
+    ('trainer', 'TrainerService'),
+    ('groomer', 'GroomerService'),
+    ('sitter', 'PetSitterService'),
+)
+
+
+def backfill_service_type(apps, schema_editor):
+    ServiceProvider = apps.get_model('services', 'ServiceProvider')
+    for key, model_name in SERVICE_TYPE_MODELS:
+        detail_model = apps.get_model('services', model_name)
+        ServiceProvider.objects.filter(
+            service_type='', pk__in=detail_model.objects.values('provider_id')
+        ).update(service_type=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0010_provider_price_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='service_type',
+            field=models.CharField(blank=True, choices=[('foster', 'Foster'), ('vet', 'Veterinary'), ('trainer', 'Trainer'), ('groomer', 'Groomer'), ('sitter', 'Pet Sitter')], db_index=True, max_length=20),
+        ),
+        migrations.RunPython(backfill_service_type, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0011_serviceprovider_service_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicemedia',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -80,10 +80,20 @@ class ServiceProvider(models.Model):
         ('approved', 'Approved'),
         ('rejected', 'Rejected'),
     )
+
+    SERVICE_TYPE_CHOICES = (
+        ('foster', 'Foster'),
+        ('vet', 'Veterinary'),
+        ('trainer', 'Trainer'),
+        ('groomer', 'Groomer'),
+        ('sitter', 'Pet Sitter'),
+    )
     
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='service_provider_profile')
     business_name = models.CharField(max_length=100)
     category = models.ForeignKey(ServiceCategory, on_delete=models.PROTECT, related_name='providers', null=True, blank=True)
+    # Which detail model holds this provider's service details (see apps.services.service_types)
+    service_type = models.CharField(max_length=20, choices=SERVICE_TYPE_CHOICES, blank=True, db_index=True)
     description = models.TextField(help_text="Business description (500+ words required)")
     website = models.URLField(blank=True, null=True)
     
@@ -115,6 +125,10 @@ class ServiceProvider(models.Model):
         default='draft'
     )
     
+    # Lowest/highest published price of the service detail, kept current by save_details and apps.services.signals
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, db_index=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, db_index=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -128,8 +142,20 @@ class ServiceProvider(models.Model):
             models.Index(fields=['latitude', 'longitude']),
         ]
     
+    # Derived from the service detail by save_details and apps.services.signals
+    DERIVED_FIELDS = ('service_type', 'min_price', 'max_price')
+
     def __str__(self):
         return f"{self.business_name} ({self.category.name if self.category else 'No Category'})"
+
+    def save(self, *args, **kwargs):
+        # A full save of an instance loaded before its details changed must not write stale derived values back
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
     
     @property
     def full_address(self):
@@ -159,24 +185,15 @@ class ServiceProvider(models.Model):
         """Count of reviews"""
         return self.reviews.count()
 
+    @property
+    def details(self):
+        """The detail record matching service_type, or None"""
+        from .service_types import get_details
+        return get_details(self)
+
     def get_lowest_price(self):
         """Get the lowest starting price across all services"""
-        prices = []
-        if hasattr(self, 'foster_details'):
-            prices.append(self.foster_details.daily_rate)
-        if hasattr(self, 'vet_details'):
-            # Vet pricing is complex, usually no single base price field easily available unless service options
-            pass 
-        if hasattr(self, 'trainer_details'):
-            prices.append(self.trainer_details.private_session_rate)
-        if hasattr(self, 'groomer_details'):
-             if self.groomer_details.base_price:
-                 prices.append(self.groomer_details.base_price)
-        if hasattr(self, 'sitter_details'):
-             if self.sitter_details.walking_rate:
-                 prices.append(self.sitter_details.walking_rate)
-        
-        return min(prices) if prices else None
+        return self.min_price
 
 
 
@@ -187,6 +204,8 @@ class ServiceMedia(models.Model):
     provider = models.ForeignKey(ServiceProvider, on_delete=models.CASCADE, related_name='media')
     file_url = models.URLField()
     thumbnail_url = models.URLField(blank=True, null=True)
+    # Resized copies of the upload (see apps.common.media)
+    derivatives = models.JSONField(default=dict, blank=True)
     is_primary = models.BooleanField(default=False)
     alt_text = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -538,6 +557,29 @@ class PetSitterService(models.Model):
         return f"Sitter details for {self.provider.business_name}"
 
 
+class ProviderSpecies(models.Model):
+    """
+    Every species a provider accepts, across all of its service detail records.
+    Denormalized from the detail models' species M2Ms by apps.services.signals,
+    so species filtering is one indexed lookup instead of a join per service type.
+    """
+    provider = models.ForeignKey(ServiceProvider, on_delete=models.CASCADE, related_name='species_links')
+    species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name='provider_links')
+
+    class Meta:
+        verbose_name = "Provider Species"
+        verbose_name_plural = "Provider Species"
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'species'], name='unique_provider_species'),
+        ]
+        indexes = [
+            models.Index(fields=['species', 'provider']),
+        ]
+
+    def __str__(self):
+        return f"{self.provider_id} accepts {self.species_id}"
+
+
 
 from apps.pets.models import PetProfile
 
@@ -602,6 +644,7 @@ class ServiceBooking(models.Model):
             models.Index(fields=['provider', 'status']),
             models.Index(fields=['booking_date', 'booking_time']),
             models.Index(fields=['start_datetime', 'end_datetime']),
+            models.Index(fields=['created_at']),
         ]
         ordering = ['-created_at']
         
@@ -0,0 +1,35 @@
+from decimal import Decimal, InvalidOperation
+
+
+def _to_decimal(value):
+    if value in (None, ''):
+        return None
+    try:
+        price = Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return price if price.is_finite() and price >= 0 else None
+
+
+def rate_prices(*fields):
+    """
+    Pricing hook reading the given rate fields off a detail record.
+    """
+    def prices(detail):
+        return [price for price in (_to_decimal(getattr(detail, field)) for field in fields) if price is not None]
+    return prices
+
+
+def no_prices(detail):
+    return []
+
+
+def groomer_prices(detail):
+    # Base price plus every priced item on the service menu
+    prices = rate_prices('base_price')(detail)
+    for item in detail.service_menu or []:
+        if isinstance(item, dict):
+            price = _to_decimal(item.get('price'))
+            if price is not None:
+                prices.append(price)
+    return prices
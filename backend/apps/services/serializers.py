@@ -8,6 +8,8 @@ from .models import (
 )
 from apps.users.serializers import PublicUserSerializer
 from apps.pets.serializers import PetProfileSerializer
+from apps.common.reference_data import CachedPrimaryKeyRelatedField
+from .service_types import SERVICE_TYPES, save_details
 
 class ServiceCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -32,7 +34,58 @@ class ServiceOptionSerializer(serializers.ModelSerializer):
 class ServiceMediaSerializer(serializers.ModelSerializer):
     class Meta:
         model = ServiceMedia
-        fields = ['id', 'file_url', 'thumbnail_url', 'is_primary', 'alt_text']
+        fields = ['id', 'file_url', 'thumbnail_url', 'derivatives', 'is_primary', 'alt_text']
+
+class BusinessHoursSyncSerializer(serializers.Serializer):
+    """
+    One day of an update_hours payload.
+    """
+    day = serializers.ChoiceField(choices=BusinessHours.DAYS_OF_WEEK)
+    open_time = serializers.TimeField(required=False, allow_null=True)
+    close_time = serializers.TimeField(required=False, allow_null=True)
+    is_closed = serializers.BooleanField(default=False)
+
+    def to_internal_value(self, data):
+        # The dashboard sends '' for cleared time inputs
+        if isinstance(data, dict):
+            data = {key: (None if value == '' and key in ('open_time', 'close_time') else value) for key, value in data.items()}
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        if data['is_closed']:
+            data['open_time'] = data['close_time'] = None
+            return data
+        if not data.get('open_time') or not data.get('close_time'):
+            raise serializers.ValidationError("Open days need both open_time and close_time.")
+        if data['close_time'] <= data['open_time']:
+            raise serializers.ValidationError("close_time must be after open_time.")
+        return data
+
+class BusinessHoursSyncListSerializer(serializers.ListSerializer):
+    child = BusinessHoursSyncSerializer()
+
+    def validate(self, data):
+        days = [item['day'] for item in data]
+        duplicates = sorted({day for day in days if days.count(day) > 1})
+        if duplicates:
+            raise serializers.ValidationError(f"Overlapping entries for day(s) {duplicates}; send one entry per day.")
+        return data
+
+class ServiceMediaSyncSerializer(serializers.Serializer):
+    """
+    One item of an update_media payload. Items with an id update that media row,
+    items without one are new uploads and need a file_url.
+    """
+    id = serializers.IntegerField(required=False)
+    file_url = serializers.URLField(required=False)
+    thumbnail_url = serializers.URLField(required=False, allow_null=True, allow_blank=True)
+    is_primary = serializers.BooleanField(default=False)
+    alt_text = serializers.CharField(required=False, allow_blank=True, max_length=255)
+
+    def validate(self, data):
+        if not data.get('id') and not data.get('file_url'):
+            raise serializers.ValidationError({"file_url": "New media items need a file_url."})
+        return data
 
 class BusinessHoursSerializer(serializers.ModelSerializer):
     day_display = serializers.CharField(source='get_day_display', read_only=True)
@@ -43,8 +96,8 @@ class BusinessHoursSerializer(serializers.ModelSerializer):
 
 class FosterServiceSerializer(serializers.ModelSerializer):
     species_accepted = SpeciesSerializer(many=True, read_only=True)
-    species_accepted_ids = serializers.PrimaryKeyRelatedField(
-        many=True, write_only=True, queryset=Species.objects.all(), source='species_accepted'
+    species_accepted_ids = CachedPrimaryKeyRelatedField(
+        reference_model='services.Species', many=True, write_only=True, source='species_accepted'
     )
     
     class Meta:
@@ -58,12 +111,12 @@ class FosterServiceSerializer(serializers.ModelSerializer):
 
 class VeterinaryClinicSerializer(serializers.ModelSerializer):
     services_offered = ServiceOptionSerializer(many=True, read_only=True)
-    services_offered_ids = serializers.PrimaryKeyRelatedField(
-        many=True, write_only=True, queryset=ServiceOption.objects.all(), source='services_offered'
+    services_offered_ids = CachedPrimaryKeyRelatedField(
+        reference_model='services.ServiceOption', many=True, write_only=True, source='services_offered'
     )
     species_treated = SpeciesSerializer(many=True, read_only=True)
-    species_treated_ids = serializers.PrimaryKeyRelatedField(
-        many=True, write_only=True, queryset=Species.objects.all(), source='species_treated'
+    species_treated_ids = CachedPrimaryKeyRelatedField(
+        reference_model='services.Species', many=True, write_only=True, source='species_treated'
     )
     
     base_price = serializers.SerializerMethodField()
@@ -87,12 +140,12 @@ class VeterinaryClinicSerializer(serializers.ModelSerializer):
 
 class TrainerServiceSerializer(serializers.ModelSerializer):
     specializations = SpecializationSerializer(many=True, read_only=True)
-    specializations_ids = serializers.PrimaryKeyRelatedField(
-        many=True, write_only=True, queryset=Specialization.objects.all(), source='specializations'
+    specializations_ids = CachedPrimaryKeyRelatedField(
+        reference_model='services.Specialization', many=True, write_only=True, source='specializations'
     )
     species_trained = SpeciesSerializer(many=True, read_only=True)
-    species_trained_ids = serializers.PrimaryKeyRelatedField(
-        many=True, write_only=True, queryset=Species.objects.all(), source='species_trained'
+    species_trained_ids = CachedPrimaryKeyRelatedField(
+        reference_model='services.Species', many=True, write_only=True, source='species_trained'
     )
     
     class Meta:
@@ -109,8 +162,8 @@ class TrainerServiceSerializer(serializers.ModelSerializer):
 
 class GroomerServiceSerializer(serializers.ModelSerializer):
     species_accepted = SpeciesSerializer(many=True, read_only=True)
-    species_accepted_ids = serializers.PrimaryKeyRelatedField(
-        many=True, write_only=True, queryset=Species.objects.all(), source='species_accepted'
+    species_accepted_ids = CachedPrimaryKeyRelatedField(
+        reference_model='services.Species', many=True, write_only=True, source='species_accepted'
     )
     
     class Meta:
@@ -122,8 +175,8 @@ class GroomerServiceSerializer(serializers.ModelSerializer):
 
 class PetSitterServiceSerializer(serializers.ModelSerializer):
     species_accepted = SpeciesSerializer(many=True, read_only=True)
-    species_accepted_ids = serializers.PrimaryKeyRelatedField(
-        many=True, write_only=True, queryset=Species.objects.all(), source='species_accepted'
+    species_accepted_ids = CachedPrimaryKeyRelatedField(
+        reference_model='services.Species', many=True, write_only=True, source='species_accepted'
     )
     
     class Meta:
@@ -195,8 +248,8 @@ class ProviderAvailabilityBlockSerializer(serializers.ModelSerializer):
 class ServiceProviderSerializer(serializers.ModelSerializer):
     user = PublicUserSerializer(read_only=True)
     category = ServiceCategorySerializer(read_only=True)
-    category_id = serializers.PrimaryKeyRelatedField(
-        queryset=ServiceCategory.objects.all(), 
+    category_id = CachedPrimaryKeyRelatedField(
+        reference_model='services.ServiceCategory',
         write_only=True, 
         source='category',
         required=True
@@ -218,24 +271,27 @@ class ServiceProviderSerializer(serializers.ModelSerializer):
     avg_value = serializers.FloatField(read_only=True)
     
     reviews_count = serializers.IntegerField(source='review_count', read_only=True)
+    service_type_display = serializers.CharField(source='get_service_type_display', read_only=True)
+    lowest_price = serializers.DecimalField(source='min_price', max_digits=10, decimal_places=2, read_only=True)
     is_verified = serializers.SerializerMethodField()
     distance = serializers.SerializerMethodField()
     
     class Meta:
         model = ServiceProvider
         fields = [
-            'id', 'user', 'business_name', 'category', 'category_id', 'description', 'website',
+            'id', 'user', 'business_name', 'category', 'category_id', 'service_type', 'service_type_display',
+            'description', 'website',
             'address_line1', 'address_line2', 'city', 'state', 'zip_code', 'latitude', 'longitude',
             'phone', 'email', 'license_number', 'verification_status',
             'media', 'hours',
             'is_verified', 'reviews', 'reviews_count', 'avg_rating', 
             'avg_communication', 'avg_cleanliness', 'avg_quality', 'avg_value',
-            'distance',
+            'distance', 'lowest_price',
             'foster_details', 'vet_details', 'trainer_details', 
             'groomer_details', 'sitter_details',
             'created_at'
         ]
-        read_only_fields = ['user', 'created_at', 'avg_rating', 'reviews_count']
+        read_only_fields = ['user', 'service_type', 'created_at', 'avg_rating', 'reviews_count']
         
     def get_is_verified(self, obj):
         return obj.verification_status == 'verified'
@@ -246,74 +302,35 @@ class ServiceProviderSerializer(serializers.ModelSerializer):
         return getattr(obj, 'distance', None)
         
     def create(self, validated_data):
-        foster_data = validated_data.pop('foster_details', None)
-        vet_data = validated_data.pop('vet_details', None)
-        trainer_data = validated_data.pop('trainer_details', None)
-        groomer_data = validated_data.pop('groomer_details', None)
-        sitter_data = validated_data.pop('sitter_details', None)
-        
+        details = self._pop_details(validated_data)
         provider = ServiceProvider.objects.create(**validated_data)
-        
-        # Note: Detailed service creation would ideally handle M2M and Hours here too
-        # but for now we follow the existing pattern for the OneToOne fields.
-        
-        if foster_data:
-            FosterService.objects.create(provider=provider, **foster_data)
-        elif vet_data:
-            VeterinaryClinic.objects.create(provider=provider, **vet_data)
-        elif trainer_data:
-            TrainerService.objects.create(provider=provider, **trainer_data)
-        elif groomer_data:
-            # Handle M2M manually for create if needed, but Serializer usually handles nestedcreate if set up right? 
-            # DRF default nested create doesn't support M2M well without custom logic usually.
-            # Mirroring logic below.
-            s = GroomerService.objects.create(provider=provider, **{k:v for k,v in groomer_data.items() if k != 'species_accepted'})
-            s.species_accepted.set(groomer_data.get('species_accepted', []))
-        elif sitter_data:
-            s = PetSitterService.objects.create(provider=provider, **{k:v for k,v in sitter_data.items() if k != 'species_accepted'})
-            s.species_accepted.set(sitter_data.get('species_accepted', []))
-            
+        if details:
+            save_details(provider, *details)
         return provider
     
     def update(self, instance, validated_data):
-        foster_data = validated_data.pop('foster_details', None)
-        vet_data = validated_data.pop('vet_details', None)
-        trainer_data = validated_data.pop('trainer_details', None)
-        groomer_data = validated_data.pop('groomer_details', None)
-        sitter_data = validated_data.pop('sitter_details', None)
+        details = self._pop_details(validated_data)
         
         # Update provider fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
         
-        # Helper to update nested service
-        def update_nested_service(model, data, related_name, m2m_fields=[]):
-            # Extract M2M data to handle separately
-            m2m_data = {}
-            for field in m2m_fields:
-                if field in data:
-                    m2m_data[field] = data.pop(field)
-            
-            obj, created = model.objects.update_or_create(provider=instance, defaults=data)
-            
-            # Set M2M relationships
-            for field, values in m2m_data.items():
-                getattr(obj, field).set(values)
-
-        if foster_data:
-            update_nested_service(FosterService, foster_data, 'foster_details', ['species_accepted'])
-        elif vet_data:
-            update_nested_service(VeterinaryClinic, vet_data, 'vet_details', ['services_offered', 'species_treated'])
-        elif trainer_data:
-            update_nested_service(TrainerService, trainer_data, 'trainer_details', ['specializations', 'species_trained'])
-        elif groomer_data:
-            update_nested_service(GroomerService, groomer_data, 'groomer_details', ['species_accepted'])
-        elif sitter_data:
-            update_nested_service(PetSitterService, sitter_data, 'sitter_details', ['species_accepted'])
-            
+        if details:
+            save_details(instance, *details)
         return instance
 
+    def _pop_details(self, validated_data):
+        """
+        Removes every nested detail payload and returns (service_type, data) for the
+        first one sent, in registry order, or None.
+        """
+        payloads = [
+            (service_type, validated_data.pop(service_type.related_name, None))
+            for service_type in SERVICE_TYPES.values()
+        ]
+        return next(((service_type, data) for service_type, data in payloads if data), None)
+
 class ServiceBookingSerializer(serializers.ModelSerializer):
     provider = ServiceProviderSerializer(read_only=True)
     client = PublicUserSerializer(read_only=True)
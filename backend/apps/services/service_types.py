@@ -0,0 +1,128 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import prefetch_related_objects
+
+from .models import FosterService, VeterinaryClinic, TrainerService, GroomerService, PetSitterService
+from .price_index import rate_prices, no_prices, groomer_prices
+
+
+def _single_slot(detail):
+    return 1
+
+
+def _foster_capacity(detail):
+    return detail.capacity or 1
+
+
+@dataclass(frozen=True)
+class ServiceType:
+    """
+    Everything the provider code paths need to know about one kind of service detail.
+    """
+    key: str
+    model: type
+    related_name: str
+    serializer_name: str
+    species_field: str = None
+    m2m_fields: tuple = ()
+    prices: Callable = no_prices
+    slot_capacity: Callable = _single_slot
+
+    @property
+    def serializer_class(self):
+        from . import serializers
+        return getattr(serializers, self.serializer_name)
+
+    def price_range(self, detail):
+        prices = self.prices(detail)
+        return (min(prices), max(prices)) if prices else (None, None)
+
+
+# key -> ServiceType, in the order request payloads are checked
+SERVICE_TYPES = {service_type.key: service_type for service_type in (
+    ServiceType(
+        key='foster', model=FosterService, related_name='foster_details',
+        serializer_name='FosterServiceSerializer', species_field='species_accepted',
+        m2m_fields=('species_accepted',), prices=rate_prices('daily_rate'), slot_capacity=_foster_capacity,
+    ),
+    ServiceType(
+        key='vet', model=VeterinaryClinic, related_name='vet_details',
+        serializer_name='VeterinaryClinicSerializer', species_field='species_treated',
+        m2m_fields=('services_offered', 'species_treated'),
+    ),
+    ServiceType(
+        key='trainer', model=TrainerService, related_name='trainer_details',
+        serializer_name='TrainerServiceSerializer', species_field='species_trained',
+        m2m_fields=('specializations', 'species_trained'),
+        prices=rate_prices('private_session_rate', 'group_class_rate'),
+    ),
+    ServiceType(
+        key='groomer', model=GroomerService, related_name='groomer_details',
+        serializer_name='GroomerServiceSerializer', species_field='species_accepted',
+        m2m_fields=('species_accepted',), prices=groomer_prices,
+    ),
+    ServiceType(
+        key='sitter', model=PetSitterService, related_name='sitter_details',
+        serializer_name='PetSitterServiceSerializer', species_field='species_accepted',
+        m2m_fields=('species_accepted',), prices=rate_prices('walking_rate', 'house_sitting_rate', 'drop_in_rate'),
+    ),
+)}
+
+SERVICE_TYPES_BY_MODEL = {service_type.model: service_type for service_type in SERVICE_TYPES.values()}
+
+
+def get_details(provider):
+    """
+    Returns the provider's detail record for its service_type, or None.
+    Only that one relation is touched (a query unless it was select_related).
+    """
+    service_type = SERVICE_TYPES.get(provider.service_type)
+    if service_type is None:
+        return None
+    try:
+        return getattr(provider, service_type.related_name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def load_details(providers):
+    """
+    Loads the detail records the provider serializer renders, with one query per
+    service type present among `providers` (none for relations already
+    select_related). A provider's only detail is the one of its service_type, so
+    the other relations are cached as empty instead of being queried per row.
+    """
+    providers = [provider for provider in providers if provider is not None]
+    for service_type in SERVICE_TYPES.values():
+        relation = service_type.model._meta.get_field('provider').remote_field
+        pending = []
+        for provider in providers:
+            if relation.is_cached(provider):
+                continue
+            if provider.service_type == service_type.key:
+                pending.append(provider)
+            else:
+                relation.set_cached_value(provider, None)
+        if pending:
+            prefetch_related_objects(pending, service_type.related_name)
+
+
+def save_details(provider, service_type, data):
+    """
+    Creates or updates the provider's detail record of `service_type` from validated
+    serializer data, including its M2M fields, and makes it the provider's service
+    detail: the type and price range are set on `provider` itself and saved, so the
+    instance being serialized (or saved again later) carries the new values.
+    """
+    data = dict(data)
+    m2m_data = {field: data.pop(field) for field in service_type.m2m_fields if field in data}
+    detail, _ = service_type.model.objects.update_or_create(provider=provider, defaults=data)
+    for field, values in m2m_data.items():
+        getattr(detail, field).set(values)
+    provider.service_type = service_type.key
+    provider.min_price, provider.max_price = service_type.price_range(detail)
+    provider.save(update_fields=['service_type', 'min_price', 'max_price'])
+    setattr(provider, service_type.related_name, detail)
+    return detail
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .availability import bump_availability_version
+from .models import BusinessHours, ServiceProvider
+from .service_types import SERVICE_TYPES, SERVICE_TYPES_BY_MODEL
+from .species_index import SPECIES_RELATIONS, provider_ids_for_details, sync_provider_species
+
+# Sent once per update_hours call that changed anything, with `provider_id` and `days`
+business_hours_changed = Signal()
+
+# through model -> (detail model, species field)
+_THROUGH_MODELS = {
+    getattr(detail_model, field).through: (detail_model, field)
+    for detail_model, field in SPECIES_RELATIONS
+}
+
+
+def _species_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    detail_model, field = _THROUGH_MODELS[sender]
+    if not reverse:
+        # instance is the detail record
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            sync_provider_species([instance.provider_id])
+        return
+
+    # instance is a Species; pk_set holds detail ids, except on clear where they must be captured first
+    if action == 'pre_clear':
+        instance._cleared_provider_ids = list(
+            detail_model.objects.filter(**{field: instance}).values_list('provider_id', flat=True)
+        )
+    elif action == 'post_clear':
+        sync_provider_species(getattr(instance, '_cleared_provider_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        sync_provider_species(provider_ids_for_details(detail_model, pk_set))
+
+
+def _detail_saved(sender, instance, **kwargs):
+    # Writes outside save_details (admin, shell): the range follows the provider's current
+    # service detail, so a stray detail of another type leaves it alone
+    service_type = SERVICE_TYPES_BY_MODEL[sender]
+    min_price, max_price = service_type.price_range(instance)
+    ServiceProvider.objects.filter(pk=instance.provider_id, service_type__in=('', service_type.key)).update(
+        service_type=service_type.key, min_price=min_price, max_price=max_price
+    )
+
+
+def _detail_deleted(sender, instance, **kwargs):
+    ServiceProvider.objects.filter(
+        pk=instance.provider_id, service_type=SERVICE_TYPES_BY_MODEL[sender].key
+    ).update(service_type='', min_price=None, max_price=None)
+    sync_provider_species([instance.provider_id])
+
+
+for _through, (_detail_model, _field) in _THROUGH_MODELS.items():
+    _label = f'{_detail_model._meta.label}.{_field}'
+    m2m_changed.connect(_species_changed, sender=_through, dispatch_uid=f'provider-species:{_label}')
+
+for _service_type in SERVICE_TYPES.values():
+    _label = _service_type.model._meta.label
+    post_save.connect(_detail_saved, sender=_service_type.model, dispatch_uid=f'provider-details-save:{_label}')
+    post_delete.connect(_detail_deleted, sender=_service_type.model, dispatch_uid=f'provider-details-delete:{_label}')
+
+
+@receiver(business_hours_changed, dispatch_uid='services-bump-availability-on-hours-change')
+def _hours_changed(sender, provider_id, days, **kwargs):
+    bump_availability_version(provider_id)
+
+
+@receiver([post_save, post_delete], sender=BusinessHours, dispatch_uid='services-bump-availability-on-hours-write')
+def _hours_written(sender, instance, **kwargs):
+    # Admin edits and other single-row writes; update_hours upserts in bulk and sends business_hours_changed
+    provider_id = instance.provider_id
+    transaction.on_commit(lambda: bump_availability_version(provider_id))
@@ -0,0 +1,75 @@
+from django.db import transaction
+
+from .models import ProviderSpecies
+from .service_types import SERVICE_TYPES
+
+# (detail model, species M2M field) for every service type that records species
+SPECIES_RELATIONS = tuple(
+    (service_type.model, service_type.species_field)
+    for service_type in SERVICE_TYPES.values() if service_type.species_field
+)
+
+
+def _through(model, field):
+    return getattr(model, field).through
+
+
+def collect_species(provider_ids):
+    """
+    Returns {provider_id: {species_id, ...}} from the detail models' M2M tables.
+    One query per service type.
+    """
+    found = {provider_id: set() for provider_id in provider_ids}
+    for model, field in SPECIES_RELATIONS:
+        through = _through(model, field)
+        detail_column = f'{model._meta.model_name}__provider_id'
+        rows = through.objects.filter(**{f'{detail_column}__in': list(found)}).values_list(detail_column, 'species_id')
+        for provider_id, species_id in rows:
+            found[provider_id].add(species_id)
+    return found
+
+
+@transaction.atomic
+def sync_provider_species(provider_ids):
+    """
+    Brings ProviderSpecies in line with the detail models for the given providers,
+    writing only the rows that changed.
+    """
+    provider_ids = set(provider_ids)
+    if not provider_ids:
+        return
+    wanted = collect_species(provider_ids)
+    current = {provider_id: set() for provider_id in provider_ids}
+    for provider_id, species_id in ProviderSpecies.objects.filter(
+        provider_id__in=provider_ids
+    ).values_list('provider_id', 'species_id'):
+        current[provider_id].add(species_id)
+
+    stale = [
+        (provider_id, species_id)
+        for provider_id, species_ids in current.items()
+        for species_id in species_ids - wanted[provider_id]
+    ]
+    missing = [
+        ProviderSpecies(provider_id=provider_id, species_id=species_id)
+        for provider_id, species_ids in wanted.items()
+        for species_id in species_ids - current[provider_id]
+    ]
+    for provider_id in {provider_id for provider_id, _ in stale}:
+        ProviderSpecies.objects.filter(
+            provider_id=provider_id,
+            species_id__in=[species_id for p, species_id in stale if p == provider_id]
+        ).delete()
+    if missing:
+        ProviderSpecies.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+def provider_ids_for_details(model, detail_ids):
+    return list(model.objects.filter(pk__in=detail_ids).values_list('provider_id', flat=True))
+
+
+def providers_with_species(species_ids):
+    """
+    Subquery of provider ids accepting any of `species_ids`, for `id__in` filters.
+    """
+    return ProviderSpecies.objects.filter(species_id__in=species_ids).values('provider_id')
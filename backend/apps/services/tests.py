@@ -0,0 +1,293 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.common.reference_data import clear_local
+from .service_types import SERVICE_TYPES
+from .models import (
+    ServiceProvider, Species, FosterService, GroomerService, PetSitterService, ProviderSpecies, ServiceMedia,
+    BusinessHours, ServiceCategory,
+)
+from .signals import business_hours_changed
+
+User = get_user_model()
+
+
+def create_provider(email, **kwargs):
+    user = User.objects.create_user(email=email, password='password123', first_name='Pro', last_name='Vider')
+    defaults = {
+        'business_name': 'Happy Paws', 'description': 'Provider', 'address_line1': '1 Main St',
+        'city': 'Dhaka', 'state': 'Dhaka', 'zip_code': '1000', 'phone': '0100000000',
+        'email': email, 'verification_status': 'verified',
+    }
+    defaults.update(kwargs)
+    return ServiceProvider.objects.create(user=user, **defaults)
+
+
+class ProviderSpeciesIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+        self.dog = Species.objects.create(name='Dog', slug='dog')
+        self.cat = Species.objects.create(name='Cat', slug='cat')
+        self.provider = create_provider('foster@example.com')
+        self.foster = FosterService.objects.create(
+            provider=self.provider, daily_rate=Decimal('20.00'), monthly_rate=Decimal('500.00')
+        )
+
+    def species_ids(self):
+        return set(ProviderSpecies.objects.filter(provider=self.provider).values_list('species_id', flat=True))
+
+    def test_index_follows_every_detail_model(self):
+        self.foster.species_accepted.add(self.dog)
+        groomer = GroomerService.objects.create(provider=self.provider, base_price=Decimal('30.00'))
+        groomer.species_accepted.add(self.dog, self.cat)
+        self.assertEqual(self.species_ids(), {self.dog.id, self.cat.id})
+
+        # Dog is still accepted through the groomer details
+        self.foster.species_accepted.remove(self.dog)
+        self.assertEqual(self.species_ids(), {self.dog.id, self.cat.id})
+
+        self.cat.groomers.clear()
+        self.assertEqual(self.species_ids(), {self.dog.id})
+
+        groomer.delete()
+        self.assertEqual(self.species_ids(), set())
+
+    def test_species_filter_uses_index(self):
+        self.foster.species_accepted.add(self.cat)
+        other = create_provider('other@example.com')
+        FosterService.objects.create(
+            provider=other, daily_rate=Decimal('20.00'), monthly_rate=Decimal('500.00')
+        ).species_accepted.add(self.dog)
+
+        response = self.client.get('/api/services/providers/', {'species': 'cat'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.provider.id])
+
+        response = self.client.get('/api/services/providers/', {'species': 'unicorn'})
+        self.assertEqual(response.data['results'], [])
+
+
+class ProviderPriceIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+
+    def test_price_range_follows_details_and_groomer_menu(self):
+        provider = create_provider('groomer@example.com')
+        groomer = GroomerService.objects.create(
+            provider=provider, base_price=Decimal('40.00'),
+            service_menu=[{'name': 'Nail trim', 'price': 15}, {'name': 'Full groom', 'price': '80'}]
+        )
+        provider.refresh_from_db()
+        self.assertEqual((provider.min_price, provider.max_price), (Decimal('15'), Decimal('80')))
+
+        groomer.service_menu = []
+        groomer.save()
+        provider.refresh_from_db()
+        self.assertEqual((provider.min_price, provider.max_price), (Decimal('40'), Decimal('40')))
+
+        groomer.delete()
+        provider.refresh_from_db()
+        self.assertIsNone(provider.min_price)
+
+    def test_create_and_update_responses_carry_price_range(self):
+        user = User.objects.create_user(email='sitter@example.com', password='password123')
+        category = ServiceCategory.objects.create(name='Sitting', slug='sitting')
+        self.client.force_authenticate(user)
+        payload = {
+            'category_id': category.id, 'business_name': 'Walkies', 'description': 'Dog walking',
+            'address_line1': '1 Main St', 'city': 'Dhaka', 'state': 'Dhaka', 'zip_code': '1000',
+            'phone': '0100000000', 'email': 'sitter@example.com',
+            'sitter_details': {'walking_rate': '12.00', 'drop_in_rate': '20.00', 'species_accepted_ids': []},
+        }
+        response = self.client.post('/api/services/providers/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['lowest_price'], '12.00')
+
+        provider = ServiceProvider.objects.get(pk=response.data['id'])
+        response = self.client.patch(f'/api/services/providers/{provider.id}/', {
+            'sitter_details': {'walking_rate': '8.00', 'species_accepted_ids': []},
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['lowest_price'], '8.00')
+
+        # An instance loaded before the change does not write the old range back
+        provider.description = 'Walks and visits'
+        provider.save()
+        provider.refresh_from_db()
+        self.assertEqual((provider.min_price, provider.max_price), (Decimal('8.00'), Decimal('20.00')))
+
+    def test_filter_and_order_by_price(self):
+        cheap = create_provider('cheap@example.com')
+        FosterService.objects.create(provider=cheap, daily_rate=Decimal('10.00'), monthly_rate=Decimal('200.00'))
+        pricey = create_provider('pricey@example.com')
+        GroomerService.objects.create(provider=pricey, base_price=Decimal('90.00'))
+        create_provider('unpriced@example.com')
+
+        response = self.client.get('/api/services/providers/', {'ordering': 'price'})
+        results = response.data['results']
+        self.assertEqual([row['id'] for row in results][:2], [cheap.id, pricey.id])
+        self.assertEqual(results[0]['lowest_price'], '10.00')
+        self.assertIsNone(results[2]['lowest_price'])
+
+        response = self.client.get('/api/services/providers/', {'min_price': 50})
+        self.assertEqual([row['id'] for row in response.data['results']], [pricey.id])
+        response = self.client.get('/api/services/providers/', {'max_price': 50})
+        self.assertEqual([row['id'] for row in response.data['results']], [cheap.id])
+
+
+class ServiceTypeDispatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+
+    def test_detail_sets_service_type(self):
+        provider = create_provider('sitter@example.com')
+        PetSitterService.objects.create(provider=provider, walking_rate=Decimal('12.00'))
+        provider = ServiceProvider.objects.get(pk=provider.pk)
+        self.assertEqual(provider.service_type, 'sitter')
+        self.assertEqual(provider.details.walking_rate, Decimal('12.00'))
+
+    def test_list_loads_details_without_per_row_queries(self):
+        for i in range(3):
+            provider = create_provider(f'foster{i}@example.com')
+            FosterService.objects.create(provider=provider, daily_rate=Decimal('20.00'), monthly_rate=Decimal('500.00'))
+        GroomerService.objects.create(provider=create_provider('groomer@example.com'), base_price=Decimal('30.00'))
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/services/providers/')
+        types = {row['service_type'] for row in response.data['results']}
+        self.assertEqual(types, {'foster', 'groomer'})
+
+        # One query per service type on the page, not per row, and no joins to the other detail tables
+        detail_tables = [f'"{service_type.model._meta.db_table}"' for service_type in SERVICE_TYPES.values()]
+        probes = [q['sql'] for q in captured.captured_queries if any(table in q['sql'] for table in detail_tables)]
+        self.assertEqual(len(probes), 2)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/services/providers/', {'service_type': 'foster'})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['results'][0]['groomer_details'])
+        probes = [q['sql'] for q in captured.captured_queries if any(table in q['sql'] for table in detail_tables)]
+        self.assertEqual(len(probes), 1)
+        self.assertNotIn('"services_groomerservice"', probes[0])
+
+
+class ProviderMediaSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+        self.provider = create_provider('gallery@example.com')
+        self.client.force_authenticate(self.provider.user)
+        self.url = f'/api/services/providers/{self.provider.id}/update_media/'
+
+    def test_sync_updates_creates_and_deletes_in_bulk(self):
+        media = ServiceMedia.objects.bulk_create([
+            ServiceMedia(provider=self.provider, file_url=f'https://cdn.example.com/{i}.jpg') for i in range(30)
+        ])
+        payload = [{'id': m.id, 'is_primary': i == 5} for i, m in enumerate(media[:29])]
+        payload.append({'file_url': 'https://cdn.example.com/new.jpg', 'alt_text': 'Front desk'})
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        # Deletes load the stale rows first so file reference counts can be released
+        self.assertLessEqual(len(captured.captured_queries), 9)
+
+        self.assertEqual(len(response.data['media']), 30)
+        self.assertEqual(response.data['media'][0]['id'], media[5].id)
+        self.assertFalse(ServiceMedia.objects.filter(id=media[29].id).exists())
+        self.assertTrue(ServiceMedia.objects.filter(provider=self.provider, alt_text='Front desk').exists())
+
+    def test_rejects_media_of_other_providers(self):
+        other = create_provider('other-gallery@example.com')
+        foreign = ServiceMedia.objects.create(provider=other, file_url='https://cdn.example.com/x.jpg')
+
+        response = self.client.post(self.url, [{'id': foreign.id}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(ServiceMedia.objects.filter(id=foreign.id).exists())
+
+
+class BusinessHoursUpsertTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+        self.provider = create_provider('hours@example.com')
+        self.client.force_authenticate(self.provider.user)
+        self.url = f'/api/services/providers/{self.provider.id}/update_hours/'
+        self.week = [
+            {'day': day, 'open_time': '09:00', 'close_time': '17:00', 'is_closed': day >= 5}
+            for day in range(7)
+        ]
+        self.events = []
+        business_hours_changed.connect(self.record_event)
+        self.addCleanup(business_hours_changed.disconnect, self.record_event)
+
+    def record_event(self, sender, provider_id, days, **kwargs):
+        self.events.append(days)
+
+    def post(self, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, payload, format='json')
+
+    def test_only_changed_days_are_written(self):
+        self.assertEqual(self.post(self.week).data['changed_days'], list(range(7)))
+        ids = dict(BusinessHours.objects.filter(provider=self.provider).values_list('day', 'id'))
+
+        response = self.post(self.week)
+        self.assertEqual(response.data['changed_days'], [])
+        self.assertEqual(len(self.events), 1)
+
+        self.week[2]['close_time'] = '19:30'
+        response = self.post(self.week[:6])
+        self.assertEqual(response.data['changed_days'], [2, 6])
+        self.assertEqual(self.events[-1], [2, 6])
+        self.assertEqual(
+            dict(BusinessHours.objects.filter(provider=self.provider).values_list('day', 'id')),
+            {day: pk for day, pk in ids.items() if day != 6}
+        )
+        self.assertEqual(str(BusinessHours.objects.get(provider=self.provider, day=2).close_time), '19:30:00')
+
+    def test_rejects_inverted_and_overlapping_entries(self):
+        self.week[0]['close_time'] = '08:00'
+        self.assertEqual(self.post(self.week).status_code, 400)
+
+        self.week[0]['close_time'] = '17:00'
+        self.assertEqual(self.post(self.week + [{'day': 0, 'open_time': '18:00', 'close_time': '20:00'}]).status_code, 400)
+        self.assertFalse(BusinessHours.objects.filter(provider=self.provider).exists())
+        self.assertEqual(self.events, [])
+
+    def test_availability_reads_hours_until_they_change(self):
+        self.post(self.week)
+        check = {'provider_id': self.provider.id, 'date': '2030-01-07'}  # a Monday
+        response = self.client.post('/api/services/bookings/check_availability/', check, format='json')
+        self.assertEqual(response.data['total_slots'], 8)
+
+        self.week[0]['close_time'] = '12:00'
+        self.post(self.week)
+        response = self.client.post('/api/services/bookings/check_availability/', check, format='json')
+        self.assertEqual(response.data['total_slots'], 3)
+
+    def test_direct_writes_refresh_cached_hours(self):
+        """Saves outside update_hours (e.g. the Django admin) also retire the cached hours."""
+        self.post(self.week)
+        check = {'provider_id': self.provider.id, 'date': '2030-01-07'}  # a Monday
+        self.client.post('/api/services/bookings/check_availability/', check, format='json')
+
+        monday = BusinessHours.objects.get(provider=self.provider, day=0)
+        monday.close_time = '12:00'
+        with self.captureOnCommitCallbacks(execute=True):
+            monday.save()
+        response = self.client.post('/api/services/bookings/check_availability/', check, format='json')
+        self.assertEqual(response.data['total_slots'], 3)
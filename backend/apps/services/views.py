@@ -3,37 +3,41 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 import django_filters
-from django.db.models import Q, Sum
+from django.db import connection, transaction
+from django.db.models import F, Q, Sum
 from apps.common.logging_utils import log_business_event
-
-from .models import (
-    ServiceProvider, ServiceReview, ServiceCategory, 
-    Species, ServiceOption, ServiceBooking, Specialization,
-    BusinessHours, ServiceMedia
-)
+from apps.common.media import attach_derivatives, count_references
+from apps.common.reference_data import ReferenceDataViewMixin, get_table
+
+from .models import ServiceProvider, ServiceReview, ServiceBooking, BusinessHours, ServiceMedia
+from .species_index import providers_with_species
+from .service_types import SERVICE_TYPES, load_details
+from .signals import business_hours_changed
+from .availability import get_business_hours
 from .serializers import (
-    ServiceProviderSerializer, ServiceReviewSerializer,
+    ServiceProviderSerializer, ServiceReviewSerializer, ServiceMediaSerializer, ServiceMediaSyncSerializer,
+    BusinessHoursSerializer, BusinessHoursSyncListSerializer,
     ServiceCategorySerializer, SpeciesSerializer, ServiceOptionSerializer,
     ServiceBookingSerializer, ServiceBookingCreateSerializer, SpecializationSerializer
 )
 
-class ServiceCategoryViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ServiceCategory.objects.all()
+class ServiceCategoryViewSet(ReferenceDataViewMixin, viewsets.ReadOnlyModelViewSet):
+    reference_model = 'services.ServiceCategory'
     serializer_class = ServiceCategorySerializer
     permission_classes = [permissions.AllowAny]
 
-class SpeciesViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Species.objects.all()
+class SpeciesViewSet(ReferenceDataViewMixin, viewsets.ReadOnlyModelViewSet):
+    reference_model = 'services.Species'
     serializer_class = SpeciesSerializer
     permission_classes = [permissions.AllowAny]
 
-class ServiceOptionViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ServiceOption.objects.all()
+class ServiceOptionViewSet(ReferenceDataViewMixin, viewsets.ReadOnlyModelViewSet):
+    reference_model = 'services.ServiceOption'
     serializer_class = ServiceOptionSerializer
     permission_classes = [permissions.AllowAny]
 
-class SpecializationViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Specialization.objects.all()
+class SpecializationViewSet(ReferenceDataViewMixin, viewsets.ReadOnlyModelViewSet):
+    reference_model = 'services.Specialization'
     serializer_class = SpecializationSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -44,8 +48,8 @@ class ServiceProviderFilter(django_filters.FilterSet):
     availability = django_filters.CharFilter(method='filter_availability')
     services = django_filters.CharFilter(method='filter_services')
     
-    # Filter by category slug
-    category = django_filters.CharFilter(field_name='category__slug', lookup_expr='iexact')
+    # Filter by category slug (resolved in memory)
+    category = django_filters.CharFilter(method='filter_category')
 
     # Aliases for location
     location_city = django_filters.CharFilter(field_name='city', lookup_expr='icontains')
@@ -53,43 +57,30 @@ class ServiceProviderFilter(django_filters.FilterSet):
 
     class Meta:
         model = ServiceProvider
-        fields = ['category', 'city', 'state', 'verification_status', 'nearby']
+        fields = ['category', 'service_type', 'city', 'state', 'verification_status', 'nearby']
     
     nearby = django_filters.CharFilter(method='filter_nearby')
 
     def filter_min_price(self, queryset, name, value):
-        # Applies to Foster services or other services with rates/base prices
-        return queryset.filter(
-            Q(foster_details__daily_rate__gte=value) |
-            Q(trainer_details__private_session_rate__gte=value) | 
-            Q(groomer_details__base_price__gte=value) |
-            Q(sitter_details__walking_rate__gte=value)
-        )
+        # Providers offering anything at or above the price
+        return queryset.filter(max_price__gte=value)
 
     def filter_max_price(self, queryset, name, value):
-        return queryset.filter(
-            Q(foster_details__daily_rate__lte=value) |
-            Q(trainer_details__private_session_rate__lte=value) |
-            Q(groomer_details__base_price__lte=value) |
-            Q(sitter_details__walking_rate__lte=value)
-        )
+        # Providers offering anything at or below the price
+        return queryset.filter(min_price__lte=value)
+
+    def filter_category(self, queryset, name, value):
+        category = get_table('services.ServiceCategory').match_slug(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category_id=category.id)
 
     def filter_species(self, queryset, name, value):
-        # Support slug or name lookup across all service types
-        return queryset.filter(
-            Q(foster_details__species_accepted__slug__iexact=value) |
-            Q(foster_details__species_accepted__name__icontains=value) |
-            Q(vet_details__species_treated__slug__iexact=value) |
-            Q(vet_details__species_treated__name__icontains=value) |
-            Q(vet_details__species_treated__slug__iexact=value) |
-            Q(vet_details__species_treated__name__icontains=value) |
-            Q(trainer_details__species_trained__slug__iexact=value) |
-            Q(trainer_details__species_trained__name__icontains=value) |
-            Q(groomer_details__species_accepted__slug__iexact=value) |
-            Q(groomer_details__species_accepted__name__icontains=value) |
-            Q(sitter_details__species_accepted__slug__iexact=value) |
-            Q(sitter_details__species_accepted__name__icontains=value)
-        ).distinct()
+        # Slug or name, resolved to ids in memory; one semi-join on the provider/species index
+        species_ids = [species.id for species in get_table('services.Species').match(value)]
+        if not species_ids:
+            return queryset.none()
+        return queryset.filter(id__in=providers_with_species(species_ids))
 
     def filter_availability(self, queryset, name, value):
         if value.lower() == 'available':
@@ -134,6 +125,43 @@ class ServiceProviderFilter(django_filters.FilterSet):
         except (ValueError, IndexError):
             return queryset
 
+def upsert_business_hours(rows, existing):
+    """
+    Writes new and changed BusinessHours rows. Uses one INSERT ... ON CONFLICT
+    (provider, day) DO UPDATE where the database supports it, otherwise one
+    bulk_update for existing days plus one bulk_create for new ones.
+    """
+    fields = ['open_time', 'close_time', 'is_closed']
+    if connection.features.supports_update_conflicts_with_target:
+        BusinessHours.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['provider', 'day'], update_fields=fields
+        )
+        return
+
+    updates = []
+    for row in rows:
+        if row.day in existing:
+            row.pk = existing[row.day].pk
+            updates.append(row)
+    if updates:
+        BusinessHours.objects.bulk_update(updates, fields)
+    creates = [row for row in rows if row.day not in existing]
+    if creates:
+        BusinessHours.objects.bulk_create(creates)
+
+class ProviderOrderingFilter(filters.OrderingFilter):
+    """
+    Adds `price`/`-price` (the provider's lowest price), with unpriced providers last.
+    """
+    ALIASES = {
+        'price': F('min_price').asc(nulls_last=True),
+        '-price': F('min_price').desc(nulls_last=True),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        return [self.ALIASES.get(term, term) for term in ordering] if ordering else ordering
+
 class ServiceProviderViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         from django.db.models import Avg, Sum, Count, F
@@ -143,7 +171,11 @@ class ServiceProviderViewSet(viewsets.ModelViewSet):
             avg_cleanliness=Avg('reviews__rating_cleanliness'),
             avg_quality=Avg('reviews__rating_quality'),
             avg_value=Avg('reviews__rating_value')
-        ).order_by('-created_at')
+        ).select_related('user', 'category').order_by('-created_at')
+        # Filtered to one service type: join its detail table only; otherwise see paginate_queryset
+        service_type = SERVICE_TYPES.get(self.request.query_params.get('service_type'))
+        if service_type is not None:
+            queryset = queryset.select_related(service_type.related_name)
         
         user = self.request.user
         
@@ -169,9 +201,22 @@ class ServiceProviderViewSet(viewsets.ModelViewSet):
         return queryset.filter(verification_status='verified')
     serializer_class = ServiceProviderSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, ProviderOrderingFilter]
     filterset_class = ServiceProviderFilter
     search_fields = ['business_name', 'description', 'category__name', 'city']
+    ordering_fields = ['created_at', 'price']
+    ordering = ['-created_at']
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            load_details(page)
+        return page
+
+    def get_object(self):
+        provider = super().get_object()
+        load_details([provider])
+        return provider
     
     def perform_create(self, serializer):
         user = self.request.user
@@ -318,64 +363,103 @@ class ServiceProviderViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def update_hours(self, request, pk=None):
+        """
+        Replaces the provider's weekly hours with the posted list (one entry per day;
+        days left out are removed). Only changed days are written, as a single upsert
+        keyed on (provider, day), and business_hours_changed is sent once if anything changed.
+        """
         provider = self.get_object()
+        if provider.user != request.user and not request.user.is_staff:
+            return Response({"error": "Not authorized"}, status=403)
+
         # Expect list of hour objects
-        hours_data = request.data
-        if not isinstance(hours_data, list):
+        if not isinstance(request.data, list):
             return Response({"error": "Expected a list of hours."}, status=400)
-            
-        # Delete existing
-        provider.hours.all().delete()
-        
-        # Create new
-        new_hours = []
-        for h in hours_data:
-            new_hours.append(BusinessHours(
-                provider=provider,
-                day=h.get('day'),
-                open_time=h.get('open_time') or None,
-                close_time=h.get('close_time') or None,
-                is_closed=h.get('is_closed', False)
+        hours = BusinessHoursSyncListSerializer(data=request.data)
+        hours.is_valid(raise_exception=True)
+
+        fields = ('open_time', 'close_time', 'is_closed')
+        with transaction.atomic():
+            existing = {hour.day: hour for hour in BusinessHours.objects.select_for_update().filter(provider=provider)}
+            changed = [
+                BusinessHours(provider=provider, **item)
+                for item in hours.validated_data
+                if item['day'] not in existing
+                or any(getattr(existing[item['day']], field) != item[field] for field in fields)
+            ]
+            removed = set(existing) - {item['day'] for item in hours.validated_data}
+
+            if removed:
+                BusinessHours.objects.filter(provider=provider, day__in=removed).delete()
+            if changed:
+                upsert_business_hours(changed, existing)
+
+        changed_days = sorted({hour.day for hour in changed} | removed)
+        if changed_days:
+            transaction.on_commit(lambda: business_hours_changed.send(
+                sender=BusinessHours, provider_id=provider.id, days=changed_days
             ))
-        BusinessHours.objects.bulk_create(new_hours)
-        
-        return Response(self.get_serializer(provider).data)
-        
+
+        return Response({
+            "provider_id": provider.id,
+            "changed_days": changed_days,
+            "hours": BusinessHoursSerializer(provider.hours.all(), many=True).data,
+        })
+
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def update_media(self, request, pk=None):
+        """
+        Replaces the provider's gallery with the posted list in one transaction:
+        one read of the current media, then at most one delete, one bulk_update
+        and one bulk_create. Returns only the resulting media list.
+        """
         provider = self.get_object()
-        media_list = request.data
-        if not isinstance(media_list, list):
+        if provider.user != request.user and not request.user.is_staff:
+            return Response({"error": "Not authorized"}, status=403)
+
+        if not isinstance(request.data, list):
              return Response({"error": "Expected a list of media items."}, status=400)
-             
-        # Strategy: Get existing IDs. 
-        existing_ids = set(provider.media.values_list('id', flat=True))
-        incoming_ids = set(item.get('id') for item in media_list if item.get('id'))
-        
-        # Delete missing
-        to_delete = existing_ids - incoming_ids
-        ServiceMedia.objects.filter(id__in=to_delete).delete()
-        
-        # Update or Create
-        for item in media_list:
-            if item.get('id') and item.get('id') in existing_ids:
-                # Update
-                media = ServiceMedia.objects.get(id=item.get('id'))
-                media.is_primary = item.get('is_primary', False)
-                # media.file_url = item.get('file_url') # Usually shouldn't change URL of existing unless re-upload
-                media.save()
-            else:
-                # Create
-                ServiceMedia.objects.create(
-                    provider=provider,
-                    file_url=item.get('file_url'),
-                    thumbnail_url=item.get('thumbnail_url'),
-                    is_primary=item.get('is_primary', False),
-                    alt_text=item.get('alt_text', '')
-                )
-                
-                
-        return Response(self.get_serializer(provider).data)
+        items = ServiceMediaSyncSerializer(data=request.data, many=True)
+        items.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            existing = {media.id: media for media in ServiceMedia.objects.select_for_update().filter(provider=provider)}
+            foreign = [item['id'] for item in items.validated_data if item.get('id') and item['id'] not in existing]
+            if foreign:
+                return Response({"error": f"Media {foreign} does not belong to this provider."}, status=400)
+
+            kept, to_update, to_create = set(), [], []
+            for item in items.validated_data:
+                if item.get('id'):
+                    media = existing[item['id']]
+                    kept.add(media.id)
+                    changes = {field: item[field] for field in ('is_primary', 'alt_text', 'thumbnail_url') if field in item}
+                    if any(getattr(media, field) != value for field, value in changes.items()):
+                        for field, value in changes.items():
+                            setattr(media, field, value)
+                        to_update.append(media)
+                else:
+                    to_create.append(ServiceMedia(
+                        provider=provider,
+                        file_url=item['file_url'],
+                        thumbnail_url=item.get('thumbnail_url') or None,
+                        is_primary=item['is_primary'],
+                        alt_text=item.get('alt_text', '')
+                    ))
+
+            stale = set(existing) - kept
+            if stale:
+                ServiceMedia.objects.filter(provider=provider, id__in=stale).delete()
+            if to_update:
+                ServiceMedia.objects.bulk_update(to_update, ['is_primary', 'alt_text', 'thumbnail_url'])
+            if to_create:
+                attach_derivatives([media for media in to_create if not media.thumbnail_url], 'file_url')
+                ServiceMedia.objects.bulk_create(to_create)
+                count_references([media.file_url for media in to_create], 1)
+
+        media = [existing[media_id] for media_id in existing if media_id in kept] + to_create
+        media.sort(key=lambda m: (not m.is_primary, -m.created_at.timestamp()))
+        return Response({"provider_id": provider.id, "media": ServiceMediaSerializer(media, many=True).data})
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def update_status(self, request, pk=None):
@@ -479,7 +563,16 @@ class ServiceBookingViewSet(viewsets.ModelViewSet):
             provider_bookings = ServiceBooking.objects.filter(provider=user.service_provider_profile)
             queryset = queryset | provider_bookings
             
-        return queryset.distinct()
+        # Nested pets render media, traits and profile_is_complete; load them up front
+        return queryset.distinct().select_related(
+            'pet__owner', 'provider__user', 'provider__category',
+        ).prefetch_related('pet__media', 'pet__traits__trait')
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            load_details([booking.provider for booking in page])
+        return page
 
     def perform_create(self, serializer):
         # Allow client to create booking
@@ -548,17 +641,21 @@ class ServiceBookingViewSet(viewsets.ModelViewSet):
             return Response({"error": "Missing required fields (provider_id, date)"}, status=400)
         
         try:
-            from datetime import datetime, timedelta
+            from datetime import datetime, time, timedelta
             from django.utils import timezone
             from .models import BusinessHours, ServiceProvider # Import BusinessHours and ServiceProvider
             
             provider = ServiceProvider.objects.get(id=provider_id)
+            service_type = SERVICE_TYPES.get(provider.service_type)
+            details = provider.details
+            capacity = service_type.slot_capacity(details) if details is not None else 1
             target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
             day_of_week = target_date.weekday()  # 0=Monday
             
-            # Get business hours for this day
+            # Get business hours for this day (cached until the provider's hours change)
+            hours = get_business_hours(provider.id)
             try:
-                business_hour = provider.hours.get(day=day_of_week)
+                business_hour = hours[day_of_week]
                 if business_hour.is_closed:
                     return Response({
                         "is_available": False,
@@ -567,9 +664,8 @@ class ServiceBookingViewSet(viewsets.ModelViewSet):
                     })
                 open_time = business_hour.open_time
                 close_time = business_hour.close_time
-            except BusinessHours.DoesNotExist: # Catch specific exception
+            except KeyError:
                 # Default hours if not set
-                from datetime import time
                 open_time = time(9, 0)
                 close_time = time(18, 0)
             
@@ -601,15 +697,8 @@ class ServiceBookingViewSet(viewsets.ModelViewSet):
                     end_datetime__gt=slot_start
                 ).count()
                 
-                # Check capacity for foster services
-                is_available = True
-                capacity = 1
-                
-                if hasattr(provider, 'foster_details'):
-                    capacity = provider.foster_details.capacity or 1
-                    is_available = conflicts < capacity
-                else:
-                    is_available = conflicts == 0
+                # Check capacity (fosters can take several bookings per slot)
+                is_available = conflicts < capacity
                 
                 available_slots.append({
                     "time": current_time.strftime('%H:%M'),
@@ -624,7 +713,7 @@ class ServiceBookingViewSet(viewsets.ModelViewSet):
             
             # Get business hours summary
             business_hours = {}
-            for hour in provider.hours.all():
+            for hour in hours.values():
                 day_name = dict(BusinessHours.DAYS_OF_WEEK).get(hour.day, '').lower()
                 business_hours[day_name] = {
                     "open": hour.open_time.strftime('%H:%M') if hour.open_time else None,
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.common.locks import cache_is_shared
+from apps.common.metrics import record_cache_lookup
+
+User = get_user_model()
+
+# Columns kept in the cache: what authentication, permission checks and the compact
+# session profile read. Secrets (password hash, verification codes) are never cached;
+# reading them on a cached user loads them from the database.
+CACHED_FIELDS = (
+    'id', 'email', 'first_name', 'last_name', 'role', 'account_status',
+    'is_active', 'is_staff', 'is_superuser', 'last_login', 'date_joined', 'updated_at',
+    'email_verified', 'phone_verified', 'verified_identity', 'pet_owner_verified',
+    'photoURL', 'bio', 'date_of_birth', 'phone_number',
+    'location_city', 'location_state', 'location_country', 'zip_code', 'privacy_settings',
+)
+
+# Without a shared cache other processes never see invalidations, so rows expire sooner
+LOCAL_CACHE_MAX_TTL = 5
+
+
+def _version_key(user_id):
+    return f'auth-user-version:{user_id}'
+
+
+def _row_key(user_id, version):
+    return f'auth-user:{user_id}:v{version}'
+
+
+def user_cache_enabled():
+    return settings.AUTH_USER_CACHE_TTL > 0
+
+
+def _ttl():
+    if cache_is_shared():
+        return settings.AUTH_USER_CACHE_TTL
+    return min(settings.AUTH_USER_CACHE_TTL, LOCAL_CACHE_MAX_TTL)
+
+
+def _serialize(user):
+    return {name: getattr(user, name) for name in CACHED_FIELDS}
+
+
+def _deserialize(row):
+    # from_db expects the loaded values in model field order; the rest stay deferred
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in row]
+    return User.from_db(DEFAULT_DB_ALIAS, names, [row[name] for name in names])
+
+
+def get_user(user_id):
+    """
+    Returns the user with this id, or None if there is none.
+
+    Rows (CACHED_FIELDS only) are cached for AUTH_USER_CACHE_TTL seconds under
+    a per-user version that `invalidate_user` bumps whenever the user is saved
+    or deleted. With a shared cache (CACHE_URL) every process sees model saves
+    immediately. With the per-process fallback only the saving process does,
+    so rows are kept for at most LOCAL_CACHE_MAX_TTL seconds. Writes through
+    queryset.update() are only picked up once the row expires.
+    """
+    version = cache.get(_version_key(user_id), 0)
+    row = cache.get(_row_key(user_id, version))
+    record_cache_lookup('auth_user', hit=row is not None)
+    if row is not None:
+        return _deserialize(row)
+
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        cache.set(_row_key(user_id, version), _serialize(user), timeout=_ttl())
+    return user
+
+
+def invalidate_user(user_id):
+    """
+    Moves the user to a new cache version; rows stored under the old one are never read again.
+    """
+    key = _version_key(user_id)
+    if cache.add(key, 1, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.cache import invalidate_user
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Compares DB queries and latency per authenticated request with and without the auth user cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help='User to authenticate as (defaults to the first active user)')
+        parser.add_argument('--path', default='/api/notifications/', help='Endpoint to request')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per run')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        user = users.filter(email=options['email']).first() if options['email'] else users.order_by('id').first()
+        if user is None:
+            raise CommandError('No matching active user to authenticate as.')
+
+        client = Client()
+        client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+
+        for label, ttl in (('Without cache', 0), ('With cache', 60)):
+            invalidate_user(user.pk)
+            with override_settings(AUTH_USER_CACHE_TTL=ttl):
+                queries, seconds, status_code = self._run(client, options['path'], options['requests'])
+            per_request = queries / options['requests']
+            self.stdout.write(
+                f'{label:<14} {per_request:.2f} queries/request, '
+                f'{seconds * 1000 / options["requests"]:.2f} ms/request (HTTP {status_code})'
+            )
+
+    def _run(self, client, path, count):
+        # Warm-up request, so the cached run measures steady state
+        client.get(path)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            for _ in range(count):
+                response = client.get(path)
+            elapsed = time.perf_counter() - started
+        return len(captured.captured_queries), elapsed, response.status_code
@@ -79,6 +79,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff                = models.BooleanField(default=False)
     is_superuser            = models.BooleanField(default=False)
     date_joined             = models.DateTimeField(auto_now_add=True)
+    updated_at              = models.DateTimeField(auto_now=True)
 
     objects = UserManager()
 
@@ -89,6 +90,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         verbose_name            ='User'
         verbose_name_plural     = 'Users'
+        indexes = [
+            models.Index(fields=['date_joined']),
+            models.Index(fields=['last_login']),
+        ]
     
     def __str__(self) -> str:
         return f"{self.email} ({self.role})"
@@ -3,6 +3,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework.exceptions import AuthenticationFailed
 from .models import RoleRequest, UserTrustReview
 from apps.pets.models import PetProfile
@@ -103,6 +104,44 @@ class UserSerializer(serializers.ModelSerializer):
             'pets', 'privacy_settings', 'received_reviews'
         ]
 
+class SessionUserSerializer(UserSerializer):
+    """
+    Compact profile for the logged-in user. Built from user columns only, so it
+    needs no queries beyond loading the user.
+    Related collections are added on request, see `EXPANSIONS` and `expand`.
+    """
+    # expand name -> (field name, serializer, prefetch lookup)
+    EXPANSIONS = {
+        'pets': ('pets', PetProfileSerializer, Prefetch(
+            'pets',
+            queryset=PetProfile.objects.with_details()
+        )),
+        'reviews': ('received_reviews', UserTrustReviewSerializer, Prefetch(
+            'received_reviews',
+            queryset=UserTrustReview.objects.select_related('reviewer')
+        )),
+    }
+
+    class Meta(UserSerializer.Meta):
+        fields = [
+            field for field in UserSerializer.Meta.fields if field not in ('pets', 'received_reviews')
+        ] + ['updated_at']
+
+    def __init__(self, *args, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            field_name, serializer_class, _ = self.EXPANSIONS[name]
+            self.fields[field_name] = serializer_class(many=True, read_only=True)
+
+    @classmethod
+    def prefetch_expansions(cls, users, expand):
+        """
+        Loads the related rows for `expand` onto already fetched users.
+        """
+        lookups = [cls.EXPANSIONS[name][2] for name in expand]
+        if lookups:
+            prefetch_related_objects(users, *lookups)
+
 class AdminUserDetailSerializer(UserSerializer):
     """
     Detailed serializer for admin use only.
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_user
+from .models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid='users-invalidate-auth-cache-on-save')
+@receiver(post_delete, sender=User, dispatch_uid='users-invalidate-auth-cache-on-delete')
+def invalidate_auth_cache(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
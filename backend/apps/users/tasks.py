@@ -0,0 +1,57 @@
+from celery.schedules import crontab
+from django.db.models import Q
+from django.utils import timezone
+
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from apps.common.scheduler import periodic_job, update_in_batches, iter_batches
+from .models import User
+from .token_blacklist import build_filter
+
+
+@periodic_job(crontab(minute='*/30'), name='purge-expired-verification-codes')
+def purge_expired_verification_codes():
+    """
+    Clears email and phone verification codes that are past their expiry.
+    """
+    now = timezone.now()
+    fields = [
+        'verification_code', 'verification_code_expires_at',
+        'phone_verification_code', 'phone_verification_code_expires_at',
+    ]
+    expired = User.objects.filter(
+        Q(verification_code_expires_at__lt=now) | Q(phone_verification_code_expires_at__lt=now)
+    )
+
+    def purge(user):
+        if user.verification_code_expires_at and user.verification_code_expires_at < now:
+            user.verification_code = None
+            user.verification_code_expires_at = None
+        if user.phone_verification_code_expires_at and user.phone_verification_code_expires_at < now:
+            user.phone_verification_code = None
+            user.phone_verification_code_expires_at = None
+
+    return update_in_batches(expired.only('id', *fields), fields, purge)
+
+
+@periodic_job(crontab(minute=30, hour=3), name='prune-expired-tokens')
+def prune_expired_tokens():
+    """
+    Deletes expired outstanding refresh tokens in batches; their blacklist
+    entries go with them (on_delete=CASCADE). Rebuilds the blacklist filter afterwards.
+    """
+    expired = OutstandingToken.objects.filter(expires_at__lt=timezone.now()).only('id')
+    deleted = 0
+    for batch in iter_batches(expired):
+        OutstandingToken.objects.filter(id__in=[token.id for token in batch]).delete()
+        deleted += len(batch)
+    build_filter()
+    return deleted
+
+
+@periodic_job(crontab(minute='*/5'), name='rebuild-token-blacklist-filter')
+def rebuild_token_blacklist_filter():
+    """
+    Refreshes the shared blacklist filter from the database.
+    """
+    return build_filter().count
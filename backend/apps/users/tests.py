@@ -79,3 +79,218 @@ class UserModelTests(TestCase):
                 password="testpassword",
                 role="guest"
             )
+
+
+class MaintenanceJobTests(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.moderator = User.objects.create_user(email="mod@example.com", password="testpassword")
+
+    def test_expired_verification_codes_are_purged(self):
+        """Only codes past their expiry are cleared."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.users.tasks import purge_expired_verification_codes
+
+        now = timezone.now()
+        stale = User.objects.create_user(
+            email="stale@example.com", password="testpassword",
+            verification_code="123456", verification_code_expires_at=now - timedelta(minutes=5),
+            phone_verification_code="654321", phone_verification_code_expires_at=now + timedelta(minutes=5),
+        )
+        self.assertEqual(purge_expired_verification_codes(), 1)
+
+        stale.refresh_from_db()
+        self.assertIsNone(stale.verification_code)
+        self.assertEqual(stale.phone_verification_code, "654321")
+
+    def test_expired_suspension_reinstates_account(self):
+        """Suspended users are reinstated only when no other restriction is active."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.admin_panel.models import ModerationAction
+        from apps.admin_panel.tasks import expire_moderation_actions
+
+        now = timezone.now()
+        freed = User.objects.create_user(email="freed@example.com", password="testpassword", account_status="suspended")
+        held = User.objects.create_user(email="held@example.com", password="testpassword", account_status="suspended")
+        for user in (freed, held):
+            ModerationAction.objects.create(
+                moderator=self.moderator, target_user=user, action_type="temporary_suspension",
+                reason="Spam", expires_at=now - timedelta(hours=1)
+            )
+        ModerationAction.objects.create(
+            moderator=self.moderator, target_user=held, action_type="temporary_suspension",
+            reason="Repeat spam", expires_at=now + timedelta(days=3)
+        )
+
+        from apps.users.cache import get_user
+        self.assertEqual(get_user(freed.pk).account_status, "suspended")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(expire_moderation_actions(), 2)
+        # The cached auth row is dropped as well
+        self.assertEqual(get_user(freed.pk).account_status, "active")
+
+        freed.refresh_from_db()
+        held.refresh_from_db()
+        self.assertEqual(freed.account_status, "active")
+        self.assertEqual(held.account_status, "suspended")
+        self.assertEqual(ModerationAction.objects.filter(is_active=True).count(), 1)
+
+
+class AuthUserCacheTests(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        from rest_framework_simplejwt.tokens import RefreshToken
+        cache.clear()
+        self.user = User.objects.create_user(email="cached@example.com", password="testpassword")
+        self.user.is_active = True
+        self.user.save()
+        self.token = RefreshToken.for_user(self.user).access_token
+
+    def _authenticate(self):
+        from apps.users.authentication import CookieJWTAuthentication
+        return CookieJWTAuthentication().get_user(self.token)
+
+    def test_cached_user_skips_users_query(self):
+        """The second authentication is served from the cache."""
+        with self.assertNumQueries(1):
+            self._authenticate()
+        with self.assertNumQueries(0):
+            user = self._authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, "cached@example.com")
+
+    def test_secrets_are_not_cached(self):
+        """The password hash and verification codes stay out of the cache and load on access."""
+        from django.core.cache import cache
+        from apps.users.cache import _row_key
+        self.user.verification_code = "123456"
+        self.user.save()
+        self._authenticate()
+
+        row = cache.get(_row_key(self.user.pk, cache.get(f"auth-user-version:{self.user.pk}", 0)))
+        self.assertNotIn("password", row)
+        self.assertNotIn("verification_code", row)
+
+        user = self._authenticate()
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password("testpassword"))
+
+    def test_save_invalidates_cached_user(self):
+        """Saving the user is visible on the next request, including deactivation."""
+        from rest_framework.exceptions import AuthenticationFailed
+        self._authenticate()
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate()
+
+    def test_cache_can_be_disabled(self):
+        """With a zero TTL every authentication queries the database."""
+        from django.test import override_settings
+        with override_settings(AUTH_USER_CACHE_TTL=0):
+            self._authenticate()
+            with self.assertNumQueries(1):
+                self._authenticate()
+
+
+class TokenRefreshFastPathTests(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        from apps.users.token_blacklist import reset_local_filter
+        from apps.users.tokens import FastRefreshToken
+        cache.clear()
+        reset_local_filter()
+        self.user = User.objects.create_user(email="refresh@example.com", password="testpassword")
+        self.user.is_active = True
+        self.user.save()
+        self.refresh = FastRefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.cookies["refresh_token"] = str(self.refresh)
+
+    def test_refresh_skips_database_once_warm(self):
+        """With a shared cache, valid refreshes are answered from the filter and the user cache."""
+        from unittest.mock import patch
+        with patch("apps.users.token_blacklist.cache_is_shared", return_value=True):
+            self.assertEqual(self.client.post("/api/user/token/refresh/").status_code, 200)
+            with self.assertNumQueries(0):
+                response = self.client.post("/api/user/token/refresh/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.cookies)
+
+    def test_process_local_cache_checks_database(self):
+        """Without a shared cache, a token blacklisted by another process is still rejected."""
+        self.assertEqual(self.client.post("/api/user/token/refresh/").status_code, 200)
+        # Blacklisted elsewhere: no marker in this process and a warm filter without the jti
+        self.refresh.blacklist()
+        response = self.client.post("/api/user/token/refresh/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_blacklisted_token_is_rejected(self):
+        """A token blacklisted at logout can no longer be refreshed."""
+        self.client.post("/api/user/token/refresh/")
+        self.client.post("/api/user/logout/")
+        self.client.cookies["refresh_token"] = str(self.refresh)
+        response = self.client.post("/api/user/token/refresh/")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["code"], "invalid-refresh-token")
+
+    def test_expired_tokens_are_pruned(self):
+        """Expired outstanding tokens and their blacklist entries are deleted."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+        from apps.users.tasks import prune_expired_tokens
+
+        self.refresh.blacklist()
+        OutstandingToken.objects.update(expires_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(prune_expired_tokens(), 1)
+        self.assertFalse(OutstandingToken.objects.exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class SessionProfileTests(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        from apps.pets.models import PetProfile
+        cache.clear()
+        self.user = User.objects.create_user(email="profile@example.com", password="testpassword", first_name="Pat")
+        PetProfile.objects.create(owner=self.user, name="Rex", species="dog", gender="male")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_compact_profile_by_default(self):
+        """Nested collections are only included when expanded."""
+        response = self.client.get("/api/user/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["first_name"], "Pat")
+        self.assertNotIn("pets", response.data)
+        self.assertNotIn("received_reviews", response.data)
+
+        response = self.client.get("/api/user/", {"expand": "pets,reviews"})
+        self.assertEqual([pet["name"] for pet in response.data["pets"]], ["Rex"])
+        self.assertEqual(response.data["received_reviews"], [])
+
+        self.assertEqual(self.client.get("/api/user/", {"expand": "friends"}).status_code, 400)
+
+    def test_unchanged_profile_returns_304(self):
+        """The ETag matches until the user is saved."""
+        etag = self.client.get("/api/user/")["ETag"]
+        response = self.client.get("/api/user/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.user.first_name = "Sam"
+        self.user.save()
+        response = self.client.get("/api/user/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
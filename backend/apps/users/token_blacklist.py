@@ -0,0 +1,122 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from apps.common.locks import cache_is_shared
+
+FILTER_CACHE_KEY = 'jwt-blacklist-filter'
+FALSE_POSITIVE_RATE = 0.01
+MIN_BITS = 1024
+
+
+def _recent_key(jti):
+    return f'jwt-blacklisted:{jti}'
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership filter. `might_contain` can return a false
+    positive (at roughly FALSE_POSITIVE_RATE) but never a false negative.
+    """
+
+    def __init__(self, size, hash_count, bits=None, count=0):
+        self.size = size
+        self.hash_count = hash_count
+        self.count = count
+        self.bits = bytearray(bits) if bits is not None else bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity):
+        capacity = max(capacity, 1)
+        size = max(MIN_BITS, int(-capacity * math.log(FALSE_POSITIVE_RATE) / math.log(2) ** 2))
+        hash_count = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hash_count)
+
+    def _positions(self, item):
+        digest = hashlib.sha256(item.encode('utf-8')).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:16], 'big') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos // 8] |= 1 << (pos % 8)
+        self.count += 1
+
+    def might_contain(self, item):
+        return all(self.bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(item))
+
+    def to_dict(self):
+        return {'size': self.size, 'hash_count': self.hash_count, 'bits': bytes(self.bits), 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['size'], data['hash_count'], data['bits'], data.get('count', 0))
+
+
+def build_filter():
+    """
+    Builds the filter from every blacklisted token that has not expired yet and
+    stores it in the shared cache.
+    """
+    jtis = list(
+        BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list('token__jti', flat=True)
+    )
+    bloom = BloomFilter.for_capacity(len(jtis) * 2)
+    for jti in jtis:
+        bloom.add(jti)
+    cache.set(FILTER_CACHE_KEY, bloom.to_dict(), timeout=settings.AUTH_BLACKLIST_FILTER_TTL)
+    return bloom
+
+
+# Per-process copy of the shared filter, so most checks need no cache round trip
+_local = {'bloom': None, 'loaded_at': 0.0}
+
+
+def get_filter():
+    now = time.monotonic()
+    if _local['bloom'] is not None and now - _local['loaded_at'] < settings.AUTH_BLACKLIST_FILTER_LOCAL_TTL:
+        return _local['bloom']
+
+    data = cache.get(FILTER_CACHE_KEY)
+    bloom = BloomFilter.from_dict(data) if data else build_filter()
+    _local.update(bloom=bloom, loaded_at=now)
+    return bloom
+
+
+def reset_local_filter():
+    _local.update(bloom=None, loaded_at=0.0)
+
+
+def mark_blacklisted(jti, expires_at):
+    """
+    Makes a newly blacklisted token visible before the next filter rebuild.
+    The marker lives until the token itself expires.
+    """
+    remaining = int(expires_at - time.time())
+    if remaining > 0:
+        cache.set(_recent_key(jti), True, timeout=remaining)
+    if _local['bloom'] is not None:
+        _local['bloom'].add(jti)
+
+
+def is_blacklisted(jti):
+    """
+    Answers from the filter when it can. Only tokens that the filter (or a
+    recent blacklist marker) flags are confirmed with a database query.
+
+    Markers set by `mark_blacklisted` only reach other processes through a
+    shared cache (CACHE_URL). Without one every check goes to the database,
+    or tokens revoked in another worker would be accepted until the filter
+    is rebuilt.
+    """
+    if not cache_is_shared():
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+    if not get_filter().might_contain(jti) and not cache.get(_recent_key(jti)):
+        return False
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
@@ -0,0 +1,22 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .token_blacklist import is_blacklisted, mark_blacklisted
+
+
+class FastRefreshToken(RefreshToken):
+    """
+    RefreshToken whose blacklist check goes through the cached bloom filter,
+    so refreshing a valid token normally needs no blacklist query.
+    """
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        mark_blacklisted(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.throttling import AnonRateThrottle
+from rest_framework.renderers import JSONRenderer
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.exceptions import  TokenError
@@ -11,7 +12,7 @@ from rest_framework import viewsets, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
 from apps.users.permissions import IsOwnerOrReadOnly
 from .serializers import (
-    UserRegistrationSerializer, UserUpdateSerializer, UserSerializer, 
+    UserRegistrationSerializer, UserUpdateSerializer, UserSerializer, SessionUserSerializer, 
     PublicUserSerializer, RoleRequestSerializer, AdminUserDetailSerializer
 )
 from apps.pets.serializers import PetProfileSerializer
@@ -21,12 +22,16 @@ from .utils.whatsapp import (
     extract_message_from_webhook, extract_code_from_message
 )
 from .models import RoleRequest
+from .cache import get_user as get_cached_user
+from .tokens import FastRefreshToken
 from apps.pets.models import PetProfile
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from decouple import config
 import random
+import hashlib
+from django.utils.http import parse_etags
 from django.utils import timezone
 from django.core.mail import send_mail
 from datetime import timedelta
@@ -92,11 +97,11 @@ class CustomTokenRefreshView(APIView):
             return response
 
         try:
-            token = RefreshToken(refresh_token)
+            token = FastRefreshToken(refresh_token)
             
-            # Check if user exists
-            user_id = token.payload.get('user_id')
-            if not User.objects.filter(id=user_id).exists():
+            # Check if user exists and is still active (served from the auth user cache)
+            user = get_cached_user(token.payload.get('user_id'))
+            if user is None or not user.is_active:
                 response = Response(
                     {"message": "User not found", 'code': 'user-not-found'},
                     status=401
@@ -126,12 +131,41 @@ class CustomTokenRefreshView(APIView):
             return response
 
 class UserProfileView(APIView):
+    """
+    Profile of the logged-in user.
+    GET returns the compact session profile; `?expand=pets,reviews` adds those collections.
+    Responses carry an ETag, and a matching If-None-Match gets 304 Not Modified.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
-        serializer = UserSerializer(user)
-        return Response(serializer.data)
+        expand = sorted({name for name in request.query_params.get('expand', '').split(',') if name})
+        unknown = set(expand) - set(SessionUserSerializer.EXPANSIONS)
+        if unknown:
+            return Response(
+                {"error": f"Unknown expand value(s): {', '.join(sorted(unknown))}. "
+                          f"Allowed: {', '.join(SessionUserSerializer.EXPANSIONS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if expand:
+            SessionUserSerializer.prefetch_expansions([user], expand)
+            data = SessionUserSerializer(user, expand=expand).data
+            # Pets and reviews don't touch user.updated_at, so the tag comes from the payload
+            etag = f'W/"{hashlib.md5(JSONRenderer().render(data)).hexdigest()}"'
+        else:
+            # The compact profile only changes when the user row does; no need to serialize to compare
+            etag = f'W/"user-{user.pk}-{user.updated_at.timestamp():.6f}"'
+            data = None
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data if data is not None else SessionUserSerializer(user).data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
     def patch(self, request):
         user= request.user
@@ -303,7 +337,7 @@ class LogoutView(APIView):
         try:
             refresh_token = request.COOKIES.get('refresh_token')
             if refresh_token:
-                token = RefreshToken(refresh_token)
+                token = FastRefreshToken(refresh_token)
                 token.blacklist()
         except Exception:
             # Token might be invalid or expired, but we still want to clear cookies
@@ -434,7 +468,7 @@ class UserPetViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return PetProfile.objects.filter(owner=user).order_by('-created_at')
+            return PetProfile.objects.filter(owner=user).with_details().order_by('-created_at')
         return PetProfile.objects.none()
 
     def perform_create(self, serializer):
@@ -0,0 +1,39 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.urls import is_valid_path
+
+
+@lru_cache(maxsize=4096)
+def normalize_path(path, urlconf):
+    """
+    Returns the form of `path` that matches a route: the path itself, or the
+    path with a trailing slash when only that form exists. Cached per
+    (path, urlconf), so each distinct path is resolved at most twice per process.
+    """
+    if path.endswith('/') or is_valid_path(path, urlconf):
+        return path
+    if is_valid_path(f'{path}/', urlconf):
+        return f'{path}/'
+    return path
+
+
+class SlashOptionalPathMiddleware:
+    """
+    Serves routes with or without their trailing slash by rewriting the
+    request path in place, instead of redirecting (which costs a round trip
+    and drops the body of POST/PUT requests).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        path_info = request.path_info
+        if not path_info.endswith('/'):
+            urlconf = getattr(request, 'urlconf', None) or settings.ROOT_URLCONF
+            normalized = normalize_path(path_info, urlconf)
+            if normalized != path_info:
+                request.path_info = normalized
+                request.path = f'{request.path[:len(request.path) - len(path_info)]}{normalized}'
+        return self.get_response(request)
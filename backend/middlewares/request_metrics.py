@@ -0,0 +1,90 @@
+import json
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, empty
+
+from apps.common import metrics
+from apps.common.instrumentation import end_request, start_request
+
+logger = logging.getLogger('petcircle.requests')
+slow_logger = logging.getLogger('petcircle.requests.slow')
+
+
+def _loaded_user_id(request):
+    # Only a user that authentication already loaded; never triggers a lookup of its own
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return getattr(user, 'pk', None)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request: total latency, database query count and time
+    (through `execute_wrapper` on each connection), time spent in serializer
+    `.data` and response size. Each request is logged as one JSON line on
+    `petcircle.requests`; requests over REQUEST_SLOW_MS or REQUEST_SLOW_QUERIES
+    are also logged as warnings on `petcircle.requests.slow` with their most
+    repeated SQL statements, which is where N+1 queries show up.
+    The same numbers feed the request metrics in apps.common.metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        stats, token = start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+
+        self.record(request, response, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # DRF viewsets expose the method -> action mapping on the view function
+        actions = getattr(view_func, 'actions', None) or {}
+        request._metrics_action = actions.get(request.method.lower())
+
+    def record(self, request, response, stats):
+        elapsed_ms = stats.elapsed() * 1000
+        match = request.resolver_match
+        data = {
+            'timestamp': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'route': match.route if match else None,
+            'action': getattr(request, '_metrics_action', None),
+            'status': response.status_code,
+            'duration_ms': round(elapsed_ms, 2),
+            'db_queries': stats.query_count,
+            'db_ms': round(stats.db_seconds * 1000, 2),
+            'serializer_ms': round(stats.serializer_seconds * 1000, 2),
+            'response_bytes': None if response.streaming else len(response.content),
+            'user_id': _loaded_user_id(request),
+        }
+        logger.info(json.dumps(data))
+
+        view = data['view'] or 'unmatched'
+        metrics.REQUEST_DURATION.observe(elapsed_ms / 1000, view=view, action=data['action'] or '', method=request.method)
+        metrics.REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        metrics.REQUEST_QUERIES.observe(stats.query_count, view=view)
+        if response.status_code == 429:
+            metrics.THROTTLED.inc(view=view)
+
+        if elapsed_ms >= settings.REQUEST_SLOW_MS or stats.query_count >= settings.REQUEST_SLOW_QUERIES:
+            data['top_statements'] = stats.top_statements(settings.REQUEST_SLOW_TOP_STATEMENTS)
+            slow_logger.warning(json.dumps(data))
+        return data
@@ -31,7 +31,7 @@ const PetCard = ({ pet, viewMode = 'grid', variant = 'listing', onDelete, onTogg
             gender: p.gender || 'Unknown',
 
             // Image
-            photo: p.main_photo || (p.photos && p.photos[0]?.url) || 'https://images.unsplash.com/photo-1543466835-00a7907e9de1?auto=format&fit=crop&q=80',
+            photo: p.main_photo_thumbnail || p.main_photo || (p.photos && p.photos[0]?.url) || 'https://images.unsplash.com/photo-1543466835-00a7907e9de1?auto=format&fit=crop&q=80',
 
             // Location
             city: pet.location_city || 'Nearby',
@@ -8,7 +8,7 @@ const Header = ({ onMenuClick, provider }) => {
 
     // Mock provider info if fields are missing for better visual
     const businessName = provider?.business_name || "City Paws Clinic";
-    const businessType = provider?.service_type || "Veterinary";
+    const businessType = provider?.service_type_display || "Veterinary";
 
     return (
         <header className="bg-white h-16 border-b border-gray-200 flex items-center justify-between px-4 lg:px-8 sticky top-0 z-20">
@@ -113,6 +113,7 @@ const ServiceSearchPage = () => {
         { value: 'recommended', label: 'Recommended' },
         { value: '-avg_rating', label: 'Highest Rated' },
         { value: '-reviews_count', label: 'Most Reviewed' },
+        { value: 'price', label: 'Lowest Price' },
     ];
 
     return (